@@ -0,0 +1,60 @@
+import gc
+import multiprocessing
+import os
+import sys
+
+# Production launch, from the repository root:
+#
+#   gunicorn -c gunicorn.conf.py server:app
+#
+# The app is imported once in the master with ASL_STARTUP=prefork, so the
+# label encoder and (with ASL_ENGINE=numpy) the model weights are loaded
+# before the workers fork and are shared copy-on-write instead of being
+# loaded N times. Each worker then builds its own MediaPipe graphs, and with
+# the keras engine its own TensorFlow models, in server.init_worker().
+#
+# ASL_WORKERS        worker processes (default: one per core)
+# ASL_THREADS        request threads per worker; WebSocket streams hold one each
+# ASL_BIND           listen address (default 0.0.0.0:5001)
+# ASL_WORKER_TIMEOUT seconds a silent worker is given before it is restarted
+# ASL_MAX_REQUESTS   recycle each worker after this many requests (0 = never)
+#
+# Reloading: kill -HUP <master> replaces the workers gracefully, re-forked from
+# the models already in the master. To pick up new code or model files, send
+# USR2 (a new master starts next to the old one), then TERM the old master.
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+os.environ.setdefault('ASL_STARTUP', 'prefork')
+
+# The root server.py has to win over server/python/server.py, so the predictor
+# modules go after the app directory on sys.path rather than in `pythonpath`
+chdir = ROOT_DIR
+sys.path.append(os.path.join(ROOT_DIR, 'server', 'python'))
+
+bind = os.environ.get('ASL_BIND', '0.0.0.0:5001')
+workers = int(os.environ.get('ASL_WORKERS', 0)) or multiprocessing.cpu_count()
+worker_class = 'gthread'
+threads = int(os.environ.get('ASL_THREADS', 4))
+preload_app = True
+timeout = int(os.environ.get('ASL_WORKER_TIMEOUT', 120))
+graceful_timeout = 30
+max_requests = int(os.environ.get('ASL_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+
+
+def when_ready(arbiter):
+    # Move everything the master loaded out of the collector's generations, so
+    # collections in the workers do not write to (and so copy) those pages
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(arbiter, worker):
+    from server import init_worker
+    init_worker()
+
+
+def worker_exit(arbiter, worker):
+    from server import predictor
+    predictor.release()
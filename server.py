@@ -1,73 +1,479 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, copy_current_request_context, g, request, jsonify
 from flask_cors import CORS
+from flask_sock import Sock
 from asl_predictor import ASLPredictor
-import numpy as np
-import cv2
-import base64
+from frame_decoding import decode_request_image, iter_request_payloads, FrameDecodeError
+from landmark_codec import decode_landmark_request, DTYPE_HEADER, HANDS_HEADER
+from streaming import StreamSession, decode_stream_message
+from metrics import MetricsRegistry, timed_iter
+from debug_capture import DebugCapture
+from hand_gate import HandGate
+from keyframes import KeyframeSelector
+from admission import AdmissionController, DeadlineExceeded, Overloaded
+from session_store import SessionRecorder
+import functools
+import hmac
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
 
 app = Flask(__name__)
+sock = Sock(app)
+
+# Requests carrying a session id reuse the same MediaPipe graph, so hand
+# tracking follows that user's stream
+SESSION_HEADER = 'X-Session-Id'
+
+# Milliseconds the client still wants an answer for, counted from when the
+# request arrives; past it the request is dropped instead of processed
+DEADLINE_HEADER = 'X-Deadline-Ms'
 
 # Configure CORS with specific settings
 CORS(app, resources={
     r"/predict/*": {
         "origins": ["http://localhost:5173"],  # Your frontend URL
         "methods": ["POST", "OPTIONS"],
-        "allow_headers": ["Content-Type"]
+        "allow_headers": ["Content-Type", SESSION_HEADER, DTYPE_HEADER, HANDS_HEADER, DEADLINE_HEADER],
+        "expose_headers": ["Retry-After"]
     }
 })
 
-predictor = ASLPredictor()
+# Per-stage latency histograms and counters, served at /metrics (ASL_METRICS=0 turns them off)
+metrics = MetricsRegistry(enabled=os.environ.get('ASL_METRICS', '1') != '0')
+metrics.describe('asl_request_seconds', 'Request latency by endpoint')
+metrics.describe('asl_requests_total', 'Requests by endpoint and status code')
+metrics.describe('asl_stage_seconds', 'Latency of each prediction stage (payload, decode, mediapipe, features, model)')
+metrics.describe('asl_frames_per_request', 'Frames received per word request')
+metrics.describe('asl_frames_total', 'Frames received by the word endpoints')
+metrics.describe('asl_hand_detection_misses_total', 'Frames in which MediaPipe found no hand')
+metrics.describe('asl_admission_queue_depth', 'Requests waiting for a worker when a request is admitted')
+metrics.describe('asl_shed_total', 'Requests dropped by admission control (queue_full, expired, dropped)')
+
+# ASL_DEBUG_LOG=1 brings back the per-request prediction details, as JSON log lines
+if os.environ.get('ASL_DEBUG_LOG') == '1':
+    logging.basicConfig(format='%(asctime)s %(name)s %(levelname)s %(message)s')
+    logging.getLogger('asl_predictor').setLevel(logging.DEBUG)
+
+# ASL_DEBUG_CAPTURE_RATE > 0 keeps a sample of recent alphabet frames, with their
+# landmarks and predictions, viewable at /debug/captures; ASL_DEBUG_CAPTURE_DIR
+# also has them written to disk in the background
+debug_capture_rate = float(os.environ.get('ASL_DEBUG_CAPTURE_RATE', 0))
+debug_capture = None
+if debug_capture_rate > 0:
+    debug_capture = DebugCapture(
+        capacity=int(os.environ.get('ASL_DEBUG_CAPTURE_SIZE', 64)),
+        sample_rate=debug_capture_rate,
+        output_dir=os.environ.get('ASL_DEBUG_CAPTURE_DIR') or None
+    )
+
+# ASL_RECORD_DIR records the landmarks, latency and result of every prediction
+# (or an ASL_RECORD_RATE fraction of sessions) to a session store there, for
+# replay with session_store.py
+recorder = None
+if os.environ.get('ASL_RECORD_DIR'):
+    recorder = SessionRecorder(
+        os.environ['ASL_RECORD_DIR'],
+        sample_rate=float(os.environ.get('ASL_RECORD_RATE', 1.0)),
+        queue_size=int(os.environ.get('ASL_RECORD_QUEUE', 1024))
+    )
+
+# ASL_HAND_HIST points at a histogram saved by create_hist.py; frames with less
+# skin coverage than ASL_HAND_GATE_MIN_COVERAGE then skip MediaPipe, and
+# ASL_HAND_GATE_AUDIT_RATE of those are checked anyway to measure false negatives
+hand_gate = None
+if os.environ.get('ASL_HAND_HIST'):
+    hand_gate = HandGate.from_file(
+        os.environ['ASL_HAND_HIST'],
+        min_coverage=float(os.environ.get('ASL_HAND_GATE_MIN_COVERAGE', 0.02)),
+        audit_rate=float(os.environ.get('ASL_HAND_GATE_AUDIT_RATE', 0.05))
+    )
+
+# ASL_KEYFRAME_THRESHOLD enables keyframe selection for word sequences: only
+# frames whose mean pixel change exceeds it go through MediaPipe, at least every
+# ASL_KEYFRAME_MAX_GAP + 1 frames, and the rest are interpolated
+keyframes = None
+if os.environ.get('ASL_KEYFRAME_THRESHOLD'):
+    keyframes = KeyframeSelector(
+        threshold=float(os.environ['ASL_KEYFRAME_THRESHOLD']),
+        max_gap=int(os.environ.get('ASL_KEYFRAME_MAX_GAP', 4))
+    )
+
+# Set ASL_BATCH_WINDOW_MS to let concurrent requests share one forward pass.
+# ASL_MODEL_VARIANT=float16|int8 serves the reduced-precision weights written by
+# inspect_models.py quantize.
+# ASL_DETECTION_SIZE downscales frames before MediaPipe; with ASL_ROI_TRACKING=1
+# frames of a session or word sequence are also cropped around the tracked hand
+batch_window_ms = os.environ.get('ASL_BATCH_WINDOW_MS')
+predictor = ASLPredictor(
+    batch_window_ms=float(batch_window_ms) if batch_window_ms else None,
+    max_batch_size=int(os.environ.get('ASL_MAX_BATCH_SIZE', 32)),
+    hands_pool_size=int(os.environ.get('ASL_HANDS_POOL_SIZE', 0)) or None,
+    extraction_workers=int(os.environ.get('ASL_EXTRACTION_WORKERS', 0)) or None,
+    extraction_backend=os.environ.get('ASL_EXTRACTION_BACKEND', 'thread'),
+    landmark_cache_size=int(os.environ.get('ASL_LANDMARK_CACHE_SIZE', 0)),
+    landmark_cache_ttl=float(os.environ.get('ASL_LANDMARK_CACHE_TTL', 300)),
+    perceptual_cache=os.environ.get('ASL_LANDMARK_CACHE_PERCEPTUAL') == '1',
+    engine=os.environ.get('ASL_ENGINE', 'keras'),
+    model_variant=os.environ.get('ASL_MODEL_VARIANT') or None,
+    incremental_resync=int(os.environ.get('ASL_INCREMENTAL_RESYNC', 30)),
+    metrics=metrics,
+    debug_capture=debug_capture,
+    recorder=recorder,
+    detection_size=int(os.environ.get('ASL_DETECTION_SIZE', 0)) or None,
+    roi_tracking=os.environ.get('ASL_ROI_TRACKING') == '1',
+    hand_gate=hand_gate,
+    keyframes=keyframes,
+    lazy=True
+)
+
+# ASL_ADMISSION_WORKERS > 0 runs prediction requests on that many worker threads,
+# with up to ASL_ADMISSION_QUEUE more waiting; beyond that requests get a 429
+admission = None
+if int(os.environ.get('ASL_ADMISSION_WORKERS', 0)) > 0:
+    admission_queue = os.environ.get('ASL_ADMISSION_QUEUE')
+    admission = AdmissionController(
+        int(os.environ['ASL_ADMISSION_WORKERS']),
+        int(admission_queue) if admission_queue else None,
+        metrics
+    )
+
+# ASL_STARTUP picks when the models and MediaPipe graphs are built:
+#   eager      - before the server accepts requests (the default)
+#   lazy       - by the first request that needs each one
+#   background - in a thread after start-up; /ready reports when it is done
+#   prefork    - under gunicorn (gunicorn.conf.py): the models are loaded once in
+#                the master and shared copy-on-write by the forked workers, which
+#                build their own MediaPipe graphs in init_worker()
+# ASL_PRELOAD limits what eager/background start-up builds, e.g.
+# "hands,labels,alphabet" for alphabet-only workers that never load the word model
+startup_mode = os.environ.get('ASL_STARTUP', 'eager')
+preload_components = [c.strip() for c in os.environ.get('ASL_PRELOAD', '').split(',') if c.strip()] or None
+startup_error = None
+
+def preload_predictor():
+    global startup_error
+    try:
+        predictor.preload(preload_components)
+    except Exception as e:
+        startup_error = str(e)
+        print(f"Error preloading predictor: {startup_error}")
+
+def prefork_components():
+    # MediaPipe graphs, and TensorFlow with its thread pools, do not survive a
+    # fork, so only NumPy-backed components are loaded before it
+    fork_safe = {'labels'} if predictor.engine == 'keras' else {'labels', 'alphabet', 'word', 'incremental'}
+    return [c for c in preload_components or predictor.components() if c in fork_safe]
+
+def init_worker():
+    # Called in every worker right after the fork (gunicorn's post_fork hook);
+    # after a HUP, models whose files changed since the master loaded them are
+    # reloaded here, so the new workers serve the new files
+    predictor.after_fork()
+    predictor.reload_models(background=False)
+    predictor.preload(preload_components)
+
+if startup_mode == 'eager':
+    predictor.preload(preload_components)
+elif startup_mode == 'prefork':
+    predictor.preload(prefork_components())
+elif startup_mode == 'background':
+    threading.Thread(target=preload_predictor, name='preload', daemon=True).start()
+elif startup_mode != 'lazy':
+    raise ValueError(f"Unknown ASL_STARTUP '{startup_mode}', expected 'eager', 'lazy', 'background' or 'prefork'")
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request(response):
+    if request.endpoint is not None and 'request_start' in g:
+        metrics.observe('asl_request_seconds', time.perf_counter() - g.request_start, endpoint=request.endpoint)
+        metrics.increment('asl_requests_total', endpoint=request.endpoint, status=response.status_code)
+    return response
+
+def request_deadline():
+    value = request.headers.get(DEADLINE_HEADER)
+    if not value:
+        return None
+    try:
+        return g.request_start + float(value) / 1000.0
+    except ValueError:
+        return None
+
+def admitted(endpoint):
+    # Runs the view under admission control when it is enabled
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if admission is None or request.method == 'OPTIONS':
+                return view(*args, **kwargs)
+            try:
+                return admission.run(copy_current_request_context(lambda: view(*args, **kwargs)),
+                                     request_deadline(), endpoint)
+            except Overloaded as e:
+                response = jsonify({'error': str(e), 'retry_after': e.retry_after})
+                response.headers['Retry-After'] = str(e.retry_after)
+                return response, 429
+            except DeadlineExceeded as e:
+                return jsonify({'error': str(e)}), 504
+        return wrapper
+    return decorator
 
 @app.route('/predict/alphabet', methods=['POST', 'OPTIONS'])
+@admitted('alphabet')
 def predict_alphabet():
     if request.method == 'OPTIONS':
         return '', 200
         
     try:
-        data = request.json
-        image_data = data.get('image')
-        
-        if not image_data:
-            return jsonify({'error': 'No image data provided'}), 400
-            
-        # Decode base64 image
-        image_bytes = base64.b64decode(image_data.split(',')[1])
-        nparr = np.frombuffer(image_bytes, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        # JSON data URL, multipart part, raw JPEG or length-prefixed stream
+        with metrics.stages('alphabet')('decode'):
+            image = decode_request_image(request)
         
         # Predict
-        prediction = predictor.predict_alphabet(image)
+        prediction = predictor.predict_alphabet(image, request.headers.get(SESSION_HEADER))
         return jsonify({'prediction': prediction})
         
+    except FrameDecodeError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/predict/word', methods=['POST', 'OPTIONS'])
+@admitted('word')
 def predict_word():
     if request.method == 'OPTIONS':
         return '', 200
         
     try:
-        data = request.json
-        frames = data.get('frames', [])
+        # JPEG payloads are decoded by the predictor as it consumes them,
+        # on the extraction workers when those are enabled
+        frames = timed_iter(iter_request_payloads(request), metrics.stages('word'), 'payload')
+        first_frame = next(frames, None)
         
-        if not frames:
+        if first_frame is None:
             return jsonify({'error': 'No frames provided'}), 400
             
-        # Decode frames
-        decoded_frames = []
-        for frame in frames:
-            image_bytes = base64.b64decode(frame.split(',')[1])
-            nparr = np.frombuffer(image_bytes, np.uint8)
-            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            decoded_frames.append(image)
-            
         # Predict
-        prediction = predictor.predict_word(decoded_frames)
+        prediction = predictor.predict_word(itertools.chain([first_frame], frames), request.headers.get(SESSION_HEADER))
         return jsonify({'prediction': prediction})
         
+    except FrameDecodeError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/predict/alphabet/landmarks', methods=['POST', 'OPTIONS'])
+@admitted('alphabet_landmarks')
+def predict_alphabet_landmarks():
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    try:
+        landmarks = decode_landmark_request(request, sequence=False)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        prediction = predictor.predict_alphabet_landmarks(landmarks, request.headers.get(SESSION_HEADER))
+        return jsonify({'prediction': prediction})
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/predict/word/landmarks', methods=['POST', 'OPTIONS'])
+@admitted('word_landmarks')
+def predict_word_landmarks():
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    try:
+        frames = decode_landmark_request(request, sequence=True)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        prediction = predictor.predict_word_landmarks(frames, request.headers.get(SESSION_HEADER))
+        return jsonify({'prediction': prediction})
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@sock.route('/stream/word')
+def stream_word(ws):
+    # One WebSocket connection is one session with its own landmark window;
+    # ?stride=N sets how often (in frames) a word prediction is sent back.
+    # ?incremental=1 carries the LSTM state between frames, so every frame is
+    # scored in constant time and predictions default to every frame
+    incremental = request.args.get('incremental') == '1'
+    session = StreamSession(
+        window=30,
+        stride=request.args.get('stride', 1 if incremental else 5, type=int),
+        min_frames=request.args.get('min_frames', None, type=int)
+    )
+    session_id = f"ws-{uuid.uuid4()}"
+
+    try:
+        stream_word_session(ws, session, session_id, incremental)
+    finally:
+        predictor.release_session(session_id)
+
+def stream_word_session(ws, session, session_id, incremental=False):
+    word_state = predictor.new_word_stream() if incremental else None
+    while True:
+        message = ws.receive()
+        if message is None:
+            break
+
+        try:
+            kind, payload = decode_stream_message(message)
+        except FrameDecodeError as e:
+            ws.send(json.dumps({'error': str(e)}))
+            continue
+
+        if kind == 'reset':
+            session.reset()
+            if incremental:
+                word_state = predictor.new_word_stream()
+            continue
+
+        try:
+            hands = predictor.extract_hands(payload, session_id, 'stream') if kind == 'frame' else payload
+            features = predictor.word_frame_features(hands)
+        except Exception as e:
+            ws.send(json.dumps({'error': str(e)}))
+            continue
+        due = session.push(features)
+        if incremental:
+            # The state has to advance on every frame, even when nothing is sent
+            try:
+                prediction, probabilities = predictor.score_word_frame(word_state, session.frames)
+                if due:
+                    ws.send(json.dumps({'frame': session.frames_seen, 'prediction': prediction,
+                                        'probabilities': probabilities}))
+            except Exception as e:
+                ws.send(json.dumps({'error': str(e)}))
+        elif due:
+            try:
+                prediction = predictor.predict_word_sequence(session.frames)
+                ws.send(json.dumps({'frame': session.frames_seen, 'prediction': prediction}))
+            except Exception as e:
+                ws.send(json.dumps({'error': str(e)}))
+
+@app.route('/stats/batching', methods=['GET'])
+def batching_stats():
+    stats = predictor.batching_stats()
+    if stats is None:
+        return jsonify({'error': 'Batching is disabled'}), 404
+    return jsonify(stats)
+
+@app.route('/stats/cache', methods=['GET'])
+def cache_stats():
+    if predictor.landmark_cache is None:
+        return jsonify({'error': 'Landmark cache is disabled'}), 404
+    return jsonify(predictor.landmark_cache.stats())
+
+@app.route('/stats/hand_gate', methods=['GET'])
+def hand_gate_stats():
+    if hand_gate is None:
+        return jsonify({'error': 'Hand gate is disabled'}), 404
+    return jsonify(hand_gate.stats())
+
+@app.route('/stats/keyframes', methods=['GET'])
+def keyframe_stats():
+    if keyframes is None:
+        return jsonify({'error': 'Keyframe selection is disabled'}), 404
+    return jsonify(keyframes.stats())
+
+@app.route('/stats/admission', methods=['GET'])
+def admission_stats():
+    if admission is None:
+        return jsonify({'error': 'Admission control is disabled'}), 404
+    return jsonify(admission.stats())
+
+@app.route('/stats/recording', methods=['GET'])
+def recording_stats():
+    if recorder is None:
+        return jsonify({'error': 'Recording is disabled'}), 404
+    return jsonify(recorder.stats())
+
+def admin_allowed():
+    # With ASL_ADMIN_TOKEN set the X-Admin-Token header must match it. Without
+    # one, admin endpoints only answer local requests on the debug server
+    # (ASL_FLASK_DEBUG=1): behind a reverse proxy every request looks local
+    token = os.environ.get('ASL_ADMIN_TOKEN')
+    if token:
+        return hmac.compare_digest(request.headers.get('X-Admin-Token', ''), token)
+    return app.debug and request.remote_addr in ('127.0.0.1', '::1')
+
+@app.route('/admin/models', methods=['GET'])
+def model_status():
+    if not admin_allowed():
+        return jsonify({'error': 'Forbidden'}), 403
+    return jsonify({
+        'reload': predictor.reload_status(),
+        'registry': predictor.registry.stats(),
+        'duplicates': predictor.registry.duplicates(),
+    })
+
+@app.route('/admin/models/reload', methods=['POST'])
+def reload_models():
+    # Builds the changed models in the background; poll /admin/models for the outcome
+    if not admin_allowed():
+        return jsonify({'error': 'Forbidden'}), 403
+    body = request.get_json(silent=True) or {}
+    try:
+        status = predictor.reload_models(body.get('components'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(status), 202
+
+@app.route('/debug/captures', methods=['GET'])
+def debug_captures():
+    # Raw webcam frames: admin access only
+    if not admin_allowed():
+        return jsonify({'error': 'Forbidden'}), 403
+    if debug_capture is None:
+        return jsonify({'error': 'Debug capture is disabled'}), 404
+    return jsonify({'stats': debug_capture.stats(), 'captures': debug_capture.records()})
+
+@app.route('/debug/captures/<int:capture_id>.jpg', methods=['GET'])
+def debug_capture_frame(capture_id):
+    if not admin_allowed():
+        return jsonify({'error': 'Forbidden'}), 403
+    if debug_capture is None:
+        return jsonify({'error': 'Debug capture is disabled'}), 404
+    jpeg = debug_capture.frame_jpeg(capture_id)
+    if jpeg is None:
+        return jsonify({'error': f'Capture {capture_id} is no longer held'}), 404
+    return Response(jpeg, mimetype='image/jpeg')
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    # Prometheus text format; ?format=json adds p50/p95/p99 estimates per histogram
+    if request.args.get('format') == 'json':
+        return jsonify(metrics.snapshot())
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/ready', methods=['GET'])
+def ready():
+    # Lazy workers are always ready: they load on demand
+    expected = set(preload_components or predictor.components())
+    loaded = predictor.loaded_components()
+    status = {'mode': startup_mode, 'loaded': loaded}
+    if startup_error is not None:
+        status['error'] = startup_error
+        return jsonify(status), 503
+    if startup_mode != 'lazy' and not expected.issubset(loaded):
+        return jsonify(status), 503
+    return jsonify(status)
+
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5001, debug=True) 
\ No newline at end of file
+    # Development server only; ASL_FLASK_DEBUG=1 turns on the debugger and reloader.
+    # For production use gunicorn -c gunicorn.conf.py server:app
+    app.run(host='0.0.0.0', port=5001, debug=os.environ.get('ASL_FLASK_DEBUG') == '1') 
\ No newline at end of file
@@ -1,5 +1,6 @@
 import cv2
 import numpy as np
+import pickle
 
 def hist_masking(frame, hist):
     """
@@ -19,18 +20,90 @@ def hist_masking(frame, hist):
     # Apply backprojection using the histogram
     dst = cv2.calcBackProject([hsv], [0, 1], hist, [0, 180, 0, 256], 1)
 
+    thresh = backprojection_mask(dst)
+
+    # Apply mask on original frame
+    res = cv2.bitwise_and(frame, frame, mask=thresh)
+
+    return thresh, res
+
+
+def backprojection_mask(dst, threshold=50):
+    """
+    Turn a back-projection into a binary hand mask.
+
+    Parameters:
+    - dst: uint8 back-projection, filtered in place
+    - threshold: Filtered value above which a pixel is kept
+
+    Returns:
+    - thresh: The binary (0/255) mask
+    """
     # Filtering the backprojection result to clean up the mask
     disc = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (10, 10))
     cv2.filter2D(dst, -1, disc, dst)
 
     # Threshold and binary conversion
-    _, thresh = cv2.threshold(dst, 50, 255, cv2.THRESH_BINARY)
+    _, thresh = cv2.threshold(dst, threshold, 255, cv2.THRESH_BINARY)
 
     # Morphological operations to remove noise
     thresh = cv2.erode(thresh, None, iterations=2)
     thresh = cv2.dilate(thresh, None, iterations=2)
+    return thresh
 
-    # Apply mask on original frame
-    res = cv2.bitwise_and(frame, frame, mask=thresh)
 
-    return thresh, res
+def load_hist(path):
+    """
+    Load a hand histogram saved by create_hist.py.
+
+    Parameters:
+    - path: The "hist" pickle (a 180x256 H-S histogram normalized to 0-255)
+
+    Returns:
+    - hist: The histogram as a float32 array
+    """
+    with open(path, "rb") as f:
+        return np.asarray(pickle.load(f), dtype=np.float32)
+
+
+def build_backprojection_lut(hist, bits=5):
+    """
+    Precompute the back-projection value of every quantized BGR color.
+
+    calcBackProject needs a BGR->HSV conversion of the whole frame first;
+    with this table a frame is back-projected by indexing alone.
+
+    Parameters:
+    - hist: The H-S hand histogram
+    - bits: Bits kept per channel (5 -> a 32x32x32 table)
+
+    Returns:
+    - lut: uint8 array of 2 ** (3 * bits) back-projection values
+    """
+    levels = 1 << bits
+    step = 256 // levels
+    centers = np.arange(levels, dtype=np.uint16) * step + step // 2
+    b, g, r = np.meshgrid(centers, centers, centers, indexing="ij")
+    colors = np.stack([b, g, r], axis=-1).reshape(1, -1, 3).astype(np.uint8)
+    hsv = cv2.cvtColor(colors, cv2.COLOR_BGR2HSV).reshape(-1, 3)
+    return np.clip(hist[hsv[:, 0], hsv[:, 1]], 0, 255).astype(np.uint8)
+
+
+def fast_backprojection(frame, lut, bits=5, size=(80, 60)):
+    """
+    LUT-based equivalent of hist_masking's back-projection on a downscaled frame.
+
+    Parameters:
+    - frame: The input BGR frame
+    - lut: Table from build_backprojection_lut
+    - bits: Bits per channel the table was built with
+    - size: (width, height) the frame is reduced to first
+
+    Returns:
+    - dst: uint8 back-projection of the downscaled frame
+    """
+    small = cv2.resize(frame, size, interpolation=cv2.INTER_LINEAR)
+    shift = 8 - bits
+    quantized = (small >> shift).astype(np.uint32)
+    index = (quantized[..., 0] << (2 * bits)) | (quantized[..., 1] << bits) | quantized[..., 2]
+    return lut[index]
@@ -0,0 +1,147 @@
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from metrics import FRAME_BUCKETS, MetricsRegistry
+
+# Smoothing of the per-request service time behind the Retry-After estimate
+SERVICE_TIME_ALPHA = 0.2
+
+
+class Overloaded(Exception):
+    def __init__(self, retry_after):
+        super().__init__('Server is at capacity, retry later')
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class AdmissionController:
+    """
+    Bounded executor for the CPU-heavy part of prediction requests.
+
+    At most `workers` requests are processed at once and up to `queue_size`
+    more wait for a worker. A request arriving at a full queue is rejected
+    straight away with Overloaded (served as 429 with a Retry-After
+    estimate) instead of piling up behind the others.
+
+    Requests can carry a deadline. One that has already passed on arrival,
+    or passes while the request is still queued, drops the request before
+    any work is spent on it (DeadlineExceeded); once a worker has started a
+    request it is finished and returned.
+
+    Parameters:
+    - workers: Requests processed concurrently
+    - queue_size: Requests allowed to wait for a worker (defaults to 2 x workers)
+    - metrics: Optional MetricsRegistry for queue depth, queue wait and shed counts
+    """
+
+    def __init__(self, workers, queue_size=None, metrics=None):
+        self.workers = workers
+        self.queue_size = queue_size if queue_size is not None else 2 * workers
+        self.metrics = metrics if metrics is not None else MetricsRegistry(enabled=False)
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix='admission')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._service_time = None
+        self.admitted = 0
+        self.completed = 0
+        self.shed = {'queue_full': 0, 'expired': 0, 'dropped': 0}
+
+    def run(self, fn, deadline=None, endpoint=None):
+        """
+        Run fn() on a worker and return its result.
+
+        Parameters:
+        - fn: Zero-argument callable doing the request's work
+        - deadline: time.perf_counter() value after which the result is no longer wanted
+        - endpoint: Label for the metrics
+
+        Raises:
+        - Overloaded when the queue is full
+        - DeadlineExceeded when the deadline passed before a worker started the request
+        """
+        if deadline is not None and time.perf_counter() >= deadline:
+            self._record_shed('expired', endpoint)
+            raise DeadlineExceeded('Deadline passed before the request was queued')
+
+        with self._lock:
+            full = self._pending >= self.workers + self.queue_size
+            if full:
+                self.shed['queue_full'] += 1
+                retry_after = self._retry_after()
+            else:
+                self._pending += 1
+                self.admitted += 1
+                depth = self._pending - self._running
+        if full:
+            self.metrics.increment('asl_shed_total', endpoint=endpoint, reason='queue_full')
+            raise Overloaded(retry_after)
+        self.metrics.observe('asl_admission_queue_depth', depth, FRAME_BUCKETS, endpoint=endpoint)
+
+        future = self._executor.submit(self._execute, fn, deadline, endpoint, time.perf_counter())
+        if deadline is None:
+            return future.result()
+        try:
+            return future.result(timeout=max(deadline - time.perf_counter(), 0.0))
+        except FutureTimeoutError:
+            if future.cancel():
+                # Still queued: it never reaches _execute, so release its slot here
+                with self._lock:
+                    self._pending -= 1
+                self._record_shed('dropped', endpoint)
+                raise DeadlineExceeded('Deadline passed while the request was queued')
+            # Already being processed; the work is spent, so return it
+            return future.result()
+
+    def _execute(self, fn, deadline, endpoint, enqueued):
+        started = time.perf_counter()
+        with self._lock:
+            self._running += 1
+        try:
+            self.metrics.observe('asl_stage_seconds', started - enqueued, endpoint=endpoint, stage='queue')
+            if deadline is not None and started >= deadline:
+                self._record_shed('dropped', endpoint)
+                raise DeadlineExceeded('Deadline passed while the request was queued')
+            result = fn()
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.completed += 1
+                self._service_time = elapsed if self._service_time is None else \
+                    self._service_time + SERVICE_TIME_ALPHA * (elapsed - self._service_time)
+            return result
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._pending -= 1
+
+    def _record_shed(self, reason, endpoint):
+        with self._lock:
+            self.shed[reason] += 1
+        self.metrics.increment('asl_shed_total', endpoint=endpoint, reason=reason)
+
+    def _retry_after(self):
+        # Whole seconds until the current queue should have drained (called with the lock held)
+        service_time = self._service_time if self._service_time is not None else 1.0
+        return max(1, math.ceil((self._pending - self._running + 1) * service_time / self.workers))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'queue_size': self.queue_size,
+                'running': self._running,
+                'queued': self._pending - self._running,
+                'admitted': self.admitted,
+                'completed': self.completed,
+                'shed': dict(self.shed),
+                'mean_service_ms': self._service_time * 1000.0 if self._service_time is not None else None,
+            }
+
+    def close(self):
+        self._executor.shutdown(wait=True)
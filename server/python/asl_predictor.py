@@ -1,13 +1,31 @@
-import cv2
 import numpy as np
-import tensorflow as tf
-from tensorflow.keras.models import load_model, model_from_json, Sequential
-from tensorflow.keras.layers import Input, LSTM, Dense, Dropout, TimeDistributed, Bidirectional, Masking
-import mediapipe as mp
-import joblib
 import os
-import h5py
+import functools
 import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from batching import MicroBatcher
+from features import WordFeatureBuilder, alphabet_features, frame_features
+from keyframes import interpolate_hands
+from landmark_cache import LandmarkCache, cache_scope
+from metrics import FRAME_BUCKETS, NULL_STAGES, MetricsRegistry, log_event
+from model_registry import ModelRegistry
+from parallel_extraction import extract_frame_hands
+from quantization import load_variant_weights, variant_path
+from roi import RoiTracker
+
+# TensorFlow, MediaPipe, h5py and scikit-learn (via joblib) are imported
+# where they are first needed, so importing this module stays cheap and a
+# worker only pays for the components its traffic actually uses
+
+# Per-request debug output; enable with logging.getLogger('asl_predictor').setLevel(logging.DEBUG)
+logger = logging.getLogger('asl_predictor')
+
+# How long a micro-batcher replaced by reload_models() keeps serving the
+# requests that picked it up before the swap
+RETIRED_BATCHER_DRAIN_S = 10.0
 
 def remove_time_major_from_config(config):
     if isinstance(config, dict):
@@ -23,6 +41,9 @@ def remove_time_major_from_config(config):
     return config
 
 def build_model_from_config(config):
+    import tensorflow as tf
+    from tensorflow.keras.models import Sequential
+
     if config['class_name'] == 'Sequential':
         model = Sequential(name=config['config']['name'])
         input_shape = None
@@ -63,198 +84,677 @@ def build_model_from_config(config):
     else:
         return tf.keras.models.model_from_json(json.dumps(config))
 
+# variant: None for the float32 weights, or a precision from quantization.PRECISIONS
+# written by inspect_models.py quantize
+
+def alphabet_model_sources(model_dir, variant=None):
+    return [variant_path(os.path.join(model_dir, 'asl_alphabet_model.h5'), variant)]
+
+def word_model_sources(model_dir, variant=None):
+    return [
+        variant_path(os.path.join(model_dir, 'asl_word_lstm_model.h5'), variant),
+        os.path.join(model_dir, 'asl_word_lstm_model_architecture.json'),
+    ]
+
+def load_weights(model, h5_path, variant=None):
+    if variant is None:
+        model.load_weights(h5_path)
+    else:
+        load_variant_weights(model, h5_path)
+
+def load_alphabet_model(model_dir, variant=None):
+    import h5py
+
+    alphabet_model_path = alphabet_model_sources(model_dir, variant)[0]
+
+    try:
+        with h5py.File(alphabet_model_path, 'r') as f:
+            model_config = f.attrs['model_config']
+            if isinstance(model_config, bytes):
+                model_config = model_config.decode('utf-8')
+            model_config = json.loads(model_config)
+            model_config = remove_time_major_from_config(model_config)
+            alphabet_model = build_model_from_config(model_config)
+            load_weights(alphabet_model, alphabet_model_path, variant)
+            print("Expected input shape:", alphabet_model.input_shape)
+            alphabet_model.summary()
+            print("Alphabet model loaded successfully")
+            return alphabet_model
+    except Exception as e:
+        print(f"Error loading alphabet model: {str(e)}")
+        raise
+
+def load_word_model(model_dir, variant=None):
+    import h5py
+
+    word_model_path, word_model_json_path = word_model_sources(model_dir, variant)
+    try:
+        with open(word_model_json_path, 'r') as json_file:
+            model_json = json_file.read()
+            model_config = json.loads(model_json)
+            model_config = remove_time_major_from_config(model_config)
+            word_model = build_model_from_config(model_config)
+            load_weights(word_model, word_model_path, variant)
+            print("Word model loaded successfully using JSON config")
+            return word_model
+    except Exception as e:
+        print(f"Error loading word model with JSON config: {str(e)}")
+        try:
+            with h5py.File(word_model_path, 'r') as f:
+                model_config = f.attrs['model_config']
+                if isinstance(model_config, bytes):
+                    model_config = model_config.decode('utf-8')
+                model_config = json.loads(model_config)
+                model_config = remove_time_major_from_config(model_config)
+                word_model = build_model_from_config(model_config)
+                load_weights(word_model, word_model_path, variant)
+                print("Word model loaded successfully using h5py")
+                return word_model
+        except Exception as e:
+            print(f"Error loading word model with h5py: {str(e)}")
+            raise
+
 class ASLPredictor:
-    def __init__(self):
-        
-        # Initialize MediaPipe
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
+    def __init__(self, batch_window_ms=None, max_batch_size=32, use_compiled_inference=True,
+                 hands_pool_size=None, extraction_workers=None, extraction_backend='thread',
+                 landmark_cache_size=0, landmark_cache_ttl=300.0, perceptual_cache=False,
+                 use_model_cache=True, engine='keras', lazy=False, incremental_resync=30,
+                 metrics=None, debug_capture=None, detection_size=None, roi_tracking=False,
+                 roi_padding=0.5, max_roi_sessions=1024, hand_gate=None, keyframes=None, model_variant=None,
+                 recorder=None):
+        if engine not in ('keras', 'numpy'):
+            raise ValueError(f"Unknown engine '{engine}', expected 'keras' or 'numpy'")
+        self.engine = engine
+        # Reduced-precision weights ('float16' or 'int8') instead of the float32 originals
+        self.model_variant = None if model_variant == 'float32' else model_variant
+        self.batch_window_ms = batch_window_ms
+        self.max_batch_size = max_batch_size
+        self.use_compiled_inference = use_compiled_inference
+        self.use_model_cache = use_model_cache
+        self.hands_pool_size = hands_pool_size
+        self.extraction_workers = extraction_workers
+        self.extraction_backend = extraction_backend
+        self.incremental_resync = incremental_resync
+
+        # Get the absolute path to the model directory
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        root_dir = os.path.dirname(os.path.dirname(current_dir))
+        self.model_dir = os.path.join(root_dir, 'model')
+
+        # Stage timers and counters for the request hot path, served at /metrics
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+
+        # Optional DebugCapture sampling recent alphabet frames for inspection
+        self.debug_capture = debug_capture
+
+        # Optional SessionRecorder storing the landmarks, latency and result
+        # of every prediction, for replay()
+        self.recorder = recorder
+
+        # Frame preparation before MediaPipe: downscale to detection_size and,
+        # with roi_tracking, crop around the hand found in the previous frame of
+        # the same session or word sequence
+        self.detection_size = detection_size
+        self.roi_tracking = roi_tracking
+        self.roi_padding = roi_padding
+        self.max_roi_sessions = max_roi_sessions
+        self._static_roi = RoiTracker(detection_size, track=False) if detection_size else None
+        self._session_rois = OrderedDict()
+        self._roi_lock = threading.Lock()
+
+        # Optional HandGate: frames without enough skin-colored pixels skip MediaPipe
+        self.hand_gate = hand_gate
+
+        # Worker processes only get the frames, not the frame preparation
+        if extraction_backend == 'process' and extraction_workers and extraction_workers > 1 and \
+                (detection_size or hand_gate is not None):
+            raise ValueError("detection_size and hand_gate need the 'thread' extraction backend")
+
+        # Optional KeyframeSelector: word frames that barely changed are not
+        # run through hand detection, their landmarks are interpolated
+        self.keyframes = keyframes
+
+        # Word-model inputs are built in per-thread preallocated buffers
+        self.word_features = WordFeatureBuilder()
+
+        # Optional content-addressed cache in front of hand detection
+        self.landmark_cache = None
+        if landmark_cache_size:
+            self.landmark_cache = LandmarkCache(landmark_cache_size, landmark_cache_ttl, perceptual_cache)
+
+        # Heavy components (TensorFlow/NumPy models, MediaPipe graphs, the
+        # label encoder) are built by _ensure_loaded(), either all at once
+        # below or, with lazy=True, the first time a request needs them
+        self.hands_pool = None
+        self.frame_extractor = None
+        self.alphabet_model = self.alphabet_runner = self.alphabet_batcher = None
+        self.word_model = self.word_runner = self.word_batcher = None
+        self.word_scorer = None
+        self.label_encoder = None
+        self._builders = {
+            'labels': self._build_labels,
+            'alphabet': lambda: self._build_model('alphabet'),
+            'word': lambda: self._build_model('word'),
+            'incremental': self._build_incremental,
+        }
+        self._loaders = {'hands': self._load_hands}
+        for component in self._builders:
+            self._loaders[component] = functools.partial(self._load_component, component)
+        self._loaded = set()
+        self._load_lock = threading.RLock()
+
+        # Model files are hashed and loaded through the process-wide registry;
+        # model_versions holds the content version each component was built from
+        self.registry = ModelRegistry.for_directory(self.model_dir)
+        self.model_versions = {}
+        self._reload_lock = threading.Lock()
+        self._reload_status = {'state': 'idle'}
+
+        if not lazy:
+            self.preload()
+
+    def preload(self, components=None):
+        """
+        Load components ahead of the first request that needs them.
+
+        Parameters:
+        - components: Any of components() (defaults to all)
+        """
+        for component in self._loaders if components is None else components:
+            if component not in self._loaders:
+                raise ValueError(f"Unknown component '{component}', expected one of {sorted(self._loaders)}")
+            self._ensure_loaded(component)
+
+    def components(self):
+        return list(self._loaders)
+
+    def loaded_components(self):
+        return sorted(self._loaded)
+
+    def _ensure_loaded(self, component):
+        if component in self._loaded:
+            return
+        with self._load_lock:
+            if component not in self._loaded:
+                start = time.perf_counter()
+                self._loaders[component]()
+                self._loaded.add(component)
+                print(f"Loaded {component} in {(time.perf_counter() - start) * 1000.0:.1f} ms")
+
+    def _load_hands(self):
+        from hands_pool import HandsPool
+        from parallel_extraction import ParallelExtractor
+
+        # Initialize MediaPipe: one Hands graph per core, checked out per
+        # request or pinned to a session so tracking state stays per user
+        self.hands_pool = HandsPool(
+            self.hands_pool_size,
             static_image_mode=False,
             max_num_hands=1,
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5
         )
-        
-        # Get the absolute path to the model directory
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        root_dir = os.path.dirname(os.path.dirname(current_dir))
-        model_dir = os.path.join(root_dir, 'model')
-        
-        # Load models
-        try:
-            # Load alphabet model
-            alphabet_model_path = os.path.join(model_dir, 'asl_alphabet_model.h5')
-            
 
-            try:
-                with h5py.File(alphabet_model_path, 'r') as f:
-                    model_config = f.attrs['model_config']
-                    if isinstance(model_config, bytes):
-                        model_config = model_config.decode('utf-8')
-                    model_config = json.loads(model_config)
-                    model_config = remove_time_major_from_config(model_config)
-                    self.alphabet_model = build_model_from_config(model_config)
-                    self.alphabet_model.load_weights(alphabet_model_path)
-                    print("Expected input shape:", self.alphabet_model.input_shape)
-                    self.alphabet_model.summary()
-                    print("Alphabet model loaded successfully")
-            except Exception as e:
-                print(f"Error loading alphabet model: {str(e)}")
-                raise
-            
-            # Load word model
-            word_model_path = os.path.join(model_dir, 'asl_word_lstm_model.h5')
-            word_model_json_path = os.path.join(model_dir, 'asl_word_lstm_model_architecture.json')
-            try:
-                with open(word_model_json_path, 'r') as json_file:
-                    model_json = json_file.read()
-                    model_config = json.loads(model_json)
-                    model_config = remove_time_major_from_config(model_config)
-                    self.word_model = build_model_from_config(model_config)
-                    self.word_model.load_weights(word_model_path)
-                    print("Word model loaded successfully using JSON config")
-            except Exception as e:
-                print(f"Error loading word model with JSON config: {str(e)}")
-                try:
-                    with h5py.File(word_model_path, 'r') as f:
-                        model_config = f.attrs['model_config']
-                        if isinstance(model_config, bytes):
-                            model_config = model_config.decode('utf-8')
-                        model_config = json.loads(model_config)
-                        model_config = remove_time_major_from_config(model_config)
-                        self.word_model = build_model_from_config(model_config)
-                        self.word_model.load_weights(word_model_path)
-                        print("Word model loaded successfully using h5py")
-                except Exception as e:
-                    print(f"Error loading word model with h5py: {str(e)}")
-                    raise
-                    
+        # Optional parallel landmark extraction for word sequences
+        if self.extraction_workers is not None and self.extraction_workers > 1:
+            self.frame_extractor = ParallelExtractor(
+                self.extraction_workers,
+                self.extraction_backend,
+                max_num_hands=1,
+                min_detection_confidence=0.5
+            )
+
+    def _model_sources(self, component):
+        if component == 'labels':
+            return [os.path.join(self.model_dir, 'label_encoder_word.pkl')]
+        if component == 'alphabet':
+            return alphabet_model_sources(self.model_dir, self.model_variant)
+        return word_model_sources(self.model_dir, self.model_variant)
+
+    def _load_component(self, component):
+        self._install(component, self._builders[component]())
+
+    def _install(self, component, built):
+        # Swap one built component in; returns the micro-batcher it replaced, if any
+        value, version = built
+        retired = None
+        if component == 'labels':
+            self.label_encoder = value
+        elif component == 'alphabet':
+            retired = self.alphabet_batcher
+            self.alphabet_model, self.alphabet_runner, self.alphabet_batcher = value
+        elif component == 'word':
+            retired = self.word_batcher
+            self.word_model, self.word_runner, self.word_batcher = value
+        else:
+            self.word_scorer = value
+        self.model_versions[component] = version
+        return retired
+
+    def _build_labels(self):
+        import joblib
+
+        # Load label encoder
+        label_encoder_path, = self._model_sources('labels')
+        return self.registry.load(('labels',), [label_encoder_path], lambda: joblib.load(label_encoder_path))
+
+    def _build_model(self, kind):
+        model_dir, variant = self.model_dir, self.model_variant
+        sources = self._model_sources(kind)
+        if kind == 'alphabet':
+            name, build_fn = 'asl_alphabet_model', load_alphabet_model
+        else:
+            name, build_fn = 'asl_word_lstm_model', load_word_model
+        if variant is not None:
+            name = f'{name}.{variant}'
+            if not os.path.exists(sources[0]):
+                raise FileNotFoundError(f"{sources[0]} not found; create it with inspect_models.py quantize")
+
+        # Load models: the NumPy engine reads the h5 weights directly, the
+        # Keras engine goes through the repaired-model cache when it is up to date
+        def read_model():
+            if self.engine == 'numpy':
+                from numpy_engine import load_numpy_model
+                model_config = None
+                if kind == 'word':
+                    with open(sources[1], 'r') as json_file:
+                        model_config = remove_time_major_from_config(json.load(json_file))
+                return load_numpy_model(sources[0], model_config)
+            if self.use_model_cache:
+                from model_cache import ModelArtifactCache
+                model_cache = ModelArtifactCache(os.path.join(model_dir, '.cache'))
+                return model_cache.load(name, sources, lambda: build_fn(model_dir, variant))
+            return build_fn(model_dir, variant)
+
+        try:
+            model, version = self.registry.load(('model', kind, self.engine, variant), sources, read_model)
         except Exception as e:
             print(f"Error loading models: {str(e)}")
             raise
-            
-        # Load label encoder
-        label_encoder_path = os.path.join(model_dir, 'label_encoder_word.pkl')
-        self.label_encoder = joblib.load(label_encoder_path)
 
-    def preprocess_frame(self, frame):
-        # Convert frame to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        # Process frame with MediaPipe
-        results = self.hands.process(rgb_frame)
-        
-        if not results.multi_hand_landmarks:
+        # Traced forward passes replace model.predict() on the request path;
+        # they are warmed up here so the first request is not slow
+        if self.engine == 'numpy':
+            runner = model
+            runner(np.zeros((1,) + tuple(model.input_shape[1:]), dtype=np.float32))
+        elif self.use_compiled_inference:
+            from inference_engine import CompiledModel
+            warmup_sizes = (1, self.max_batch_size) if self.batch_window_ms is not None else (1,)
+            runner = CompiledModel(model, warmup_sizes)
+            print(f"{name} inference trace warmed up in {runner.warmup_ms:.1f} ms")
+        else:
+            runner = model.predict_on_batch
+
+        # Optional micro-batching: concurrent requests share one forward pass
+        batcher = self._new_batcher(kind, runner)
+        return (model, runner, batcher), version
+
+    def _new_batcher(self, kind, runner):
+        if self.batch_window_ms is None:
             return None
-            
-        # Extract hand landmarks
-        landmarks = []
-        for hand_landmarks in results.multi_hand_landmarks:
-            for landmark in hand_landmarks.landmark:
-                landmarks.extend([landmark.x, landmark.y, landmark.z])
-        
-        landmarks = np.array(landmarks)
+        return MicroBatcher(runner, self.batch_window_ms, self.max_batch_size, name=f'{kind}-batcher')
+
+    def _build_incremental(self):
+        from incremental import IncrementalWordScorer
+        from numpy_engine import load_numpy_model
+
+        # Per-frame stepping needs the NumPy layers, whichever engine serves
+        # batch requests; with the NumPy engine this is the word model itself
+        sources = self._model_sources('incremental')
+
+        def read_model():
+            with open(sources[1], 'r') as json_file:
+                return load_numpy_model(sources[0], remove_time_major_from_config(json.load(json_file)))
+
+        model, version = self.registry.load(('model', 'word', 'numpy', self.model_variant), sources, read_model)
+        return IncrementalWordScorer(model, self.incremental_resync), version
+
+    def reload_models(self, components=None, background=True):
+        """
+        Swap in new versions of the loaded models whose files changed.
+
+        The changed components are built and warmed up while the current ones
+        keep serving, then swapped in together; requests already running
+        finish on the objects they started with.
 
-        # Normalize the landmarks (optional based on training)
-        # Example: min-max normalization
-        landmarks -= np.min(landmarks)
-        landmarks /= np.ptp(landmarks)  # ptp = max - min
+        Parameters:
+        - components: Any of 'labels', 'alphabet', 'word', 'incremental' (defaults to all loaded ones)
+        - background: Build in a thread and return straight away
 
-        return landmarks
+        Returns:
+        - reload_status()
+        """
+        for component in components or []:
+            if component not in self._builders:
+                raise ValueError(f"Unknown component '{component}', expected one of {sorted(self._builders)}")
+        components = [c for c in self._builders if c in self._loaded and (components is None or c in components)]
+        with self._reload_lock:
+            if self._reload_status['state'] == 'running':
+                return self.reload_status()
+            self._reload_status = {'state': 'running', 'started': time.time(), 'components': components}
+        if background:
+            threading.Thread(target=self._reload, args=(components,), name='model-reload', daemon=True).start()
+        else:
+            self._reload(components)
+        return self.reload_status()
 
-    def predict_alphabet(self, frame):
-        cv2.imwrite("input_frame.jpg", frame)
+    def reload_status(self):
+        with self._reload_lock:
+            return {**self._reload_status, 'versions': dict(self.model_versions)}
 
-        landmarks = self.preprocess_frame(frame)
-        if landmarks is None:
-            print("No hand detected in the frame")
+    def _reload(self, components):
+        start = time.perf_counter()
+        try:
+            changed = [c for c in components
+                       if self.registry.version(self._model_sources(c)) != self.model_versions.get(c)]
+            built = {c: self._builders[c]() for c in changed}
+            with self._load_lock:
+                retired = [self._install(c, built[c]) for c in changed]
+            for batcher in retired:
+                if batcher is not None:
+                    timer = threading.Timer(RETIRED_BATCHER_DRAIN_S, batcher.close)
+                    timer.daemon = True
+                    timer.start()
+            status = {'state': 'done', 'swapped': changed}
+            if changed:
+                print(f"Swapped in {', '.join(changed)} in {(time.perf_counter() - start) * 1000.0:.1f} ms")
+        except Exception as e:
+            log_event(logger, 'model_reload_failed', logging.ERROR, error=str(e))
+            status = {'state': 'failed', 'error': str(e)}
+        with self._reload_lock:
+            self._reload_status = {**self._reload_status, **status, 'finished': time.time()}
+
+    def after_fork(self):
+        """
+        Make a predictor built in a prefork master usable in a forked worker.
+
+        Models loaded before the fork stay shared with the master copy-on-write.
+        Threads do not survive fork, so the micro-batchers and the debug
+        capture writer are restarted, and MediaPipe graphs (which run their own
+        threads) are dropped so the worker builds its own on first use.
+        """
+        self._load_lock = threading.RLock()
+        self._reload_lock = threading.Lock()
+        self._roi_lock = threading.Lock()
+        self._session_rois.clear()
+
+        if 'hands' in self._loaded:
+            # Closing the inherited graphs would wait on threads that only
+            # exist in the master; keep them referenced and never use them
+            self._inherited_graphs = (self.hands_pool, self.frame_extractor)
+            self.hands_pool = self.frame_extractor = None
+            self._loaded.discard('hands')
+
+        if self.alphabet_batcher is not None:
+            self.alphabet_batcher = self._new_batcher('alphabet', self.alphabet_runner)
+        if self.word_batcher is not None:
+            self.word_batcher = self._new_batcher('word', self.word_runner)
+        if self.debug_capture is not None:
+            self.debug_capture.after_fork()
+        if self.recorder is not None:
+            self.recorder.after_fork()
+
+    def release_session(self, session_id):
+        if self.hands_pool is not None:
+            self.hands_pool.release_session(session_id)
+        with self._roi_lock:
+            self._session_rois.pop(session_id, None)
+
+    def _new_roi(self):
+        if not self.roi_tracking:
+            return self._static_roi
+        return RoiTracker(self.detection_size, track=True, padding=self.roi_padding)
+
+    def _session_roi(self, session_id):
+        # Tracked crops follow one session; anonymous frames are only downscaled
+        if session_id is None or not self.roi_tracking:
+            return self._static_roi
+        with self._roi_lock:
+            roi = self._session_rois.get(session_id)
+            if roi is None:
+                roi = self._session_rois[session_id] = self._new_roi()
+                while len(self._session_rois) > self.max_roi_sessions:
+                    self._session_rois.popitem(last=False)
+            self._session_rois.move_to_end(session_id)
+            return roi
+
+    def _run_alphabet_model(self, landmarks):
+        self._ensure_loaded('alphabet')
+        if self.alphabet_batcher is not None:
+            futures = [self.alphabet_batcher.submit_async(sample) for sample in landmarks]
+            return np.stack([future.result() for future in futures])
+        return self.alphabet_runner(landmarks)
+
+    def _run_word_model(self, input_data):
+        self._ensure_loaded('word')
+        if self.word_batcher is not None:
+            futures = [self.word_batcher.submit_async(sample) for sample in input_data]
+            return np.stack([future.result() for future in futures])
+        return self.word_runner(input_data)
+
+    def batching_stats(self):
+        if self.batch_window_ms is None:
             return None
-            
+        # Models that have not been loaded yet have no batcher to report on
+        batchers = {'alphabet': self.alphabet_batcher, 'word': self.word_batcher}
+        return {kind: batcher.stats.snapshot() for kind, batcher in batchers.items() if batcher is not None}
+
+    def preprocess_frame(self, frame, session_id=None, endpoint='alphabet'):
+        hands = self.extract_hands(frame, session_id, endpoint)
+        if not hands:
+            return None
+
+        # Min-max normalized landmarks of every detected hand
+        with self.metrics.stages(endpoint)('features'):
+            return alphabet_features(hands)
+
+    def word_frame_features(self, hands):
+        # hands: up to two (21, 3) landmark arrays for one frame
+        return frame_features(hands)
+
+    def _record(self, endpoint, frames, prediction, start, session_id=None):
+        if self.recorder is not None and self.recorder.should_record(session_id):
+            self.recorder.record(endpoint, frames, prediction, time.perf_counter() - start, session_id)
+
+    def predict_alphabet(self, frame, session_id=None):
+        start = time.perf_counter()
+        hands = self.extract_hands(frame, session_id)
+        if not hands:
+            self.metrics.increment('asl_hand_detection_misses_total', endpoint='alphabet')
+            log_event(logger, 'no_hand_detected', endpoint='alphabet')
+            prediction = None
+        else:
+            # Min-max normalized landmarks of every detected hand
+            with self.metrics.stages('alphabet')('features'):
+                landmarks = alphabet_features(hands)
+            prediction = self._predict_alphabet_features(landmarks, 'alphabet')
+
+        if self.debug_capture is not None and self.debug_capture.should_sample():
+            self.debug_capture.record('alphabet', frame, hands, prediction, session_id)
+        self._record('alphabet', [hands or []], prediction, start, session_id)
+        return prediction
+
+    def predict_alphabet_landmarks(self, hands, session_id=None):
+        # hands: (H, 21, 3) landmarks computed by the client; hands beyond what
+        # the model was trained on are dropped, as MediaPipe's max_num_hands does
+        start = time.perf_counter()
+        hands = np.asarray(hands).reshape(-1, 21, 3)
+        self._ensure_loaded('alphabet')
+        max_hands = self.alphabet_model.input_shape[-1] // (21 * 3)
+        with self.metrics.stages('alphabet_landmarks')('features'):
+            landmarks = alphabet_features(hands[:max_hands])
+        prediction = self._predict_alphabet_features(landmarks, 'alphabet_landmarks')
+        self._record('alphabet_landmarks', hands[np.newaxis, :max_hands], prediction, start, session_id)
+        return prediction
+
+    def _predict_alphabet_features(self, landmarks, endpoint):
         # Reshape for model input
         landmarks = landmarks.reshape(1, 1, -1)
-        print("Alphabet landmarks shape:", landmarks.shape)
 
-        
         # Make prediction
         try:
-            prediction = self.alphabet_model.predict(landmarks)
-            print("Prediction output:", prediction)
-            predicted_class = np.argmax(prediction)
+            with self.metrics.stages(endpoint)('model'):
+                prediction = self._run_alphabet_model(landmarks)
 
             predicted_index = np.argmax(prediction)
+            self._ensure_loaded('labels')
             predicted_label = self.label_encoder.inverse_transform([predicted_index])[0]
+            log_event(logger, 'alphabet_prediction', endpoint=endpoint, input_shape=landmarks.shape,
+                      prediction=prediction.tolist(), label=predicted_label)
             return predicted_label
 
-
-   
-        
         except Exception as e:
-            print(f"Prediction error: {e}")
+            log_event(logger, 'prediction_error', logging.ERROR, endpoint=endpoint, error=str(e))
             return None
 
-    def predict_word(self, frames):
-        print("📍 Running predict_word...")
-
-        sequence = []
-
-        for i, frame in enumerate(frames):
-            results = self.hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-            frame_landmarks = []
-
-            if results.multi_hand_landmarks:
-                for hand_index in range(2):
-                    if hand_index < len(results.multi_hand_landmarks):
-                        hand_landmarks = results.multi_hand_landmarks[hand_index]
-                        wrist = hand_landmarks.landmark[0]
-                        wrist_x, wrist_y, wrist_z = wrist.x, wrist.y, wrist.z
-
-                        for lm in hand_landmarks.landmark:
-                            # Normalize based on wrist
-                            frame_landmarks.extend([
-                                (lm.x - wrist_x),
-                                (lm.y - wrist_y),
-                                (lm.z - wrist_z)
-                            ])
-                    else:
-                        frame_landmarks.extend([0.0] * (21 * 3))
-            else:
-                print(f"⚠️ No hand detected in frame {i}, padding...")
-                frame_landmarks.extend([0.0] * (42 * 3))
-
-            # Ensure each frame is exactly 126 values
-            frame_landmarks = frame_landmarks[:126] + [0.0] * (126 - len(frame_landmarks))
-            sequence.append(frame_landmarks)
-
-        # Pad/truncate to 30 frames
-        while len(sequence) < 30:
-            sequence.append([0.0] * 126)
-        sequence = sequence[:30]
-
-        input_data = np.array(sequence).reshape(1, 30, 126)
+    def predict_word(self, frames, session_id=None):
+        # frames: BGR arrays or undecoded JPEG bytes
+        start = time.perf_counter()
+        stages = self.metrics.stages('word')
+        frame_hands = self.extract_sequence(frames, session_id, stages)
+
+        missing = [i for i, hands in enumerate(frame_hands) if not hands]
+        self.metrics.observe('asl_frames_per_request', len(frame_hands), FRAME_BUCKETS, endpoint='word')
+        self.metrics.increment('asl_frames_total', len(frame_hands), endpoint='word')
+        if missing:
+            self.metrics.increment('asl_hand_detection_misses_total', len(missing), endpoint='word')
+            log_event(logger, 'no_hand_detected', endpoint='word', frames=missing)
+
+        with stages('features'):
+            input_data = self.word_features.from_hands(frame_hands)
+        prediction = self._predict_word_input(input_data, 'word')
+        self._record('word', frame_hands, prediction, start, session_id)
+        return prediction
+
+    def extract_sequence(self, frames, session_id=None, stages=NULL_STAGES):
+        """
+        Hands for every frame of a word sequence.
+
+        With a keyframe selector only the frames that moved are run through
+        hand detection; the others get landmarks interpolated from their
+        neighbouring keyframes.
+
+        Returns:
+        - One hands list per frame
+        """
+        self._ensure_loaded('hands')
+        if self.keyframes is None:
+            return self._extract_frames(frames, session_id, stages)
+
+        frames = list(frames)
+        if not frames:
+            return []
+        with stages('keyframes'):
+            selected = self.keyframes.select(frames)
+        self.metrics.increment('asl_keyframes_total', len(selected), endpoint='word')
+        extracted = self._extract_frames([frames[i] for i in selected], session_id, stages)
+        return interpolate_hands(len(frames), dict(zip(selected, extracted)))
+
+    def _extract_frames(self, frames, session_id, stages):
+        if self.frame_extractor is not None:
+            # Frames are spread over the extraction workers, results come back in order
+            return self.frame_extractor.extract(frames, self.landmark_cache, stages, self._static_roi, self.hand_gate,
+                                                cache_scope(session_id, 'word'))
+        else:
+            # One graph tracks the whole sequence; without a session it starts
+            # from a clean tracking state, and so does the crop
+            roi = self._session_roi(session_id) if session_id is not None else self._new_roi()
+            with self.hands_pool.acquire(session_id, reset=session_id is None) as hands_graph:
+                scope = cache_scope(session_id, 'word')
+                frame_hands = [self._extract_frame(frame, hands_graph, i, stages, roi, scope)
+                               for i, frame in enumerate(frames)]
+        return frame_hands
+
+    def extract_hands(self, frame, session_id=None, endpoint='alphabet'):
+        # Returns one list of 21 (x, y, z) landmarks per detected hand
+        self._ensure_loaded('hands')
+        roi = self._session_roi(session_id)
+        with self.hands_pool.acquire(session_id) as hands_graph:
+            return self._extract_frame(frame, hands_graph, stages=self.metrics.stages(endpoint), roi=roi,
+                                       scope=cache_scope(session_id, endpoint))
+
+    def _extract_frame(self, frame, hands_graph, index=0, stages=NULL_STAGES, roi=None, scope=None):
+        if self.landmark_cache is None:
+            return extract_frame_hands(frame, hands_graph, index, stages, roi, self.hand_gate)
+        return self.landmark_cache.get_or_extract(
+            frame, lambda decoded: extract_frame_hands(decoded, hands_graph, index, stages, roi, self.hand_gate),
+            index, scope)
+
+    def predict_word_landmarks(self, frames, session_id=None):
+        # frames: (N, H, 21, 3) landmarks computed by the client; a hand that
+        # was not detected is sent as zeros and stays zero after normalization
+        start = time.perf_counter()
+        frames = np.nan_to_num(np.asarray(frames, dtype=np.float64))
+        self.metrics.observe('asl_frames_per_request', len(frames), FRAME_BUCKETS, endpoint='word_landmarks')
+        self.metrics.increment('asl_frames_total', len(frames), endpoint='word_landmarks')
+        with self.metrics.stages('word_landmarks')('features'):
+            input_data = self.word_features.from_array(frames)
+        prediction = self._predict_word_input(input_data, 'word_landmarks')
+        self._record('word_landmarks', frames, prediction, start, session_id)
+        return prediction
+
+    def predict_word_sequence(self, sequence, endpoint='stream'):
+        # sequence: one 126-value word_frame_features row per frame
+        with self.metrics.stages(endpoint)('features'):
+            input_data = self.word_features.from_rows(sequence)
+        return self._predict_word_input(input_data, endpoint)
+
+    def new_word_stream(self):
+        # Fresh recurrent state for one incremental word stream
+        self._ensure_loaded('incremental')
+        return self.word_scorer.new_state()
+
+    def score_word_frame(self, state, frames):
+        """
+        Score a stream after its newest frame, in constant time per frame.
+
+        Parameters:
+        - state: State from new_word_stream(), advanced in place
+        - frames: The stream's window of word_frame_features rows, newest last
+
+        Returns:
+        - (predicted word, {word: probability})
+        """
+        self._ensure_loaded('incremental')
+        self._ensure_loaded('labels')
+        with self.metrics.stages('stream')('model'):
+            probabilities = self.word_scorer.push(state, frames)
+        predicted_word = self.label_encoder.inverse_transform([int(np.argmax(probabilities))])[0]
+        return predicted_word, {str(word): float(p) for word, p in zip(self.label_encoder.classes_, probabilities)}
+
+    def _predict_word_input(self, input_data, endpoint):
+        # input_data: (1, 30, 126) features, padded/truncated to 30 frames
 
         # Standardization (if used in training)
         if hasattr(self, "scaler"):
             input_data = self.scaler.transform(input_data.reshape(-1, 126)).reshape(1, 30, 126)
 
-        print(f"✅ Input shape for model: {input_data.shape}")
-        print(f"📸 First frame preview: {input_data[0][0][:10]}...")
-
         try:
-            print("🔮 Predicting...")
-            prediction = self.word_model.predict(input_data)
-            print(f"📈 Prediction: {prediction}")
-            print(f"📊 Softmax sum: {np.sum(prediction)}")
+            with self.metrics.stages(endpoint)('model'):
+                prediction = self._run_word_model(input_data)
 
             predicted_class = np.argmax(prediction, axis=1)
-            print(f"✅ Class Index: {predicted_class[0]}")
-
+            self._ensure_loaded('labels')
             predicted_word = self.label_encoder.inverse_transform(predicted_class)[0]
-            print(f"🎉 Predicted Word: {predicted_word}")
+            log_event(logger, 'word_prediction', endpoint=endpoint, input_shape=input_data.shape,
+                      first_frame=input_data[0][0][:10].tolist(), prediction=prediction.tolist(),
+                      softmax_sum=float(np.sum(prediction)), class_index=int(predicted_class[0]),
+                      label=predicted_word)
             return predicted_word
 
         except Exception as e:
-            print(f"❌ Prediction error: {e}")
+            log_event(logger, 'prediction_error', logging.ERROR, endpoint=endpoint, error=str(e))
             return None
 
     def release(self):
-        self.hands.close() 
\ No newline at end of file
+        for batcher in (self.alphabet_batcher, self.word_batcher):
+            if batcher is not None:
+                batcher.close()
+        if self.frame_extractor is not None:
+            self.frame_extractor.close()
+        if self.hands_pool is not None:
+            self.hands_pool.close()
+        if self.debug_capture is not None:
+            self.debug_capture.close()
+        if self.recorder is not None:
+            self.recorder.close() 
\ No newline at end of file
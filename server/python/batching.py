@@ -0,0 +1,138 @@
+import threading
+import time
+import queue
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class BatchStats:
+    """
+    Running batch-size and queue-wait statistics for a MicroBatcher.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.samples = 0
+        self.max_batch_size = 0
+        self.batch_size_counts = {}
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.total_run_ms = 0.0
+
+    def record(self, batch_size, waits_ms, run_ms):
+        with self._lock:
+            self.batches += 1
+            self.samples += batch_size
+            self.max_batch_size = max(self.max_batch_size, batch_size)
+            self.batch_size_counts[batch_size] = self.batch_size_counts.get(batch_size, 0) + 1
+            self.total_wait_ms += sum(waits_ms)
+            self.max_wait_ms = max(self.max_wait_ms, max(waits_ms))
+            self.total_run_ms += run_ms
+
+    def snapshot(self):
+        with self._lock:
+            batches = max(self.batches, 1)
+            samples = max(self.samples, 1)
+            return {
+                'batches': self.batches,
+                'samples': self.samples,
+                'mean_batch_size': self.samples / batches,
+                'max_batch_size': self.max_batch_size,
+                'batch_size_counts': dict(sorted(self.batch_size_counts.items())),
+                'mean_queue_wait_ms': self.total_wait_ms / samples,
+                'max_queue_wait_ms': self.max_wait_ms,
+                'mean_run_ms': self.total_run_ms / batches,
+            }
+
+
+class MicroBatcher:
+    """
+    Gathers concurrent single-sample requests into one forward pass.
+
+    Parameters:
+    - run_fn: Callable taking a stacked (B, ...) batch and returning (B, ...) outputs
+    - max_wait_ms: How long the first queued sample waits for company
+    - max_batch_size: Flush as soon as this many samples are queued
+    - name: Used for the worker thread name
+
+    submit() blocks the calling (request) thread until its row of the
+    batched output is available, so it can be dropped in wherever a
+    per-request model.predict(x) call used to be.
+    """
+
+    def __init__(self, run_fn, max_wait_ms=5.0, max_batch_size=32, name='batcher'):
+        self.run_fn = run_fn
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.stats = BatchStats()
+        self._queue = queue.Queue()
+        self._closed = False
+        # Held while checking _closed and queueing, so close() cannot slip its
+        # stop marker in front of a sample whose future nobody would resolve
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, sample):
+        """
+        Queue one sample (without batch dimension) and wait for its output row.
+        """
+        return self.submit_async(sample).result()
+
+    def submit_async(self, sample):
+        sample = np.asarray(sample, dtype=np.float32)
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('MicroBatcher is closed')
+            self._queue.put((sample, future, time.perf_counter()))
+        return future
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._queue.put(None)
+        self._worker.join()
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = first[2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is None:
+                # Finish the current batch, then stop on the next loop
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+
+            start = time.perf_counter()
+            waits_ms = [(start - enqueued) * 1000.0 for _, _, enqueued in batch]
+            try:
+                outputs = self.run_fn(np.stack([sample for sample, _, _ in batch]))
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            run_ms = (time.perf_counter() - start) * 1000.0
+            self.stats.record(len(batch), waits_ms, run_ms)
+
+            for i, (_, future, _) in enumerate(batch):
+                future.set_result(outputs[i])
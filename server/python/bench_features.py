@@ -0,0 +1,99 @@
+import argparse
+import time
+
+import numpy as np
+
+from features import WordFeatureBuilder, alphabet_features
+
+
+def legacy_word_input(frame_hands):
+    # The list-building predict_word loop this module replaced
+    sequence = []
+    for hands in frame_hands:
+        frame_landmarks = []
+        if hands:
+            for hand_index in range(2):
+                if hand_index < len(hands):
+                    wrist_x, wrist_y, wrist_z = hands[hand_index][0]
+                    for x, y, z in hands[hand_index]:
+                        frame_landmarks.extend([(x - wrist_x), (y - wrist_y), (z - wrist_z)])
+                else:
+                    frame_landmarks.extend([0.0] * (21 * 3))
+        else:
+            frame_landmarks.extend([0.0] * (42 * 3))
+        frame_landmarks = frame_landmarks[:126] + [0.0] * (126 - len(frame_landmarks))
+        sequence.append(frame_landmarks)
+
+    while len(sequence) < 30:
+        sequence.append([0.0] * 126)
+    sequence = sequence[:30]
+    return np.array(sequence).reshape(1, 30, 126)
+
+
+def legacy_alphabet_features(hands):
+    landmarks = []
+    for hand in hands:
+        for x, y, z in hand:
+            landmarks.extend([x, y, z])
+    landmarks = np.array(landmarks)
+    landmarks -= np.min(landmarks)
+    landmarks /= np.ptp(landmarks)
+    return landmarks
+
+
+def random_sequence(rng, frames, miss_rate=0.2):
+    # MediaPipe hands as Python floats holding float32 values
+    sequence = []
+    for _ in range(frames):
+        if rng.random() < miss_rate:
+            sequence.append([])
+        else:
+            hand = rng.random((21, 3), dtype=np.float32)
+            sequence.append([[tuple(float(v) for v in point) for point in hand]])
+    return sequence
+
+
+def time_calls(fn, args, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(args)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the vectorized feature builder with the list-based code")
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    builder = WordFeatureBuilder()
+
+    # Outputs must match exactly at the float32 precision the models consume
+    for frames in (0, 1, 17, 30, 45):
+        sequence = random_sequence(rng, frames)
+        expected = legacy_word_input(sequence).astype(np.float32)
+        assert np.array_equal(builder.from_hands(sequence), expected), f"word mismatch for {frames} frames"
+        if frames:
+            array = np.array([hands[0] if hands else np.zeros((21, 3)) for hands in sequence])
+            assert np.array_equal(builder.from_array(array[:, None]), expected), f"array mismatch for {frames} frames"
+    for _ in range(100):
+        hands = random_sequence(rng, 1, miss_rate=0)[0]
+        assert np.array_equal(alphabet_features(hands), legacy_alphabet_features(hands)), "alphabet mismatch"
+    print("Outputs identical to the list-based implementation")
+
+    sequence = random_sequence(rng, 30)
+    array = np.array([hands[0] if hands else np.zeros((21, 3)) for hands in sequence])[:, None]
+    hands = random_sequence(rng, 1, miss_rate=0)[0]
+    cases = [
+        ('word, list-based', legacy_word_input, sequence),
+        ('word, from_hands', builder.from_hands, sequence),
+        ('word, from_array', builder.from_array, array),
+        ('alphabet, list-based', legacy_alphabet_features, hands),
+        ('alphabet, vectorized', alphabet_features, hands),
+    ]
+    for name, fn, fn_args in cases:
+        print(f"{name:<22} {time_calls(fn, fn_args, args.iterations):8.1f} us/call")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+import argparse
+import time
+
+import numpy as np
+
+from asl_predictor import ASLPredictor
+
+
+def time_calls(fn, batch, iterations):
+    fn(batch)  # exclude one-off setup from the measurement
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(batch)
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return np.array(timings)
+
+
+def report(name, timings):
+    print(f"  {name:<22} mean {timings.mean():7.3f} ms   "
+          f"p50 {np.percentile(timings, 50):7.3f} ms   p95 {np.percentile(timings, 95):7.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Keras predict() against the traced inference path")
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=8, help="Batch size for the batched word case")
+    args = parser.parse_args()
+
+    predictor = ASLPredictor(use_compiled_inference=True)
+    rng = np.random.default_rng(0)
+
+    cases = [
+        ('alphabet (1, 1, F)', predictor.alphabet_model, predictor.alphabet_runner, 1),
+        ('word (1, 30, 126)', predictor.word_model, predictor.word_runner, 1),
+        (f'word ({args.batch_size}, 30, 126)', predictor.word_model, predictor.word_runner, args.batch_size),
+    ]
+    for name, model, runner, batch_size in cases:
+        batch = rng.random((batch_size,) + runner.input_shape, dtype=np.float32)
+        np.testing.assert_allclose(model.predict(batch, verbose=0), runner(batch), rtol=1e-5, atol=1e-6)
+
+        predict_ms = time_calls(lambda x: model.predict(x, verbose=0), batch, args.iterations)
+        traced_ms = time_calls(runner, batch, args.iterations)
+        print(f"{name}:")
+        report('model.predict()', predict_ms)
+        report('CompiledModel', traced_ms)
+        print(f"  speedup {predict_ms.mean() / traced_ms.mean():.1f}x")
+
+    predictor.release()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,9 @@
+"""
+End-to-end serving benchmarks.
+
+- fixtures: recorded (or synthesized) JPEG sequences with their landmarks
+- harness: drives ASLPredictor in-process and the Flask endpoints through
+  the test client at configurable concurrency, and reports JSON
+
+Run from server/python, e.g. python -m benchmarks.harness --help
+"""
@@ -0,0 +1,222 @@
+import argparse
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCHMARKS_DIR, 'fixtures')
+SYNTHETIC_DIR = os.path.join(FIXTURES_DIR, 'synthetic')
+SEED_IMAGE = os.path.join(os.path.dirname(BENCHMARKS_DIR), 'input_frame.jpg')
+JPEG_QUALITY = 80
+
+# Bumped when synthesize_fixture changes, so stale synthetic sets are rewritten
+SYNTHETIC_VERSION = 2
+
+# Wrist to each finger base, then along each finger (MediaPipe's landmark numbering)
+HAND_CONNECTIONS = [(0, 1), (0, 5), (0, 9), (0, 13), (0, 17)] + \
+    [(base + i, base + i + 1) for base in (1, 5, 9, 13, 17) for i in range(3)]
+
+
+class Fixture:
+    """
+    One recorded gesture: the JPEG frames as the client sends them and the
+    landmarks MediaPipe found in them.
+
+    Parameters:
+    - name: Fixture (directory) name
+    - frames: List of JPEG-encoded frames
+    - landmarks: float32 array of shape (frames, hands, 21, 3), zeros where no hand was found
+    - meta: Free-form description (source, fps, label, ...)
+    """
+
+    def __init__(self, name, frames, landmarks, meta=None):
+        self.name = name
+        self.frames = frames
+        self.landmarks = landmarks
+        self.meta = meta or {}
+
+    @property
+    def synthetic(self):
+        return self.meta.get('source') == 'synthetic'
+
+    def decoded_frames(self):
+        return [cv2.imdecode(np.frombuffer(frame, np.uint8), cv2.IMREAD_COLOR) for frame in self.frames]
+
+
+def save_fixture(fixture, directory=FIXTURES_DIR):
+    path = os.path.join(directory, fixture.name)
+    os.makedirs(path, exist_ok=True)
+    for i, frame in enumerate(fixture.frames):
+        with open(os.path.join(path, f'frame_{i:03d}.jpg'), 'wb') as f:
+            f.write(frame)
+    np.save(os.path.join(path, 'landmarks.npy'), fixture.landmarks.astype(np.float32))
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump(fixture.meta, f, indent=2)
+    return path
+
+
+def load_fixture_meta(path):
+    meta_path = os.path.join(path, 'meta.json')
+    if not os.path.exists(meta_path):
+        return {}
+    with open(meta_path, 'r') as f:
+        return json.load(f)
+
+
+def load_fixture(path):
+    frame_files = sorted(name for name in os.listdir(path) if name.endswith('.jpg'))
+    frames = []
+    for name in frame_files:
+        with open(os.path.join(path, name), 'rb') as f:
+            frames.append(f.read())
+    landmarks = np.load(os.path.join(path, 'landmarks.npy'))
+    return Fixture(os.path.basename(path), frames, landmarks, load_fixture_meta(path))
+
+
+def load_fixtures(directory=FIXTURES_DIR):
+    """
+    Load every fixture under directory (recursively), synthesizing the
+    default set first when there are no recordings.
+
+    Returns:
+    - List of Fixture, sorted by name
+    """
+    paths = sorted(root for root, _, files in os.walk(directory) if 'landmarks.npy' in files) \
+        if os.path.isdir(directory) else []
+    if not paths or (directory == FIXTURES_DIR and _stale_synthetic(paths)):
+        synthesize_fixtures()
+        paths = sorted(root for root, _, files in os.walk(SYNTHETIC_DIR) if 'landmarks.npy' in files)
+    return [load_fixture(path) for path in paths]
+
+
+def _stale_synthetic(paths):
+    # Only synthetic fixtures, written by an older synthesize_fixture
+    metas = [load_fixture_meta(path) for path in paths]
+    return all(meta.get('source') == 'synthetic' for meta in metas) and \
+        any(meta.get('version') != SYNTHETIC_VERSION for meta in metas)
+
+
+def synthesize_fixture(name, seed_image, frames=30, seed=0):
+    """
+    Deterministic stand-in for a recording: the seed image drifting and
+    rotating slightly from frame to frame, with a hand skeleton drawn on it.
+
+    The landmarks are the drawn skeleton's points, moved by the same warp as
+    the image plus a small random-walk articulation, so pixel motion and
+    landmark motion agree. They are not what MediaPipe would find in the
+    frames; accuracy figures on these fixtures only check self-consistency.
+    """
+    rng = np.random.default_rng(seed)
+    height, width = seed_image.shape[:2]
+    shift = np.zeros(2)
+    angle = 0.0
+    pose = rng.uniform(0.3, 0.7, (21, 3))
+    pose[:, 2] = rng.normal(0.0, 0.02, 21)
+    size = np.array([width, height], dtype=np.float64)
+
+    encoded, landmarks = [], []
+    for _ in range(frames):
+        shift += rng.normal(0.0, 2.0, 2)
+        angle += rng.normal(0.0, 0.5)
+        pose[:, :2] += rng.normal(0.0, 0.005, (21, 2))
+        matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+        matrix[:, 2] += shift
+        frame = cv2.warpAffine(seed_image, matrix, (width, height), borderMode=cv2.BORDER_REFLECT)
+
+        # The hand as drawn in this frame, in pixels and as normalized landmarks
+        points = pose[:, :2] * size @ matrix[:, :2].T + matrix[:, 2]
+        for a, b in HAND_CONNECTIONS:
+            cv2.line(frame, tuple(np.round(points[a]).astype(int)), tuple(np.round(points[b]).astype(int)),
+                     (120, 160, 220), 3)
+        for point in points:
+            cv2.circle(frame, tuple(np.round(point).astype(int)), 4, (60, 90, 200), -1)
+        encoded.append(cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])[1].tobytes())
+
+        hand = np.column_stack([points / size, pose[:, 2]])
+        landmarks.append(hand[None].astype(np.float32))
+
+    meta = {'source': 'synthetic', 'version': SYNTHETIC_VERSION, 'seed': seed, 'frames': frames}
+    return Fixture(name, encoded, np.stack(landmarks).astype(np.float32), meta)
+
+
+def synthesize_fixtures(count=3, frames=30, seed_image_path=SEED_IMAGE, directory=SYNTHETIC_DIR):
+    seed_image = cv2.imread(seed_image_path)
+    if seed_image is None:
+        # No sample frame on disk: fall back to deterministic noise
+        seed_image = np.random.default_rng(0).integers(0, 256, (480, 640, 3), dtype=np.uint8)
+    return [save_fixture(synthesize_fixture(f'synthetic_{i}', seed_image, frames, seed=i), directory)
+            for i in range(count)]
+
+
+def record_fixture(name, source=0, frames=30, fps=None, label=None):
+    """
+    Record a gesture from a camera index or video file, with its landmarks.
+    """
+    import mediapipe as mp
+    from parallel_extraction import extract_frame_hands
+
+    capture = cv2.VideoCapture(source)
+    if not capture.isOpened():
+        raise RuntimeError(f"Could not open video source {source!r}")
+    hands_graph = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=1, min_detection_confidence=0.5)
+
+    encoded, landmarks = [], []
+    interval = 1.0 / fps if fps else 0.0
+    try:
+        while len(encoded) < frames:
+            start = time.perf_counter()
+            ok, frame = capture.read()
+            if not ok:
+                break
+            jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])[1].tobytes()
+            hands = extract_frame_hands(jpeg, hands_graph)
+            encoded.append(jpeg)
+            landmarks.append(np.array(hands[:1], dtype=np.float32).reshape(-1, 21, 3) if hands
+                             else np.zeros((1, 21, 3), dtype=np.float32))
+            time.sleep(max(0.0, interval - (time.perf_counter() - start)))
+    finally:
+        capture.release()
+        hands_graph.close()
+
+    if not encoded:
+        raise RuntimeError(f"No frames read from {source!r}")
+    meta = {'source': str(source), 'frames': len(encoded), 'fps': fps, 'label': label}
+    return Fixture(name, encoded, np.stack(landmarks), meta)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or synthesize benchmark fixtures")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    record = subparsers.add_parser('record', help="Record a gesture from a camera or video file")
+    record.add_argument('name')
+    record.add_argument('--source', default='0', help="Camera index or video path")
+    record.add_argument('--frames', type=int, default=30)
+    record.add_argument('--fps', type=float, default=None)
+    record.add_argument('--label', default=None, help="Word or letter being signed")
+
+    synthesize = subparsers.add_parser('synthesize', help="Write the deterministic synthetic set")
+    synthesize.add_argument('--count', type=int, default=3)
+    synthesize.add_argument('--frames', type=int, default=30)
+
+    subparsers.add_parser('list', help="List the fixtures the harness will use")
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        source = int(args.source) if args.source.isdigit() else args.source
+        path = save_fixture(record_fixture(args.name, source, args.frames, args.fps, args.label))
+        print(f"Saved {path}")
+    elif args.command == 'synthesize':
+        for path in synthesize_fixtures(args.count, args.frames):
+            print(f"Saved {path}")
+    else:
+        for fixture in load_fixtures():
+            detected = int(np.any(fixture.landmarks != 0, axis=(1, 2, 3)).sum())
+            print(f"{fixture.name}: {len(fixture.frames)} frames, hands in {detected}, {fixture.meta}")
+
+
+if __name__ == '__main__':
+    main()
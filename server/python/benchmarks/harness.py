@@ -0,0 +1,266 @@
+import argparse
+import base64
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from benchmarks.fixtures import load_fixtures
+
+PYTHON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = os.path.dirname(os.path.dirname(PYTHON_DIR))
+ENDPOINTS = ('alphabet', 'word', 'alphabet_landmarks', 'word_landmarks')
+TARGETS = ('predictor', 'flask')
+
+
+def data_url(jpeg):
+    return 'data:image/jpeg;base64,' + base64.b64encode(jpeg).decode('ascii')
+
+
+def predictor_workload(predictor, fixtures, endpoint):
+    """
+    Zero-argument callables, one per distinct request, calling ASLPredictor directly.
+    Alphabet frames are decoded up front, as the server does before predict_alphabet.
+    """
+    if endpoint == 'alphabet':
+        frames = [frame for fixture in fixtures for frame in fixture.decoded_frames()]
+        return [lambda frame=frame: predictor.predict_alphabet(frame) for frame in frames]
+    if endpoint == 'word':
+        return [lambda frames=fixture.frames: predictor.predict_word(frames) for fixture in fixtures]
+    if endpoint == 'alphabet_landmarks':
+        hands = [frame for fixture in fixtures for frame in fixture.landmarks]
+        return [lambda frame=frame: predictor.predict_alphabet_landmarks(frame) for frame in hands]
+    return [lambda landmarks=fixture.landmarks: predictor.predict_word_landmarks(landmarks) for fixture in fixtures]
+
+
+def flask_workload(app, fixtures, endpoint):
+    """
+    Zero-argument callables posting each request through a per-thread test client,
+    in the payload formats the frontend uses.
+    """
+    local = threading.local()
+
+    def post(path, **kwargs):
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        response = local.client.post(path, **kwargs)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{path} returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+        return response
+
+    def post_landmarks(path, landmarks):
+        return post(path, data=np.ascontiguousarray(landmarks, dtype='<f4').tobytes(),
+                    content_type='application/octet-stream',
+                    headers={'X-Landmark-Hands': str(landmarks.shape[-3])})
+
+    if endpoint == 'alphabet':
+        bodies = [{'image': data_url(frame)} for fixture in fixtures for frame in fixture.frames]
+        return [lambda body=body: post('/predict/alphabet', json=body) for body in bodies]
+    if endpoint == 'word':
+        bodies = [{'frames': [data_url(frame) for frame in fixture.frames]} for fixture in fixtures]
+        return [lambda body=body: post('/predict/word', json=body) for body in bodies]
+    if endpoint == 'alphabet_landmarks':
+        hands = [frame for fixture in fixtures for frame in fixture.landmarks]
+        return [lambda frame=frame: post_landmarks('/predict/alphabet/landmarks', frame) for frame in hands]
+    return [lambda landmarks=fixture.landmarks: post_landmarks('/predict/word/landmarks', landmarks)
+            for fixture in fixtures]
+
+
+def run_load(workload, requests, concurrency):
+    """
+    Issue `requests` calls, cycling through the workload, from `concurrency` threads.
+
+    Returns:
+    - (latencies in ms, error messages, wall time in seconds)
+    """
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def call(i):
+        start = time.perf_counter()
+        try:
+            workload[i % len(workload)]()
+        except Exception as e:
+            with lock:
+                errors.append(str(e))
+            return
+        elapsed = (time.perf_counter() - start) * 1000.0
+        with lock:
+            latencies.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency, thread_name_prefix='bench') as executor:
+        list(executor.map(call, range(requests)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def latency_summary(latencies):
+    if not latencies:
+        return None
+    values = np.asarray(latencies)
+    return {
+        'mean': float(values.mean()),
+        'p50': float(np.percentile(values, 50)),
+        'p95': float(np.percentile(values, 95)),
+        'p99': float(np.percentile(values, 99)),
+        'max': float(values.max()),
+    }
+
+
+def stage_breakdown(metrics):
+    # asl_stage_seconds histograms, converted to milliseconds, by endpoint and stage
+    stages = {}
+    for histogram in metrics.snapshot()['histograms']:
+        if histogram['name'] != 'asl_stage_seconds':
+            continue
+        labels = histogram['labels']
+        stages.setdefault(labels['endpoint'], {})[labels['stage']] = {
+            'count': histogram['count'],
+            **{key: histogram[key] * 1000.0 if histogram[key] is not None else None
+               for key in ('mean', 'p50', 'p95', 'p99')},
+        }
+    return stages
+
+
+def predictor_options(args):
+    return {
+        'engine': args.engine,
+        'model_variant': args.model_variant,
+        'batch_window_ms': args.batch_window_ms,
+        'extraction_workers': args.extraction_workers,
+        'landmark_cache_size': args.landmark_cache_size,
+        'detection_size': args.detection_size,
+        'roi_tracking': args.roi_tracking,
+    }
+
+
+def build_predictor(args):
+    from asl_predictor import ASLPredictor
+    return ASLPredictor(**predictor_options(args))
+
+
+def build_flask_app(args):
+    # The root server.py reads its configuration from the environment at import time
+    environment = {
+        'ASL_ENGINE': args.engine,
+        'ASL_MODEL_VARIANT': args.model_variant or '',
+        'ASL_STARTUP': 'eager',
+        'ASL_EXTRACTION_WORKERS': str(args.extraction_workers or 0),
+        'ASL_LANDMARK_CACHE_SIZE': str(args.landmark_cache_size),
+        'ASL_DETECTION_SIZE': str(args.detection_size or 0),
+        'ASL_ROI_TRACKING': '1' if args.roi_tracking else '0',
+    }
+    if args.batch_window_ms is not None:
+        environment['ASL_BATCH_WINDOW_MS'] = str(args.batch_window_ms)
+    os.environ.update(environment)
+
+    spec = importlib.util.spec_from_file_location('asl_server', os.path.join(ROOT_DIR, 'server.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline):
+    # One line per (target, endpoint, concurrency) present in both reports
+    previous = {(r['target'], r['endpoint'], r['concurrency']): r for r in baseline['results']}
+    print(f"Compared with {baseline.get('commit') or 'baseline'}:")
+    for result in report['results']:
+        key = (result['target'], result['endpoint'], result['concurrency'])
+        before = previous.get(key)
+        if before is None or not result['latency_ms'] or not before['latency_ms']:
+            continue
+        throughput = result['requests_per_s'] / before['requests_per_s'] - 1.0
+        p95 = result['latency_ms']['p95'] / before['latency_ms']['p95'] - 1.0
+        print(f"  {key[0]:<9} {key[1]:<18} c={key[2]:<3} requests/s {throughput:+7.1%}   p95 {p95:+7.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the predictor and the Flask endpoints on recorded fixtures")
+    parser.add_argument('--targets', nargs='+', choices=TARGETS, default=list(TARGETS))
+    parser.add_argument('--endpoints', nargs='+', choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--requests', type=int, default=100, help="Measured requests per run")
+    parser.add_argument('--warmup', type=int, default=5, help="Unmeasured requests before each run")
+    parser.add_argument('--engine', choices=['keras', 'numpy'], default='keras')
+    parser.add_argument('--model-variant', choices=['float16', 'int8'], default=None,
+                        help="Reduced-precision weights written by inspect_models.py quantize")
+    parser.add_argument('--batch-window-ms', type=float, default=None)
+    parser.add_argument('--extraction-workers', type=int, default=None)
+    parser.add_argument('--landmark-cache-size', type=int, default=0)
+    parser.add_argument('--detection-size', type=int, default=None, help="Downscale frames before MediaPipe")
+    parser.add_argument('--roi-tracking', action='store_true', help="Crop word sequences around the tracked hand")
+    parser.add_argument('--output', help="Write the JSON report here instead of stdout")
+    parser.add_argument('--compare', help="Earlier JSON report to print deltas against")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures()
+    report = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'fixtures': [{'name': f.name, 'frames': len(f.frames), 'source': f.meta.get('source')} for f in fixtures],
+        'config': {**predictor_options(args), 'requests': args.requests, 'warmup': args.warmup},
+        'results': [],
+    }
+
+    for target in args.targets:
+        if target == 'predictor':
+            predictor = build_predictor(args)
+            metrics = predictor.metrics
+            workloads = {endpoint: predictor_workload(predictor, fixtures, endpoint) for endpoint in args.endpoints}
+        else:
+            server = build_flask_app(args)
+            predictor, metrics = server.predictor, server.metrics
+            workloads = {endpoint: flask_workload(server.app, fixtures, endpoint) for endpoint in args.endpoints}
+
+        for endpoint, workload in workloads.items():
+            for concurrency in args.concurrency:
+                run_load(workload, args.warmup, concurrency)
+                metrics.reset()
+                latencies, errors, wall = run_load(workload, args.requests, concurrency)
+                report['results'].append({
+                    'target': target,
+                    'endpoint': endpoint,
+                    'concurrency': concurrency,
+                    'requests': args.requests,
+                    'errors': len(errors),
+                    'first_error': errors[0] if errors else None,
+                    'wall_s': wall,
+                    'requests_per_s': len(latencies) / wall if wall else 0.0,
+                    'latency_ms': latency_summary(latencies),
+                    'stages_ms': stage_breakdown(metrics),
+                })
+        predictor.release()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+        print(f"Wrote {args.output}")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            compare(report, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
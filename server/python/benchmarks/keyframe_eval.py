@@ -0,0 +1,82 @@
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.fixtures import load_fixtures
+from keyframes import KeyframeSelector, interpolate_hands
+
+
+def fixture_hands(landmarks):
+    # (frames, hands, 21, 3) fixture landmarks as per-frame hands lists, dropping all-zero hands
+    return [[[tuple(point) for point in hand] for hand in frame if np.any(hand)] for frame in landmarks]
+
+
+def landmark_error(exact, approximate):
+    # Mean distance between landmarks of frames that have the same number of hands in both
+    errors = [np.linalg.norm(np.asarray(a) - np.asarray(b), axis=-1).mean()
+              for a, b in zip(exact, approximate) if a and len(a) == len(b)]
+    return float(np.mean(errors)) if errors else 0.0
+
+
+def extraction_cpu(predictor, fixtures, repeats):
+    # Process CPU seconds spent extracting hands from every fixture sequence
+    start = time.process_time()
+    for _ in range(repeats):
+        for fixture in fixtures:
+            predictor.extract_sequence(fixture.frames)
+    return time.process_time() - start
+
+
+def main():
+    from asl_predictor import ASLPredictor
+
+    parser = argparse.ArgumentParser(description="Measure the accuracy and CPU cost of keyframe selection on the fixtures")
+    parser.add_argument('--thresholds', type=float, nargs='+', default=[2.0, 4.0, 8.0])
+    parser.add_argument('--max-gap', type=int, default=4)
+    parser.add_argument('--engine', choices=['keras', 'numpy'], default='keras')
+    parser.add_argument('--repeats', type=int, default=3, help="Passes over the fixtures for the CPU measurement")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures()
+    predictor = ASLPredictor(engine=args.engine, lazy=True)
+    predictor.preload(['hands', 'word'])
+
+    # Reference: the word model on the landmarks of every frame
+    exact = [fixture_hands(fixture.landmarks) for fixture in fixtures]
+    reference = [predictor.word_runner(predictor.word_features.from_hands(hands).copy())[0] for hands in exact]
+
+    baseline_cpu = extraction_cpu(predictor, fixtures, args.repeats)
+    frame_count = sum(len(fixture.frames) for fixture in fixtures)
+    print(f"{len(fixtures)} fixtures, {frame_count} frames; full extraction {baseline_cpu:.2f}s CPU")
+    synthetic = sum(fixture.synthetic for fixture in fixtures)
+    if synthetic:
+        print(f"Note: {synthetic} fixtures are synthetic (landmarks follow drawn markers, not MediaPipe); "
+              f"record real gestures with benchmarks.fixtures before relying on the agreement figures")
+
+    for threshold in args.thresholds:
+        selector = KeyframeSelector(threshold, args.max_gap)
+        agree, prob_diff, errors = 0, 0.0, []
+        for fixture, hands, expected in zip(fixtures, exact, reference):
+            selected = selector.select(fixture.frames)
+            approximate = interpolate_hands(len(hands), {i: hands[i] for i in selected})
+            probabilities = predictor.word_runner(predictor.word_features.from_hands(approximate).copy())[0]
+            agree += int(np.argmax(probabilities) == np.argmax(expected))
+            prob_diff = max(prob_diff, float(np.max(np.abs(probabilities - expected))))
+            errors.append(landmark_error(hands, approximate))
+
+        predictor.keyframes = KeyframeSelector(threshold, args.max_gap)
+        cpu = extraction_cpu(predictor, fixtures, args.repeats)
+        predictor.keyframes = None
+
+        stats = selector.stats()
+        print(f"  threshold {threshold:<5} keyframes {stats['keyframes']:>4}/{stats['frames']:<4} "
+              f"({1.0 - stats['skip_rate']:6.1%})   top-1 agreement {agree / len(fixtures):6.1%}   "
+              f"max prob diff {prob_diff:.4f}   landmark error {np.mean(errors):.4f}   "
+              f"CPU {cpu:.2f}s ({cpu / baseline_cpu - 1.0:+.1%})")
+
+    predictor.release()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+import itertools
+import json
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+
+import cv2
+
+
+class DebugCapture:
+    """
+    Bounded in-memory record of recent frames, their landmarks and the
+    prediction made for them, replacing the per-request
+    cv2.imwrite("input_frame.jpg") in predict_alphabet.
+
+    Only a sample of requests is captured, and nothing is encoded or written
+    on the request thread: frames are kept as the decoded arrays, encoded to
+    JPEG on demand by the debug endpoint and, when output_dir is set, by a
+    background writer. If the writer falls behind, captures are dropped from
+    disk rather than slowing requests down.
+
+    Parameters:
+    - capacity: Number of recent captures kept in memory
+    - sample_rate: Fraction of requests captured (0 to 1)
+    - output_dir: Optional directory the background writer flushes captures to
+    - queue_size: Captures waiting for the writer before new ones are dropped
+    """
+
+    def __init__(self, capacity=64, sample_rate=0.1, output_dir=None, queue_size=256):
+        self.sample_rate = sample_rate
+        self.output_dir = output_dir
+        self._records = deque(maxlen=capacity)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.captured = 0
+        self.written = 0
+        self.dropped = 0
+
+        self._queue_size = queue_size
+        self._queue = None
+        if output_dir is not None:
+            os.makedirs(output_dir, exist_ok=True)
+            self._start_writer()
+
+    def _start_writer(self):
+        self._queue = queue.Queue(maxsize=self._queue_size)
+        self._writer = threading.Thread(target=self._write_loop, name='debug-capture', daemon=True)
+        self._writer.start()
+
+    def after_fork(self):
+        # The writer thread stays behind in the parent process; each worker
+        # writes to its own subdirectory, as every worker numbers captures from 1
+        self._lock = threading.Lock()
+        if self.output_dir is not None:
+            self.output_dir = os.path.join(self.output_dir, f'worker-{os.getpid()}')
+            os.makedirs(self.output_dir, exist_ok=True)
+            self._start_writer()
+
+    def should_sample(self):
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def record(self, endpoint, frame, hands, prediction, session_id=None):
+        """
+        Keep one frame (a BGR array, not copied) with its hands and prediction.
+        """
+        record = {
+            'id': next(self._ids),
+            'time': time.time(),
+            'endpoint': endpoint,
+            'session_id': session_id,
+            'shape': list(frame.shape),
+            'hands': [[list(map(float, point)) for point in hand] for hand in hands] if hands else [],
+            'prediction': prediction,
+        }
+        with self._lock:
+            self._records.append((record, frame))
+            self.captured += 1
+        if self._queue is not None:
+            try:
+                self._queue.put_nowait((record, frame))
+            except queue.Full:
+                with self._lock:
+                    self.dropped += 1
+
+    def records(self):
+        # Newest first, without the pixels
+        with self._lock:
+            return [dict(record) for record, _ in reversed(self._records)]
+
+    def frame_jpeg(self, capture_id):
+        with self._lock:
+            frame = next((frame for record, frame in self._records if record['id'] == capture_id), None)
+        if frame is None:
+            return None
+        return cv2.imencode('.jpg', frame)[1].tobytes()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'capacity': self._records.maxlen,
+                'held': len(self._records),
+                'sample_rate': self.sample_rate,
+                'captured': self.captured,
+                'written': self.written,
+                'dropped': self.dropped,
+                'output_dir': self.output_dir,
+            }
+
+    def _write_loop(self):
+        index_path = os.path.join(self.output_dir, 'captures.jsonl')
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            record, frame = item
+            try:
+                name = f"{record['id']:06d}_{record['endpoint']}.jpg"
+                cv2.imwrite(os.path.join(self.output_dir, name), frame)
+                with open(index_path, 'a') as f:
+                    f.write(json.dumps({**record, 'file': name}) + '\n')
+                with self._lock:
+                    self.written += 1
+            except Exception as e:
+                print(f"Error writing debug capture {record['id']}: {str(e)}")
+
+    def close(self):
+        if self._queue is not None:
+            self._queue.put(None)
+            self._writer.join()
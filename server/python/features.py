@@ -0,0 +1,126 @@
+import threading
+
+import numpy as np
+
+SEQUENCE_LENGTH = 30
+HAND_VALUES = 21 * 3
+MAX_HANDS = 2
+FRAME_FEATURES = MAX_HANDS * HAND_VALUES
+
+
+def alphabet_features(hands):
+    """
+    Min-max normalized landmarks for the alphabet model.
+
+    Parameters:
+    - hands: (H, 21, 3) landmarks, or any flat sequence of x, y, z values
+
+    Returns:
+    - landmarks: Flat float64 array scaled to [0, 1] over all values
+    """
+    landmarks = np.array(hands, dtype=np.float64).ravel()
+    landmarks -= landmarks.min()
+    value_range = landmarks.max()  # == ptp once the minimum is zero
+    if value_range > 0:
+        landmarks /= value_range
+    return landmarks
+
+
+def write_frame_features(row, hands):
+    """
+    Write one frame's wrist-relative word features into a 126-value row.
+
+    Each of up to two hands is expressed relative to its wrist (landmark 0);
+    missing hands stay zero. The subtraction runs in float64 and is rounded
+    once on assignment, matching the old list-building code bit for bit.
+    """
+    row[:] = 0.0
+    for hand_index, hand in enumerate(hands[:MAX_HANDS]):
+        hand = np.asarray(hand, dtype=np.float64).reshape(21, 3)
+        row[hand_index * HAND_VALUES:(hand_index + 1) * HAND_VALUES] = (hand - hand[0]).ravel()
+    return row
+
+
+def frame_features(hands):
+    return write_frame_features(np.empty(FRAME_FEATURES, dtype=np.float32), hands)
+
+
+class WordFeatureBuilder:
+    """
+    Builds (1, 30, 126) float32 word-model inputs in a preallocated buffer.
+
+    Every thread gets its own buffer, reused across requests; the returned
+    array is only valid until the same thread builds its next sequence.
+    Sequences longer than 30 frames are truncated and shorter ones
+    zero-padded, as predict_word always did.
+    """
+
+    def __init__(self, sequence_length=SEQUENCE_LENGTH):
+        self.sequence_length = sequence_length
+        self._local = threading.local()
+
+    def _buffer(self):
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None:
+            buffer = np.zeros((1, self.sequence_length, FRAME_FEATURES), dtype=np.float32)
+            self._local.buffer = buffer
+        return buffer
+
+    def from_hands(self, frame_hands):
+        """
+        Parameters:
+        - frame_hands: One hands list per frame (each hand 21 (x, y, z) points)
+        """
+        buffer = self._buffer()
+        rows = buffer[0].reshape(self.sequence_length, MAX_HANDS, HAND_VALUES)
+        rows[:] = 0.0
+
+        # Convert every detected hand in one call, then normalize them together
+        slots = []
+        points = []
+        for frame_index, hands in enumerate(frame_hands):
+            if frame_index == self.sequence_length:
+                break
+            for hand_index, hand in enumerate(hands[:MAX_HANDS]):
+                slots.append((frame_index, hand_index))
+                points.append(hand)
+        if points:
+            points = np.array(points, dtype=np.float64).reshape(len(points), 21, 3)
+            frame_index, hand_index = np.array(slots).T
+            rows[frame_index, hand_index] = (points - points[:, :1]).reshape(len(points), HAND_VALUES)
+        return buffer
+
+    def from_array(self, frames):
+        """
+        Parameters:
+        - frames: (N, H, 21, 3) landmarks; all-zero hands stay zero
+        """
+        frames = np.asarray(frames, dtype=np.float64)
+        if len(frames) == 0:
+            raise ValueError('No frames provided')
+        frames = frames[:self.sequence_length].reshape(len(frames[:self.sequence_length]), -1, 21, 3)
+        frames = frames[:, :MAX_HANDS]
+        count, hands = frames.shape[:2]
+
+        buffer = self._buffer()
+        rows = buffer[0]
+        rows[:] = 0.0
+        relative = frames - frames[:, :, :1]
+        rows[:count, :hands * HAND_VALUES] = relative.reshape(count, hands * HAND_VALUES)
+        return buffer
+
+    def from_rows(self, feature_rows):
+        """
+        Parameters:
+        - feature_rows: Precomputed 126-value frame_features rows
+        """
+        buffer = self._buffer()
+        rows = buffer[0]
+        count = 0
+        for row in feature_rows:
+            if count == self.sequence_length:
+                break
+            rows[count] = row
+            count += 1
+        rows[count:] = 0.0
+        return buffer
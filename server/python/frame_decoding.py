@@ -0,0 +1,180 @@
+import base64
+import struct
+
+import cv2
+import numpy as np
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+
+# Besides the original JSON body of base64 data URLs, the predict endpoints
+# accept frames as:
+# - multipart/form-data with one JPEG part per frame (field 'frames' for
+#   words, 'image' for the alphabet)
+# - application/x-jpeg-stream: each frame is a 4-byte big-endian length
+#   followed by that many bytes of JPEG
+# - image/jpeg: a single raw JPEG body (alphabet only)
+# Binary frames are decoded straight from the request buffer, as soon as
+# each one has been read off the socket.
+JPEG_STREAM_CONTENT_TYPE = 'application/x-jpeg-stream'
+CHUNK_SIZE = 64 * 1024
+
+# Largest frame a length prefix may announce; the payload buffer is
+# allocated from the client's prefix before any of it is read
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+_LENGTH_PREFIX = struct.Struct('>I')
+
+
+class FrameDecodeError(ValueError):
+    pass
+
+
+def decode_jpeg(buffer, index=0):
+    nparr = np.frombuffer(buffer, np.uint8)
+    frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR) if nparr.size else None
+    if frame is None:
+        raise FrameDecodeError(f"Failed to decode frame {index}")
+    return frame
+
+
+def decode_data_url(data_url, index=0):
+    return decode_jpeg(data_url_bytes(data_url, index), index)
+
+
+def data_url_bytes(data_url, index=0):
+    if not isinstance(data_url, str):
+        raise FrameDecodeError(f"Frame {index} is not a data URL string")
+    if data_url.startswith('data:'):
+        data_url = data_url.split(',', 1)[1]
+    try:
+        return base64.b64decode(data_url)
+    except ValueError as e:
+        raise FrameDecodeError(f"Error decoding frame {index}: {str(e)}")
+
+
+def _read_exactly(stream, size):
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        n = stream.readinto(view[received:])
+        if not n:
+            return None
+        received += n
+    return buffer
+
+
+def iter_length_prefixed(stream, content_length=None):
+    """
+    Yield JPEG payloads from a stream of 4-byte length-prefixed frames.
+
+    Parameters:
+    - stream: The request body
+    - content_length: Body size, when known; no frame can be larger
+    """
+    index = 0
+    while True:
+        header = stream.read(_LENGTH_PREFIX.size)
+        if not header:
+            return
+        if len(header) < _LENGTH_PREFIX.size:
+            header += _read_exactly(stream, _LENGTH_PREFIX.size - len(header)) or b''
+            if len(header) < _LENGTH_PREFIX.size:
+                raise FrameDecodeError(f"Truncated length prefix for frame {index}")
+        (length,) = _LENGTH_PREFIX.unpack(header)
+        if length > MAX_FRAME_BYTES or (content_length is not None and length > content_length):
+            raise FrameDecodeError(f"Frame {index} announces {length} bytes, more than the request can hold")
+        payload = _read_exactly(stream, length)
+        if payload is None:
+            raise FrameDecodeError(f"Truncated payload for frame {index}")
+        yield payload
+        index += 1
+
+
+def _next_multipart_event(decoder, stream):
+    # A truncated or malformed body makes the decoder raise ValueError
+    try:
+        event = decoder.next_event()
+        while isinstance(event, NeedData):
+            chunk = stream.read(CHUNK_SIZE)
+            decoder.receive_data(chunk if chunk else None)
+            event = decoder.next_event()
+        return event
+    except ValueError as e:
+        raise FrameDecodeError(f"Malformed multipart body: {str(e)}")
+
+
+def iter_multipart_files(request, field_name):
+    """
+    Yield the payload of each multipart part named field_name as it finishes
+    arriving, without waiting for Werkzeug to parse the whole form.
+    """
+    boundary = request.mimetype_params.get('boundary')
+    if not boundary:
+        raise FrameDecodeError('Missing multipart boundary')
+
+    decoder = MultipartDecoder(boundary.encode())
+    stream = request.stream
+    current_name = None
+    parts = []
+    while True:
+        event = _next_multipart_event(decoder, stream)
+        if isinstance(event, (File, Field)):
+            current_name = event.name
+            parts = []
+        elif isinstance(event, Data):
+            if current_name == field_name:
+                parts.append(event.data)
+                if not event.more_data:
+                    yield b''.join(parts)
+        elif isinstance(event, Epilogue):
+            return
+
+
+def iter_request_payloads(request):
+    """
+    Yield the JPEG bytes of each frame of a /predict/word request in any
+    supported format, leaving decoding to the consumer.
+    """
+    mimetype = request.mimetype
+    if mimetype == 'multipart/form-data':
+        yield from iter_multipart_files(request, 'frames')
+    elif mimetype == JPEG_STREAM_CONTENT_TYPE:
+        yield from iter_length_prefixed(request.stream, request.content_length)
+    else:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or 'frames' not in data:
+            raise FrameDecodeError('No frames provided')
+        if not isinstance(data['frames'], list):
+            raise FrameDecodeError("'frames' must be a list of data URLs")
+        for i, frame in enumerate(data['frames']):
+            yield data_url_bytes(frame, i)
+
+
+def iter_request_frames(request):
+    """
+    Yield decoded BGR frames for a /predict/word request in any supported format.
+    """
+    for i, payload in enumerate(iter_request_payloads(request)):
+        yield decode_jpeg(payload, i)
+
+
+def decode_request_image(request):
+    """
+    Decode the single BGR frame of a /predict/alphabet request in any supported format.
+    """
+    mimetype = request.mimetype
+    if mimetype == 'multipart/form-data':
+        payload = next(iter_multipart_files(request, 'image'), None)
+    elif mimetype == JPEG_STREAM_CONTENT_TYPE:
+        payload = next(iter_length_prefixed(request.stream, request.content_length), None)
+    elif mimetype == 'image/jpeg':
+        payload = request.get_data(cache=False)
+    else:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or not data.get('image'):
+            raise FrameDecodeError('No image data provided')
+        return decode_data_url(data['image'])
+
+    if not payload:
+        raise FrameDecodeError('No image data provided')
+    return decode_jpeg(payload)
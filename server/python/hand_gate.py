@@ -0,0 +1,130 @@
+import argparse
+import random
+import threading
+
+import cv2
+import numpy as np
+
+from HandHistogram import backprojection_mask, build_backprojection_lut, fast_backprojection, load_hist
+
+ADMIT = 'admit'
+SKIP = 'skip'
+AUDIT = 'audit'
+
+
+class HandGate:
+    """
+    Cheap hand-presence check in front of MediaPipe.
+
+    The frame is downscaled and back-projected through the skin histogram
+    saved by create_hist.py (via a BGR lookup table, see
+    build_backprojection_lut). Frames whose skin coverage is below
+    min_coverage skip MediaPipe and are treated as "no hand", which is what
+    predict_word pads them with anyway. The mask is cleaned up as in
+    hist_masking (backprojection_mask), but its disc filter spans more of the
+    small frame, so coverage reads higher than on a full-size mask;
+    calibrate min_coverage with `python hand_gate.py <hist>`.
+
+    A sample of the frames the gate would skip (audit_rate) still goes
+    through MediaPipe, so the false-negative rate of the gate is measured
+    on live traffic.
+
+    Parameters:
+    - hist: The H-S hand histogram
+    - min_coverage: Fraction of skin pixels below which a frame is skipped
+    - threshold: Filtered back-projection value that counts as skin, applied by
+      backprojection_mask as in hist_masking (which uses 50)
+    - size: (width, height) of the downscaled frame
+    - audit_rate: Fraction of skipped frames verified with MediaPipe
+    """
+
+    def __init__(self, hist, min_coverage=0.02, threshold=50, size=(80, 60), audit_rate=0.0):
+        self.lut = build_backprojection_lut(hist)
+        self.min_coverage = min_coverage
+        self.threshold = threshold
+        self.size = size
+        self.audit_rate = audit_rate
+        self._lock = threading.Lock()
+        self.frames = 0
+        self.skipped = 0
+        self.audited = 0
+        self.false_negatives = 0
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        return cls(load_hist(path), **kwargs)
+
+    def coverage(self, frame):
+        dst = fast_backprojection(frame, self.lut, size=self.size)
+        # hist_masking's disc filter, threshold and erode/dilate, on the downscaled frame
+        mask = backprojection_mask(dst, self.threshold)
+        return np.count_nonzero(mask) / mask.size
+
+    def check(self, frame):
+        """
+        Returns:
+        - ADMIT (run MediaPipe), SKIP (treat as no hand) or AUDIT (would skip,
+          but run MediaPipe and report the outcome with record_audit)
+        """
+        admitted = self.coverage(frame) >= self.min_coverage
+        with self._lock:
+            self.frames += 1
+            if not admitted:
+                self.skipped += 1
+        if admitted:
+            return ADMIT
+        if self.audit_rate and random.random() < self.audit_rate:
+            return AUDIT
+        return SKIP
+
+    def record_audit(self, hands):
+        with self._lock:
+            self.audited += 1
+            if hands:
+                self.false_negatives += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'frames': self.frames,
+                'skipped': self.skipped,
+                'skip_rate': self.skipped / self.frames if self.frames else 0.0,
+                'audited': self.audited,
+                'false_negatives': self.false_negatives,
+                # Share of skipped frames in which MediaPipe did find a hand
+                'false_negative_rate': self.false_negatives / self.audited if self.audited else None,
+                'min_coverage': self.min_coverage,
+            }
+
+
+def main():
+    import mediapipe as mp
+    from benchmarks.fixtures import load_fixtures
+    from parallel_extraction import hands_from_results
+
+    parser = argparse.ArgumentParser(description="Measure the hand gate's skip and false-negative rates against MediaPipe")
+    parser.add_argument('hist', help="Histogram pickle saved by create_hist.py")
+    parser.add_argument('--min-coverage', type=float, nargs='+', default=[0.005, 0.01, 0.02, 0.05])
+    args = parser.parse_args()
+
+    # Ground truth: MediaPipe on every fixture frame
+    hands_graph = mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=1, min_detection_confidence=0.5)
+    frames, has_hand = [], []
+    for fixture in load_fixtures():
+        for frame in fixture.decoded_frames():
+            frames.append(frame)
+            has_hand.append(bool(hands_from_results(hands_graph.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))))
+    hands_graph.close()
+
+    hist = load_hist(args.hist)
+    print(f"{len(frames)} frames, MediaPipe found a hand in {sum(has_hand)}")
+    for min_coverage in args.min_coverage:
+        gate = HandGate(hist, min_coverage)
+        skipped = [gate.check(frame) != ADMIT for frame in frames]
+        missed = sum(1 for skip, hand in zip(skipped, has_hand) if skip and hand)
+        print(f"  min_coverage {min_coverage:<6} skip rate {np.mean(skipped):6.1%}   "
+              f"false negatives {missed} ({missed / max(sum(has_hand), 1):6.1%} of hand frames)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import mediapipe as mp
+
+
+class _PinnedSlot:
+    def __init__(self, hands):
+        self.hands = hands
+        self.busy = True
+
+
+class HandsPool:
+    """
+    Pool of MediaPipe Hands graphs shared by the request threads.
+
+    A single Hands instance serializes every request and, in tracking mode,
+    carries one user's hand position into the next user's frames. The pool
+    keeps one graph per core. Requests either borrow any idle graph or, when
+    they carry a session id, get a graph pinned to that session so tracking
+    follows a single user's stream. Pins are evicted least-recently-used
+    when every graph is pinned and a new caller needs one.
+
+    Parameters:
+    - size: Number of graphs (defaults to the CPU count)
+    - hands_kwargs: Passed to mp.solutions.hands.Hands
+    """
+
+    def __init__(self, size=None, **hands_kwargs):
+        self.size = size or os.cpu_count() or 1
+        self.hands_kwargs = hands_kwargs
+        self._cond = threading.Condition()
+        self._idle = [mp.solutions.hands.Hands(**hands_kwargs) for _ in range(self.size)]
+        self._pinned = OrderedDict()
+
+    @contextmanager
+    def acquire(self, session_id=None, reset=False):
+        """
+        Check out a Hands graph for the duration of the with-block.
+
+        Parameters:
+        - session_id: Pin the graph to this session (tracking state is kept
+          between calls); None borrows any idle graph, reset so no tracking
+          state from another user carries over
+        - reset: Clear tracking state before use (new pins and anonymous
+          checkouts are always reset)
+        """
+        hands, fresh = self._checkout(session_id)
+        try:
+            if fresh or reset:
+                hands.reset()
+            yield hands
+        finally:
+            self._checkin(session_id, hands)
+
+    def release_session(self, session_id):
+        with self._cond:
+            slot = self._pinned.pop(session_id, None)
+            # A busy graph goes back to the idle list when its call finishes
+            if slot is not None and not slot.busy:
+                self._idle.append(slot.hands)
+                self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            for hands in self._idle:
+                hands.close()
+            for slot in self._pinned.values():
+                slot.hands.close()
+            self._idle = []
+            self._pinned.clear()
+
+    def _checkout(self, session_id):
+        with self._cond:
+            while True:
+                if session_id is not None and session_id in self._pinned:
+                    slot = self._pinned[session_id]
+                    if not slot.busy:
+                        slot.busy = True
+                        self._pinned.move_to_end(session_id)
+                        return slot.hands, False
+                else:
+                    hands = self._idle.pop() if self._idle else self._evict_pin()
+                    if hands is not None:
+                        if session_id is not None:
+                            self._pinned[session_id] = _PinnedSlot(hands)
+                        # Idle and evicted graphs hold whoever used them last
+                        return hands, True
+                self._cond.wait()
+
+    def _evict_pin(self):
+        # Least-recently-used pin that is not in the middle of a call
+        for session_id, slot in self._pinned.items():
+            if not slot.busy:
+                del self._pinned[session_id]
+                return slot.hands
+        return None
+
+    def _checkin(self, session_id, hands):
+        with self._cond:
+            slot = self._pinned.get(session_id) if session_id is not None else None
+            if slot is not None and slot.hands is hands:
+                slot.busy = False
+            else:
+                # Anonymous checkout, or the session was released mid-call
+                self._idle.append(hands)
+            self._cond.notify_all()
@@ -0,0 +1,175 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from numpy_engine import LSTM, Bidirectional
+
+
+class IncrementalState:
+    """
+    Per-session recurrent state of the word model.
+
+    Parameters:
+    - lstm_states: (h, c) for each LSTM layer, keyed by layer position
+    """
+
+    def __init__(self, lstm_states):
+        self.lstm_states = lstm_states
+        self.steps_since_resync = 0
+        self.frames_seen = 0
+
+
+class IncrementalWordScorer:
+    """
+    Scores a word stream one frame at a time by carrying the LSTM hidden and
+    cell state forward, instead of re-running the whole 30-step window on
+    every new frame.
+
+    Each arriving feature row is passed once through the stack: every LSTM
+    advances a single step from its stored state and the per-timestep layers
+    (BatchNormalization, Dropout, Masking, Dense) are applied to that one
+    step, so a frame costs the same regardless of the window length.
+
+    The carried state remembers frames that have already left the sliding
+    window, so every `resync_every` frames it is rebuilt from scratch over
+    the current window. At that point the output matches the batch model on
+    the same (full) window exactly. Models that cannot be stepped
+    (Bidirectional or go_backwards layers) fall back to scoring the full
+    window on every frame.
+
+    Parameters:
+    - model: NumpyModel of the word model
+    - resync_every: Frames between full-window rebuilds of the state (0 disables)
+    """
+
+    def __init__(self, model, resync_every=30):
+        self.model = model
+        self.resync_every = resync_every
+        self.layers = [layer for _, layer in model.layers]
+        self.window = model.input_shape[1]
+        self.features = model.input_shape[2]
+        self.incremental = not any(
+            isinstance(layer, Bidirectional) or (isinstance(layer, LSTM) and layer.go_backwards)
+            for layer in self.layers
+        )
+
+    def new_state(self):
+        return IncrementalState({
+            i: layer.initial_state(1) for i, layer in enumerate(self.layers) if isinstance(layer, LSTM)
+        })
+
+    def push(self, state, frames):
+        """
+        Advance the state by the newest frame and score it.
+
+        Parameters:
+        - state: IncrementalState of this session
+        - frames: The session's window of 126-value rows, newest last
+
+        Returns:
+        - Word probabilities, shape (classes,)
+        """
+        state.frames_seen += 1
+        state.steps_since_resync += 1
+        if not self.incremental:
+            return self.model(self._window_batch(frames))[0]
+
+        if self.resync_every and state.steps_since_resync >= self.resync_every:
+            return self.resync(state, frames)
+        return self._step(state, frames[-1])
+
+    def resync(self, state, frames):
+        # Rebuild the state over exactly the frames in the current window
+        state.lstm_states = self.new_state().lstm_states
+        state.steps_since_resync = 0
+        probabilities = None
+        for row in list(frames)[-self.window:]:
+            probabilities = self._step(state, row)
+        return probabilities
+
+    def _step(self, state, row):
+        x = np.asarray(row, dtype=np.float32).reshape(1, self.features)
+        mask = None
+        for i, layer in enumerate(self.layers):
+            if not isinstance(layer, LSTM):
+                x, mask = layer(x, mask)
+                continue
+
+            previous = state.lstm_states[i]
+            h, c = layer.step(x @ layer.kernel + layer.bias, previous)
+            if mask is not None:
+                # A masked (all-padding) frame carries the previous state forward
+                keep = mask[:, None]
+                h = np.where(keep, h, previous[0])
+                c = np.where(keep, c, previous[1])
+            state.lstm_states[i] = (h, c)
+            x = h
+            if not layer.return_sequences:
+                mask = None
+        return x[0]
+
+    def _window_batch(self, frames):
+        batch = np.zeros((1, self.window, self.features), dtype=np.float32)
+        rows = list(frames)[-self.window:]
+        if rows:
+            batch[0, :len(rows)] = rows
+        return batch
+
+
+def main():
+    from collections import deque
+
+    from asl_predictor import remove_time_major_from_config, word_model_sources
+    from numpy_engine import load_numpy_model
+
+    parser = argparse.ArgumentParser(description="Compare incremental word scoring with the full-window model")
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--resync-every', type=int, default=30)
+    args = parser.parse_args()
+
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    model_dir = os.path.join(os.path.dirname(os.path.dirname(current_dir)), 'model')
+    h5_path, json_path = word_model_sources(model_dir)
+    with open(json_path, 'r') as json_file:
+        model = load_numpy_model(h5_path, remove_time_major_from_config(json.load(json_file)))
+    scorer = IncrementalWordScorer(model, args.resync_every)
+    print(f"Incremental stepping {'enabled' if scorer.incremental else 'unsupported, using full window'}")
+
+    # A slowly drifting hand pose, so consecutive windows overlap the way a real stream does
+    rng = np.random.default_rng(0)
+    rows = np.cumsum(rng.normal(0.0, 0.02, (args.frames, scorer.features)), axis=0).astype(np.float32)
+
+    state = scorer.new_state()
+    frames = deque(maxlen=scorer.window)
+    incremental_ms, full_ms = 0.0, 0.0
+    resync_error, drift_error, agreement, compared = 0.0, 0.0, 0, 0
+    for row in rows:
+        frames.append(row)
+        start = time.perf_counter()
+        probabilities = scorer.push(state, frames)
+        incremental_ms += (time.perf_counter() - start) * 1000.0
+
+        start = time.perf_counter()
+        expected = model(scorer._window_batch(frames))[0]
+        full_ms += (time.perf_counter() - start) * 1000.0
+
+        if len(frames) < scorer.window:
+            continue
+        error = np.max(np.abs(probabilities - expected))
+        if state.steps_since_resync == 0:
+            resync_error = max(resync_error, error)
+        else:
+            drift_error = max(drift_error, error)
+        agreement += int(np.argmax(probabilities) == np.argmax(expected))
+        compared += 1
+
+    print(f"Per frame: incremental {incremental_ms / len(rows):.3f} ms, full window {full_ms / len(rows):.3f} ms")
+    print(f"Max abs error at re-sync frames {resync_error:.2e}, between re-syncs {drift_error:.2e}")
+    print(f"Top-1 agreement with the full window: {agreement / max(compared, 1):.1%} over {compared} frames")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+import time
+
+import numpy as np
+import tensorflow as tf
+
+
+class CompiledModel:
+    """
+    Traced, fixed-signature inference callable around a loaded Keras model.
+
+    model.predict() builds a data adapter and runs the full predict loop on
+    every call, which costs more than the forward pass for our single-sample
+    requests. This traces model(x, training=False) once for the input shape
+    the model serves, with a free batch dimension so (1, 1, F) requests and
+    (B, 30, 126) micro-batches reuse the same concrete function.
+
+    Parameters:
+    - model: The loaded Keras model
+    - warmup_batch_sizes: Batch sizes to run once at construction so the
+      first real request does not pay for tracing and kernel setup
+    """
+
+    def __init__(self, model, warmup_batch_sizes=(1,)):
+        self.model = model
+        self.input_shape = tuple(model.input_shape[1:])
+        self.signature = tf.TensorSpec(shape=(None,) + self.input_shape, dtype=tf.float32)
+        self._forward = tf.function(self._call_model, input_signature=[self.signature])
+        self.warmup_ms = self.warmup(warmup_batch_sizes)
+
+    def _call_model(self, inputs):
+        return self.model(inputs, training=False)
+
+    def warmup(self, batch_sizes):
+        start = time.perf_counter()
+        for batch_size in batch_sizes:
+            self(np.zeros((batch_size,) + self.input_shape, dtype=np.float32))
+        return (time.perf_counter() - start) * 1000.0
+
+    def __call__(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        if batch.shape[1:] != self.input_shape:
+            raise ValueError(f"Expected input shape (B, {', '.join(map(str, self.input_shape))}), got {batch.shape}")
+        return self._forward(tf.constant(batch)).numpy()
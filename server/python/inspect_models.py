@@ -1,6 +1,23 @@
+import argparse
 import h5py
 import json
 import os
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+from quantization import PRECISIONS, variant_path, write_variant
+
+MODELS = ('asl_alphabet_model.h5', 'asl_word_lstm_model.h5')
+
+def model_dir():
+    # Get the absolute path to the model directory
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    root_dir = os.path.dirname(os.path.dirname(current_dir))
+    return os.path.join(root_dir, 'model')
 
 def inspect_model(model_path):
     print(f"\nInspecting model: {model_path}")
@@ -12,7 +29,7 @@ def inspect_model(model_path):
                 print(json.dumps(config, indent=2))
             else:
                 print("No model configuration found")
-            
+
             print("\nModel layers:")
             if 'model_weights' in f:
                 for layer_name in f['model_weights']:
@@ -23,15 +40,119 @@ def inspect_model(model_path):
     except Exception as e:
         print(f"Error inspecting model: {str(e)}")
 
+def quantize_models(precisions):
+    for name in MODELS:
+        source = os.path.join(model_dir(), name)
+        for precision in precisions:
+            path = write_variant(source, precision)
+            print(f"{precision:<8} {os.path.getsize(path) / 1024:8.1f} KiB  {path}")
+
+def resident_mb():
+    # Current resident set size; falls back to the peak where /proc is unavailable
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+def evaluation_inputs():
+    from benchmarks.fixtures import load_fixtures
+    from features import WordFeatureBuilder, alphabet_features
+
+    fixtures = load_fixtures()
+    synthetic = sum(fixture.synthetic for fixture in fixtures)
+    if synthetic:
+        print(f"Note: {synthetic} of {len(fixtures)} fixtures are synthetic, so agreement and error are measured "
+              f"on stand-in landmarks; record real gestures with benchmarks.fixtures for representative figures")
+    alphabet = np.stack([alphabet_features(frame[:1]).reshape(1, -1) for fixture in fixtures
+                         for frame in fixture.landmarks if np.any(frame)]).astype(np.float32)
+    builder = WordFeatureBuilder()
+    word = np.concatenate([builder.from_array(fixture.landmarks).copy() for fixture in fixtures])
+    return {'alphabet': alphabet, 'word': word}
+
+def measure_variant(engine, precision, inputs, calls):
+    """
+    Load one variant in this (fresh) process and measure it.
+
+    Returns:
+    - {model kind: load_ms, resident_mb, latency_ms, outputs}
+    """
+    from asl_predictor import ASLPredictor
+
+    if engine == 'keras':
+        # Count the models, not the framework
+        import tensorflow  # noqa: F401
+    predictor = ASLPredictor(engine=engine, model_variant=precision, lazy=True, use_model_cache=False)
+
+    results = {}
+    for kind, batch in inputs.items():
+        before = resident_mb()
+        start = time.perf_counter()
+        predictor.preload([kind])
+        load_ms = (time.perf_counter() - start) * 1000.0
+        runner = predictor.alphabet_runner if kind == 'alphabet' else predictor.word_runner
+        outputs = np.asarray(runner(batch))
+
+        sample = batch[:1]
+        runner(sample)
+        timings = []
+        for _ in range(calls):
+            start = time.perf_counter()
+            runner(sample)
+            timings.append((time.perf_counter() - start) * 1000.0)
+        results[kind] = {
+            'load_ms': load_ms,
+            'resident_mb': resident_mb() - before,
+            'latency_ms': float(np.median(timings)),
+            'outputs': outputs,
+        }
+    return results
+
+def evaluate_variants(engine, precisions, calls):
+    inputs = evaluation_inputs()
+    print(f"{engine} engine; {len(inputs['alphabet'])} alphabet frames and {len(inputs['word'])} word sequences "
+          f"from the fixtures")
+
+    reports = {}
+    for precision in ('float32',) + tuple(precisions):
+        # A fresh process per variant, so load time and memory are not shared between them
+        with ProcessPoolExecutor(1, mp_context=get_context('spawn')) as executor:
+            reports[precision] = executor.submit(measure_variant, engine, precision, inputs, calls).result()
+
+    for index, kind in enumerate(inputs):
+        reference = reports['float32'][kind]['outputs']
+        print(f"\n{MODELS[index]}")
+        print(f"  {'variant':<8} {'size KiB':>9} {'load ms':>8} {'RSS MiB':>8} {'call ms':>8} "
+              f"{'top-1':>7} {'max err':>9} {'mean err':>9}")
+        for precision, report in reports.items():
+            result = report[kind]
+            outputs = result['outputs']
+            size = os.path.getsize(variant_path(os.path.join(model_dir(), MODELS[index]), precision)) / 1024
+            agreement = np.mean(np.argmax(outputs, axis=-1) == np.argmax(reference, axis=-1))
+            error = np.abs(outputs - reference)
+            print(f"  {precision:<8} {size:9.1f} {result['load_ms']:8.1f} {result['resident_mb']:8.1f} "
+                  f"{result['latency_ms']:8.3f} {agreement:7.1%} {error.max():9.2e} {error.mean():9.2e}")
+
 def main():
-    # Get the absolute path to the model directory
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    root_dir = os.path.dirname(os.path.dirname(current_dir))
-    model_dir = os.path.join(root_dir, 'model')
+    parser = argparse.ArgumentParser(description="Inspect the models, write reduced-precision variants and evaluate them")
+    commands = parser.add_subparsers(dest='command')
+    commands.add_parser('inspect', help="Dump layer names and configs (the default)")
+    quantize = commands.add_parser('quantize', help="Write float16/int8 variants to model/variants")
+    quantize.add_argument('--precisions', nargs='+', choices=PRECISIONS, default=list(PRECISIONS))
+    evaluate = commands.add_parser('evaluate', help="Compare the variants with float32 on the fixtures")
+    evaluate.add_argument('--precisions', nargs='+', choices=PRECISIONS, default=list(PRECISIONS))
+    evaluate.add_argument('--engine', choices=['keras', 'numpy'], default='keras')
+    evaluate.add_argument('--calls', type=int, default=200, help="Single-sample calls timed per model")
+    args = parser.parse_args()
 
-    # Inspect both models
-    inspect_model(os.path.join(model_dir, 'asl_alphabet_model.h5'))
-    inspect_model(os.path.join(model_dir, 'asl_lstm_model.h5'))
+    if args.command == 'quantize':
+        quantize_models(args.precisions)
+    elif args.command == 'evaluate':
+        evaluate_variants(args.engine, args.precisions, args.calls)
+    else:
+        # Inspect both models
+        inspect_model(os.path.join(model_dir(), 'asl_alphabet_model.h5'))
+        inspect_model(os.path.join(model_dir(), 'asl_lstm_model.h5'))
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()
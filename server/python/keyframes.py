@@ -0,0 +1,121 @@
+import threading
+
+import cv2
+import numpy as np
+
+
+def thumbnail(item, size=(32, 24)):
+    """
+    Small grayscale version of a frame (BGR array or JPEG bytes) for motion scoring.
+
+    JPEG bytes are decoded at 1/8 scale directly, which costs a fraction of
+    a full decode.
+    """
+    if isinstance(item, np.ndarray):
+        gray = cv2.cvtColor(item, cv2.COLOR_BGR2GRAY)
+    else:
+        gray = cv2.imdecode(np.frombuffer(item, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+        if gray is None:
+            return None
+    return cv2.resize(gray, size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+
+def interpolate_hands(frame_count, keyframe_hands):
+    """
+    Fill in the hands of skipped frames from the surrounding keyframes.
+
+    Parameters:
+    - frame_count: Number of frames in the sequence
+    - keyframe_hands: {frame index: hands} for the frames that were extracted
+
+    Returns:
+    - One hands list per frame. Between two keyframes with the same number
+      of hands the landmarks are interpolated linearly; otherwise a skipped
+      frame copies its nearest keyframe.
+    """
+    keys = sorted(keyframe_hands)
+    frame_hands = [None] * frame_count
+    for index in keys:
+        frame_hands[index] = keyframe_hands[index]
+
+    for left, right in zip(keys, keys[1:]):
+        if right - left < 2:
+            continue
+        left_hands, right_hands = keyframe_hands[left], keyframe_hands[right]
+        both = len(left_hands) == len(right_hands) and len(left_hands) > 0
+        if both:
+            start = np.asarray(left_hands, dtype=np.float64)
+            end = np.asarray(right_hands, dtype=np.float64)
+        for index in range(left + 1, right):
+            if both:
+                t = (index - left) / (right - left)
+                frame_hands[index] = [[tuple(point) for point in hand] for hand in start + (end - start) * t]
+            else:
+                frame_hands[index] = left_hands if index - left <= right - index else right_hands
+
+    # Before the first and after the last keyframe there is nothing to interpolate towards
+    for index in range(frame_count):
+        if frame_hands[index] is None:
+            frame_hands[index] = keyframe_hands[keys[0]] if index < keys[0] else keyframe_hands[keys[-1]]
+    return frame_hands
+
+
+class KeyframeSelector:
+    """
+    Picks the frames of a word sequence worth running hand detection on.
+
+    Each frame is reduced to a small grayscale thumbnail and compared with
+    the last selected keyframe; it becomes a keyframe itself when the mean
+    absolute pixel difference exceeds `threshold` (0-255 scale). The first
+    and last frames are always kept, and no gap is longer than `max_gap`,
+    so a slow drift is still sampled. Landmarks for the frames in between
+    are interpolated with interpolate_hands().
+
+    Parameters:
+    - threshold: Mean absolute difference that counts as motion
+    - max_gap: Longest run of skipped frames
+    - size: (width, height) of the thumbnails
+    """
+
+    def __init__(self, threshold=4.0, max_gap=4, size=(32, 24)):
+        self.threshold = threshold
+        self.max_gap = max_gap
+        self.size = size
+        self._lock = threading.Lock()
+        self.frames = 0
+        self.keyframes = 0
+
+    def select(self, frames):
+        """
+        Returns:
+        - Sorted indices of the keyframes
+        """
+        selected = []
+        reference = None
+        for index, item in enumerate(frames):
+            current = thumbnail(item, self.size)
+            if current is None:
+                # Undecodable frame: let the extractor raise the usual error for it
+                selected.append(index)
+                continue
+            if (reference is None or index - selected[-1] > self.max_gap
+                    or np.mean(np.abs(current - reference)) > self.threshold):
+                selected.append(index)
+                reference = current
+        if frames and selected[-1] != len(frames) - 1:
+            selected.append(len(frames) - 1)
+
+        with self._lock:
+            self.frames += len(frames)
+            self.keyframes += len(selected)
+        return selected
+
+    def stats(self):
+        with self._lock:
+            return {
+                'frames': self.frames,
+                'keyframes': self.keyframes,
+                'skip_rate': 1.0 - self.keyframes / self.frames if self.frames else 0.0,
+                'threshold': self.threshold,
+                'max_gap': self.max_gap,
+            }
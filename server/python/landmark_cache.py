@@ -0,0 +1,141 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from frame_decoding import decode_jpeg
+
+
+def content_key(item):
+    """
+    Hash of the raw JPEG bytes, or of the pixel buffer for decoded frames.
+    """
+    if isinstance(item, np.ndarray):
+        digest = hashlib.blake2b(str(item.shape).encode(), digest_size=16)
+        digest.update(np.ascontiguousarray(item).data)
+        return 'px:' + digest.hexdigest()
+    return 'jpg:' + hashlib.blake2b(item, digest_size=16).hexdigest()
+
+
+def average_hash(frame, size=8):
+    """
+    64-bit perceptual hash: downscaled grayscale pixels above their mean.
+    Near-identical frames (a hand holding a letter) map to the same value.
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (size, size), interpolation=cv2.INTER_AREA)
+    bits = (small > small.mean()).ravel()
+    return 'ah:' + np.packbits(bits).tobytes().hex()
+
+
+def cache_scope(session_id, endpoint):
+    """
+    Perceptual-match scope for one session on one endpoint; anonymous
+    requests get None and only see exact-content hits.
+    """
+    if session_id is None:
+        return None
+    return f'{endpoint}/{session_id}'
+
+
+class LandmarkCache:
+    """
+    Size- and TTL-bounded LRU cache of extracted hands, keyed on frame content.
+
+    Repeated frames (client retries, word-game replays, overlapping windows)
+    cost a hash lookup instead of a MediaPipe pass. With perceptual=True a
+    miss on the exact key also tries an average hash of the decoded frame,
+    so a steady hand pose reuses the previous landmarks. Exact hits are
+    shared by everyone, perceptual ones only within the lookup's scope (a
+    session and endpoint), since two clients' frames can hash alike.
+
+    Parameters:
+    - max_entries: Least-recently-used entries are evicted beyond this
+    - ttl_seconds: Entries older than this are treated as misses
+    - perceptual: Also match on a downscaled perceptual hash
+    """
+
+    def __init__(self, max_entries=4096, ttl_seconds=300.0, perceptual=False):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.perceptual = perceptual
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.perceptual_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        # Returns None on a miss; an empty list means "no hand in this frame"
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            hands, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return hands
+
+    def put(self, key, hands):
+        with self._lock:
+            self._entries[key] = (hands, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_extract(self, item, extract, index=0, scope=None):
+        """
+        Return cached hands for item (BGR array or JPEG bytes), or run
+        extract(frame) on the decoded frame and cache its result.
+
+        Perceptual matches are only tried when a scope is given.
+        """
+        key = content_key(item)
+        hands = self.get(key)
+        if hands is not None:
+            self.count('hits')
+            return hands
+
+        frame = item if isinstance(item, np.ndarray) else decode_jpeg(item, index)
+        perceptual_key = None
+        if self.perceptual and scope is not None:
+            perceptual_key = f'{scope}:{average_hash(frame)}'
+            hands = self.get(perceptual_key)
+            if hands is not None:
+                self.count('perceptual_hits')
+                self.put(key, hands)
+                return hands
+
+        self.count('misses')
+        hands = extract(frame)
+        self.put(key, hands)
+        if perceptual_key is not None:
+            self.put(perceptual_key, hands)
+        return hands
+
+    def count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.perceptual_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'perceptual_hits': self.perceptual_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': (self.hits + self.perceptual_hits) / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,73 @@
+import numpy as np
+
+# Binary layout for the /landmarks endpoints: the request body is the packed,
+# little-endian landmark values in (frames, hands, 21, 3) order with no header.
+# X-Landmark-Dtype selects float32 (default) or float16 and X-Landmark-Hands
+# the number of hands per frame (default 1). Missing hands are sent as zeros.
+BINARY_CONTENT_TYPE = 'application/octet-stream'
+DTYPE_HEADER = 'X-Landmark-Dtype'
+HANDS_HEADER = 'X-Landmark-Hands'
+
+BINARY_DTYPES = {
+    'float32': np.dtype('<f4'),
+    'float16': np.dtype('<f2'),
+}
+
+VALUES_PER_HAND = 21 * 3
+
+
+def decode_landmark_request(request, sequence):
+    """
+    Decode client-side landmarks from a Flask request.
+
+    Parameters:
+    - request: The Flask request (binary body or JSON {"landmarks": [...]})
+    - sequence: True for word requests (a list of frames), False for a single frame
+
+    Returns:
+    - landmarks: float32 array of shape (frames, hands, 21, 3), or (hands, 21, 3)
+      when sequence is False
+    """
+    if request.mimetype == BINARY_CONTENT_TYPE:
+        dtype_name = request.headers.get(DTYPE_HEADER, 'float32').lower()
+        if dtype_name not in BINARY_DTYPES:
+            raise ValueError(f"Unsupported {DTYPE_HEADER} '{dtype_name}', expected one of {sorted(BINARY_DTYPES)}")
+        hands = int(request.headers.get(HANDS_HEADER, 1))
+        if hands not in (1, 2):
+            raise ValueError(f"{HANDS_HEADER} must be 1 or 2")
+
+        values = np.frombuffer(request.get_data(cache=False), dtype=BINARY_DTYPES[dtype_name])
+        frame_size = hands * VALUES_PER_HAND
+        if values.size == 0 or values.size % frame_size != 0:
+            raise ValueError(f"Body holds {values.size} values, expected a multiple of {frame_size}")
+        landmarks = values.astype(np.float32).reshape(-1, hands, 21, 3)
+    else:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or 'landmarks' not in data:
+            raise ValueError('No landmarks provided')
+        try:
+            landmarks = np.asarray(data['landmarks'], dtype=np.float32)
+        except (TypeError, ValueError):
+            # Strings, objects or ragged lists where numbers were expected
+            raise ValueError('Landmarks must be a nested list of numbers')
+        if landmarks.size == 0:
+            raise ValueError('Empty landmarks array')
+        if sequence:
+            # (frames, 21|42, 3) or flat (frames, 63|126) rows
+            if landmarks.ndim < 2 or landmarks[0].size not in (VALUES_PER_HAND, 2 * VALUES_PER_HAND):
+                raise ValueError('Each frame must hold 21x3 or 42x3 landmarks')
+            landmarks = landmarks.reshape(len(landmarks), -1, 21, 3)
+        else:
+            if landmarks.size not in (VALUES_PER_HAND, 2 * VALUES_PER_HAND):
+                raise ValueError('Expected 21x3 or 42x3 landmarks')
+            landmarks = landmarks.reshape(1, -1, 21, 3)
+
+    if len(landmarks) == 0:
+        raise ValueError('No frames provided')
+    if not np.all(np.isfinite(landmarks)):
+        raise ValueError('Landmarks must be finite numbers')
+    if not sequence:
+        if len(landmarks) != 1:
+            raise ValueError('Expected landmarks for a single frame')
+        return landmarks[0]
+    return landmarks
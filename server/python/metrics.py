@@ -0,0 +1,218 @@
+import bisect
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Seconds; roughly x2.5 apart from 0.1 ms to 10 s
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FRAME_BUCKETS = (1, 2, 5, 10, 15, 20, 25, 30, 45, 60, 90, 120)
+QUANTILES = (0.5, 0.95, 0.99)
+
+_NULL_CONTEXT = nullcontext()
+
+
+def NULL_STAGES(stage):
+    # Stage timer used when nothing is being measured
+    return _NULL_CONTEXT
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram, cheap enough to observe on every request.
+
+    Quantiles are estimated by linear interpolation inside the bucket that
+    holds them, as Prometheus' histogram_quantile() does.
+
+    Parameters:
+    - buckets: Increasing upper bounds; an implicit +Inf bucket follows
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q):
+        with self._lock:
+            counts, total = list(self.counts), self.count
+        if total == 0:
+            return None
+        rank = q * total
+        cumulative = 0
+        for i, count in enumerate(counts):
+            if cumulative + count >= rank and count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                if i == len(self.buckets):
+                    # Beyond the last bound there is nothing to interpolate towards
+                    return lower
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def snapshot(self):
+        with self._lock:
+            count, total = self.count, self.sum
+        summary = {'count': count, 'mean': total / count if count else None}
+        for q in QUANTILES:
+            summary[f'p{int(q * 100)}'] = self.quantile(q)
+        return summary
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms for the request hot path, keyed by name and labels.
+
+    Parameters:
+    - enabled: When False every timer and observation is a no-op
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._histograms = {}
+        self._counters = {}
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def _histogram(self, name, labels, buckets):
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram(buckets))
+        return histogram
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+            self._counters = {}
+
+    def describe(self, name, help_text):
+        self._help[name] = help_text
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        if self.enabled:
+            self._histogram(name, labels, buckets).observe(value)
+
+    def increment(self, name, amount=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    @contextmanager
+    def _timer(self, name, labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._histogram(name, labels, LATENCY_BUCKETS).observe(time.perf_counter() - start)
+
+    def timer(self, name, **labels):
+        """
+        Context manager observing its wall time, in seconds, into a histogram.
+        """
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return self._timer(name, labels)
+
+    def stages(self, endpoint):
+        """
+        Stage timer for one endpoint: stages('mediapipe') times that stage
+        into asl_stage_seconds{endpoint=..., stage=...}.
+        """
+        if not self.enabled:
+            return NULL_STAGES
+        return lambda stage: self._timer('asl_stage_seconds', {'endpoint': endpoint, 'stage': stage})
+
+    def snapshot(self):
+        with self._lock:
+            histograms = dict(self._histograms)
+            counters = dict(self._counters)
+        return {
+            'histograms': [
+                {'name': name, 'labels': dict(labels), **histogram.snapshot()}
+                for (name, labels), histogram in sorted(histograms.items())
+            ],
+            'counters': [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(counters.items())
+            ],
+        }
+
+    def render_prometheus(self):
+        """
+        Prometheus text exposition format (version 0.0.4).
+        """
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        lines = []
+        described = set()
+
+        def header(name, kind):
+            if name not in described:
+                described.add(name)
+                if name in self._help:
+                    lines.append(f'# HELP {name} {self._help[name]}')
+                lines.append(f'# TYPE {name} {kind}')
+
+        for (name, labels), value in counters:
+            header(name, 'counter')
+            lines.append(f'{name}{_format_labels(labels)} {value}')
+
+        for (name, labels), histogram in histograms:
+            header(name, 'histogram')
+            with histogram._lock:
+                counts, total, count = list(histogram.counts), histogram.sum, histogram.count
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{name}_bucket{_format_labels(labels + (("le", le),))} {cumulative}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {total}')
+            lines.append(f'{name}_count{_format_labels(labels)} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + '}'
+
+
+def log_event(logger, event, level=logging.DEBUG, **fields):
+    """
+    Emit one JSON log line, skipping the formatting when the level is off.
+    """
+    if logger.isEnabledFor(level):
+        logger.log(level, json.dumps({'event': event, **fields}, default=str))
+
+
+def timed_iter(iterable, stages, stage):
+    """
+    Yield from iterable, timing each next() as one stage, so the work a
+    lazy generator (e.g. base64 payload decoding) does per item is measured.
+    """
+    iterator = iter(iterable)
+    while True:
+        with stages(stage):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
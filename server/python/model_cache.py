@@ -0,0 +1,149 @@
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import tensorflow as tf
+
+MANIFEST_VERSION = 1
+
+
+def file_fingerprint(path, with_hash=True):
+    stat = os.stat(path)
+    fingerprint = {'mtime': stat.st_mtime, 'size': stat.st_size}
+    if with_hash:
+        sha256 = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha256.update(chunk)
+        fingerprint['sha256'] = sha256.hexdigest()
+    return fingerprint
+
+
+class ModelArtifactCache:
+    """
+    One-time conversion of the repaired h5/JSON models to a fast-loading format.
+
+    The first load runs the usual repair path (h5py config decode,
+    remove_time_major_from_config, build_model_from_config, load_weights)
+    and saves the result as a native .keras archive next to a manifest of
+    the source files. Later loads skip the repair logic entirely as long as
+    every source file is unchanged: same mtime and size, or, if the mtime
+    moved (a fresh checkout), the same SHA-256. The TensorFlow version is
+    part of the manifest so an upgrade rebuilds the cache.
+
+    Parameters:
+    - cache_dir: Directory for the cached archives and manifests
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def _paths(self, name):
+        return (os.path.join(self.cache_dir, f'{name}.keras'),
+                os.path.join(self.cache_dir, f'{name}.manifest.json'))
+
+    def is_fresh(self, name, sources):
+        model_path, manifest_path = self._paths(name)
+        if not (os.path.exists(model_path) and os.path.exists(manifest_path)):
+            return False
+        try:
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if manifest.get('version') != MANIFEST_VERSION or manifest.get('tensorflow') != tf.__version__:
+            return False
+
+        recorded = manifest.get('sources', {})
+        if set(recorded) != {os.path.abspath(path) for path in sources}:
+            return False
+        for path in sources:
+            expected = recorded[os.path.abspath(path)]
+            current = file_fingerprint(path, with_hash=False)
+            if current['mtime'] == expected['mtime'] and current['size'] == expected['size']:
+                continue
+            if file_fingerprint(path)['sha256'] != expected['sha256']:
+                return False
+        return True
+
+    def load(self, name, sources, build_fn):
+        """
+        Load the cached model, or build it with build_fn() and cache it.
+        """
+        model_path, _ = self._paths(name)
+        if self.is_fresh(name, sources):
+            try:
+                model = tf.keras.models.load_model(model_path, compile=False)
+                print(f"Loaded {name} from model cache")
+                return model
+            except Exception as e:
+                print(f"Error loading cached {name}, rebuilding: {str(e)}")
+
+        model = build_fn()
+        try:
+            self.store(name, sources, model)
+        except Exception as e:
+            # A read-only checkout still serves, it just keeps paying the repair cost
+            print(f"Could not write model cache for {name}: {str(e)}")
+        return model
+
+    def store(self, name, sources, model):
+        model_path, manifest_path = self._paths(name)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # Write to temporary files first so concurrent workers never load a partial archive
+        fd, tmp_model_path = tempfile.mkstemp(suffix='.keras', dir=self.cache_dir)
+        os.close(fd)
+        model.save(tmp_model_path)
+        os.replace(tmp_model_path, model_path)
+
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'tensorflow': tf.__version__,
+            'sources': {os.path.abspath(path): file_fingerprint(path) for path in sources},
+        }
+        fd, tmp_manifest_path = tempfile.mkstemp(suffix='.json', dir=self.cache_dir)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_manifest_path, manifest_path)
+        print(f"Cached {name} at {model_path}")
+
+
+def main():
+    from asl_predictor import (alphabet_model_sources, load_alphabet_model, load_word_model,
+                               word_model_sources)
+
+    parser = argparse.ArgumentParser(description="Build the model cache and measure the load-time saving")
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    model_dir = os.path.join(os.path.dirname(os.path.dirname(current_dir)), 'model')
+    cache = ModelArtifactCache(os.path.join(model_dir, '.cache'))
+
+    models = [
+        ('asl_alphabet_model', alphabet_model_sources(model_dir), lambda: load_alphabet_model(model_dir)),
+        ('asl_word_lstm_model', word_model_sources(model_dir), lambda: load_word_model(model_dir)),
+    ]
+    for name, sources, build_fn in models:
+        cache.store(name, sources, build_fn())
+
+        repair_ms, cached_ms = [], []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            build_fn()
+            repair_ms.append((time.perf_counter() - start) * 1000.0)
+
+            start = time.perf_counter()
+            cache.load(name, sources, build_fn)
+            cached_ms.append((time.perf_counter() - start) * 1000.0)
+
+        print(f"{name}: repair path {min(repair_ms):.1f} ms, cache {min(cached_ms):.1f} ms "
+              f"(best of {args.repeats})")
+
+
+if __name__ == '__main__':
+    main()
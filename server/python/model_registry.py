@@ -0,0 +1,167 @@
+import argparse
+import hashlib
+import os
+import threading
+import weakref
+from concurrent.futures import Future
+
+ARTIFACT_EXTENSIONS = ('.h5', '.json', '.pkl', '.keras')
+
+# Generated next to the models, not artifacts of their own
+SKIPPED_DIRECTORIES = ('.cache',)
+
+
+class ModelRegistry:
+    """
+    Content-addressed view of the model directory.
+
+    Artifacts are identified by the SHA-256 of their contents, not by path,
+    so the copies under model/ (model_words/, Model_words/, old/) resolve to
+    one entry. Loaded objects are kept per (tag, content) key: a model is
+    built once per process however many predictors, paths or reloads refer
+    to the same files, and is dropped once nothing uses it any more.
+
+    Hashes are memoized by (mtime, size), so checking whether a model file
+    changed costs a stat() unless it did.
+
+    Parameters:
+    - model_dir: Directory indexed by index() and duplicates()
+    """
+
+    _registries = {}
+    _registries_lock = threading.Lock()
+
+    def __init__(self, model_dir):
+        self.model_dir = model_dir
+        self._lock = threading.RLock()
+        self._hashes = {}
+        self._loaded = weakref.WeakValueDictionary()
+        # Builds in progress, so concurrent loads of one key wait for a single build
+        self._loading = {}
+        self.loads = 0
+        self.reuses = 0
+
+    @classmethod
+    def for_directory(cls, model_dir):
+        # One registry per model directory and process
+        model_dir = os.path.abspath(model_dir)
+        with cls._registries_lock:
+            registry = cls._registries.get(model_dir)
+            if registry is None:
+                registry = cls._registries[model_dir] = cls(model_dir)
+            return registry
+
+    def content_hash(self, path):
+        stat = os.stat(path)
+        key = os.path.abspath(path)
+        with self._lock:
+            memo = self._hashes.get(key)
+            if memo is not None and memo[0] == (stat.st_mtime_ns, stat.st_size):
+                return memo[1]
+        sha256 = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha256.update(chunk)
+        digest = sha256.hexdigest()
+        with self._lock:
+            self._hashes[key] = ((stat.st_mtime_ns, stat.st_size), digest)
+        return digest
+
+    def version(self, sources):
+        """
+        Returns:
+        - Short content version of a set of source files (order-sensitive)
+        """
+        combined = hashlib.sha256()
+        for path in sources:
+            combined.update(self.content_hash(path).encode('ascii'))
+        return combined.hexdigest()[:16]
+
+    def load(self, tag, sources, loader):
+        """
+        Return the object built from these sources, calling loader() only if
+        no live object was built from the same contents under the same tag.
+        Concurrent loads of the same key wait for one build; other keys and
+        stats() are not held up by it.
+
+        Parameters:
+        - tag: What is built from the sources (e.g. ('model', 'word', 'numpy', None))
+        - sources: Files the object is built from
+        - loader: Zero-argument callable building it
+
+        Returns:
+        - (object, version)
+        """
+        version = self.version(sources)
+        key = (tag, version)
+        with self._lock:
+            loaded = self._loaded.get(key)
+            if loaded is not None:
+                self.reuses += 1
+                return loaded, version
+            future = self._loading.get(key)
+            building = future is None
+            if building:
+                future = self._loading[key] = Future()
+            else:
+                self.reuses += 1
+        if not building:
+            return future.result(), version
+
+        # Built without the lock held: a Keras build takes seconds, and stats()
+        # or loads of other keys should not wait for it
+        try:
+            loaded = loader()
+        except BaseException as e:
+            with self._lock:
+                del self._loading[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._loaded[key] = loaded
+            del self._loading[key]
+            self.loads += 1
+        future.set_result(loaded)
+        return loaded, version
+
+    def index(self):
+        """
+        Returns:
+        - {sha256: [paths relative to model_dir]} for every artifact
+        """
+        entries = {}
+        for root, directories, files in os.walk(self.model_dir):
+            directories[:] = sorted(d for d in directories if d not in SKIPPED_DIRECTORIES)
+            for name in sorted(files):
+                if name.endswith(ARTIFACT_EXTENSIONS):
+                    path = os.path.join(root, name)
+                    entries.setdefault(self.content_hash(path), []).append(os.path.relpath(path, self.model_dir))
+        return entries
+
+    def duplicates(self):
+        return {digest: paths for digest, paths in self.index().items() if len(paths) > 1}
+
+    def stats(self):
+        with self._lock:
+            return {'live_objects': len(self._loaded), 'loads': self.loads, 'reuses': self.reuses}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List the model artifacts by content hash")
+    parser.add_argument('--model-dir', default=os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'model'))
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.model_dir)
+    index = registry.index()
+    wasted = 0
+    for digest, paths in sorted(index.items(), key=lambda item: item[1]):
+        size = os.path.getsize(os.path.join(args.model_dir, paths[0]))
+        wasted += size * (len(paths) - 1)
+        print(f"{digest[:12]}  {size / 1024:9.1f} KiB  {', '.join(paths)}")
+    duplicated = sum(1 for paths in index.values() if len(paths) > 1)
+    print(f"\n{len(index)} distinct artifacts, {duplicated} stored more than once ({wasted / 1024:.1f} KiB of copies)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,320 @@
+import argparse
+import json
+import os
+
+import h5py
+import numpy as np
+
+from quantization import dequantize
+
+
+def _sigmoid(x):
+    return 0.5 * (np.tanh(0.5 * x) + 1.0)
+
+
+def _hard_sigmoid(x):
+    return np.clip(0.2 * x + 0.5, 0.0, 1.0)
+
+
+def _softmax(x):
+    e = np.exp(x - np.max(x, axis=-1, keepdims=True))
+    return e / np.sum(e, axis=-1, keepdims=True)
+
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    None: lambda x: x,
+    'relu': lambda x: np.maximum(x, 0.0),
+    'tanh': np.tanh,
+    'sigmoid': _sigmoid,
+    'hard_sigmoid': _hard_sigmoid,
+    'softmax': _softmax,
+}
+
+
+def _activation(name):
+    if name not in ACTIVATIONS:
+        raise ValueError(f"Unsupported activation '{name}'")
+    return ACTIVATIONS[name]
+
+
+class Dense:
+    def __init__(self, config, weights):
+        self.kernel = weights['kernel']
+        self.bias = weights.get('bias')
+        self.activation = _activation(config.get('activation'))
+
+    def __call__(self, x, mask):
+        y = x @ self.kernel
+        if self.bias is not None:
+            y += self.bias
+        return self.activation(y), mask
+
+
+class Dropout:
+    # Identity at inference time
+    def __init__(self, config, weights):
+        pass
+
+    def __call__(self, x, mask):
+        return x, mask
+
+
+class BatchNormalization:
+    def __init__(self, config, weights):
+        epsilon = config.get('epsilon', 1e-3)
+        gamma = weights.get('gamma', 1.0)
+        beta = weights.get('beta', 0.0)
+        # Fold the moving statistics into one scale and offset
+        self.scale = (gamma / np.sqrt(weights['moving_variance'] + epsilon)).astype(np.float32)
+        self.offset = (beta - weights['moving_mean'] * self.scale).astype(np.float32)
+
+    def __call__(self, x, mask):
+        return x * self.scale + self.offset, mask
+
+
+class Masking:
+    def __init__(self, config, weights):
+        self.mask_value = config.get('mask_value', 0.0)
+
+    def __call__(self, x, mask):
+        mask = np.any(x != self.mask_value, axis=-1)
+        return x * mask[..., None], mask
+
+
+class LSTM:
+    """
+    Keras LSTM forward pass (gate order i, f, c, o).
+
+    The input projection for every timestep is one batched matmul; only the
+    recurrent matmul runs per step. Masked timesteps carry the previous state
+    and output forward, as Keras does.
+    """
+
+    def __init__(self, config, weights):
+        self.units = config['units']
+        self.kernel = weights['kernel']
+        self.recurrent_kernel = weights['recurrent_kernel']
+        self.bias = weights.get('bias', np.zeros(4 * self.units, dtype=np.float32))
+        self.activation = _activation(config.get('activation', 'tanh'))
+        self.recurrent_activation = _activation(config.get('recurrent_activation', 'sigmoid'))
+        self.return_sequences = config.get('return_sequences', False)
+        self.go_backwards = config.get('go_backwards', False)
+
+    def initial_state(self, batch_size):
+        zeros = np.zeros((batch_size, self.units), dtype=np.float32)
+        return zeros, zeros.copy()
+
+    def step(self, x_projected, state):
+        """
+        Advance one timestep given x @ kernel + bias for that step.
+        """
+        h, c = state
+        z = x_projected + h @ self.recurrent_kernel
+        u = self.units
+        i = self.recurrent_activation(z[:, :u])
+        f = self.recurrent_activation(z[:, u:2 * u])
+        g = self.activation(z[:, 2 * u:3 * u])
+        o = self.recurrent_activation(z[:, 3 * u:])
+        c = f * c + i * g
+        h = o * self.activation(c)
+        return h, c
+
+    def __call__(self, x, mask):
+        batch_size, timesteps, _ = x.shape
+        projected = x @ self.kernel + self.bias
+        order = range(timesteps - 1, -1, -1) if self.go_backwards else range(timesteps)
+
+        state = self.initial_state(batch_size)
+        outputs = np.zeros((batch_size, timesteps, self.units), dtype=np.float32) if self.return_sequences else None
+        for position, t in enumerate(order):
+            h, c = self.step(projected[:, t], state)
+            if mask is not None:
+                keep = mask[:, t][:, None]
+                h = np.where(keep, h, state[0])
+                c = np.where(keep, c, state[1])
+            state = (h, c)
+            if outputs is not None:
+                outputs[:, position] = h
+
+        if outputs is not None:
+            return outputs, mask
+        return state[0], None
+
+
+class Bidirectional:
+    def __init__(self, config, weights):
+        layer_config = config['layer']['config']
+        backward_config = dict(config.get('backward_layer', {}).get('config', layer_config))
+        backward_config['go_backwards'] = not layer_config.get('go_backwards', False)
+        self.forward = LSTM(layer_config, weights['forward'])
+        self.backward = LSTM(backward_config, weights['backward'])
+        self.merge_mode = config.get('merge_mode', 'concat')
+        self.return_sequences = layer_config.get('return_sequences', False)
+
+    def __call__(self, x, mask):
+        forward, _ = self.forward(x, mask)
+        backward, _ = self.backward(x, mask)
+        if self.return_sequences:
+            # The backward layer emits outputs in reversed time order
+            backward = backward[:, ::-1]
+        if self.merge_mode == 'concat':
+            y = np.concatenate([forward, backward], axis=-1)
+        elif self.merge_mode == 'sum':
+            y = forward + backward
+        elif self.merge_mode == 'mul':
+            y = forward * backward
+        elif self.merge_mode == 'ave':
+            y = (forward + backward) / 2.0
+        else:
+            raise ValueError(f"Unsupported merge_mode '{self.merge_mode}'")
+        return y, mask if self.return_sequences else None
+
+
+LAYERS = {
+    'Dense': Dense,
+    'Dropout': Dropout,
+    'BatchNormalization': BatchNormalization,
+    'Masking': Masking,
+    'LSTM': LSTM,
+    'Bidirectional': Bidirectional,
+}
+
+
+def _weight_key(weight_name):
+    # 'lstm_10/lstm_cell/recurrent_kernel:0' -> 'recurrent_kernel'
+    return weight_name.split('/')[-1].split(':')[0]
+
+
+def _read_layer_weights(group):
+    names = [n.decode('utf-8') if isinstance(n, bytes) else n for n in group.attrs.get('weight_names', [])]
+    values = [dequantize(group[name]) for name in names]
+    return names, values
+
+
+def _layer_weights(class_name, names, values):
+    if class_name == 'Bidirectional':
+        forward = {_weight_key(n): v for n, v in zip(names, values) if '/forward' in n}
+        backward = {_weight_key(n): v for n, v in zip(names, values) if '/backward' in n}
+        if not forward or not backward:
+            half = len(values) // 2
+            forward = {_weight_key(n): v for n, v in zip(names[:half], values[:half])}
+            backward = {_weight_key(n): v for n, v in zip(names[half:], values[half:])}
+        return {'forward': forward, 'backward': backward}
+    return {_weight_key(n): v for n, v in zip(names, values)}
+
+
+class NumpyModel:
+    """
+    Batched NumPy forward pass for our Sequential LSTM/Dense models.
+
+    Quacks enough like the Keras model for ASLPredictor: input_shape,
+    predict(), predict_on_batch() and calling it on a batch.
+    """
+
+    def __init__(self, layers, input_shape, name='sequential'):
+        self.layers = layers
+        self.input_shape = input_shape
+        self.name = name
+
+    def __call__(self, batch):
+        x = np.asarray(batch, dtype=np.float32)
+        mask = None
+        for _, layer in self.layers:
+            x, mask = layer(x, mask)
+        return x
+
+    def predict(self, batch, verbose=0):
+        return self(batch)
+
+    def predict_on_batch(self, batch):
+        return self(batch)
+
+
+def load_numpy_model(h5_path, model_config=None):
+    """
+    Build a NumpyModel from a Keras .h5 file.
+
+    Parameters:
+    - h5_path: File holding the weights (and, by default, the architecture)
+    - model_config: Optional Sequential config (e.g. the word model's JSON
+      architecture); its layers are matched to the h5 weights in order,
+      as Keras' load_weights does
+
+    Returns:
+    - NumpyModel
+    """
+    with h5py.File(h5_path, 'r') as f:
+        if model_config is None:
+            model_config = f.attrs['model_config']
+            if isinstance(model_config, bytes):
+                model_config = model_config.decode('utf-8')
+            model_config = json.loads(model_config)
+        weights_root = f['model_weights'] if 'model_weights' in f else f
+        layer_names = [n.decode('utf-8') if isinstance(n, bytes) else n for n in weights_root.attrs['layer_names']]
+        stored = [_read_layer_weights(weights_root[name]) for name in layer_names]
+
+    if model_config['class_name'] != 'Sequential':
+        raise ValueError(f"Only Sequential models are supported, got {model_config['class_name']}")
+
+    stored_with_weights = [entry for entry in stored if entry[1]]
+    layers = []
+    input_shape = None
+    for layer_config in model_config['config']['layers']:
+        class_name = layer_config['class_name']
+        config = layer_config['config']
+        if input_shape is None and 'batch_input_shape' in config:
+            input_shape = tuple(config['batch_input_shape'])
+        if class_name == 'InputLayer':
+            continue
+        if class_name not in LAYERS:
+            raise ValueError(f"Unsupported layer type '{class_name}'")
+
+        weights = {}
+        if class_name not in ('Dropout', 'Masking'):
+            if not stored_with_weights:
+                raise ValueError(f"No weights left in {h5_path} for layer '{config['name']}'")
+            names, values = stored_with_weights.pop(0)
+            weights = _layer_weights(class_name, names, values)
+        layers.append((config['name'], LAYERS[class_name](config, weights)))
+
+    return NumpyModel(layers, input_shape, model_config['config'].get('name', 'sequential'))
+
+
+def main():
+    from asl_predictor import load_alphabet_model, load_word_model, remove_time_major_from_config
+
+    parser = argparse.ArgumentParser(description="Check the NumPy engine against the Keras models")
+    parser.add_argument('--samples', type=int, default=64)
+    parser.add_argument('--atol', type=float, default=1e-4)
+    args = parser.parse_args()
+
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    model_dir = os.path.join(os.path.dirname(os.path.dirname(current_dir)), 'model')
+    with open(os.path.join(model_dir, 'asl_word_lstm_model_architecture.json'), 'r') as json_file:
+        word_config = remove_time_major_from_config(json.load(json_file))
+
+    pairs = [
+        ('alphabet', load_alphabet_model(model_dir),
+         load_numpy_model(os.path.join(model_dir, 'asl_alphabet_model.h5'))),
+        ('word', load_word_model(model_dir),
+         load_numpy_model(os.path.join(model_dir, 'asl_word_lstm_model.h5'), word_config)),
+    ]
+
+    rng = np.random.default_rng(0)
+    failed = False
+    for name, keras_model, numpy_model in pairs:
+        batch = rng.standard_normal((args.samples,) + tuple(keras_model.input_shape[1:])).astype(np.float32)
+        expected = keras_model.predict(batch, verbose=0)
+        actual = numpy_model(batch)
+        error = np.max(np.abs(expected - actual))
+        agreement = np.mean(np.argmax(expected, axis=-1) == np.argmax(actual, axis=-1))
+        ok = error <= args.atol
+        failed |= not ok
+        print(f"{name}: max abs error {error:.2e}, top-1 agreement {agreement:.1%} -> {'OK' if ok else 'FAIL'}")
+
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
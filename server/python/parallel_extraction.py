@@ -0,0 +1,172 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from frame_decoding import decode_jpeg
+from hand_gate import ADMIT, AUDIT, SKIP
+from landmark_cache import content_key
+from metrics import NULL_STAGES
+
+# Hands graph owned by the current process-pool worker
+_process_hands = None
+
+
+def hands_from_results(results):
+    # One list of 21 (x, y, z) landmarks per detected hand
+    hands = []
+    if results.multi_hand_landmarks:
+        for hand_landmarks in results.multi_hand_landmarks:
+            hands.append([(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark])
+    return hands
+
+
+def extract_frame_hands(item, hands_graph, index=0, stages=NULL_STAGES, roi=None, gate=None):
+    """
+    Decode (if given JPEG bytes) and run hand detection on one frame.
+
+    Parameters:
+    - stages: Stage timer from MetricsRegistry.stages() for the decode, gate and mediapipe stages
+    - roi: Optional RoiTracker that downscales/crops the frame before detection
+    - gate: Optional HandGate; frames it rejects skip MediaPipe and have no hands
+    """
+    if not isinstance(item, np.ndarray):
+        with stages('decode'):
+            item = decode_jpeg(item, index)
+    decision = ADMIT
+    if gate is not None:
+        with stages('gate'):
+            decision = gate.check(item)
+        if decision == SKIP:
+            return []
+    with stages('mediapipe'):
+        if roi is None:
+            hands = hands_from_results(hands_graph.process(cv2.cvtColor(item, cv2.COLOR_BGR2RGB)))
+        else:
+            hands = roi.detect(item, lambda image: hands_from_results(hands_graph.process(image)))
+    if decision == AUDIT:
+        gate.record_audit(hands)
+    return hands
+
+
+def _new_hands(hands_kwargs):
+    # MediaPipe is imported on first use: the predictor imports this module
+    # for extract_frame_hands long before any graph is needed
+    import mediapipe as mp
+    return mp.solutions.hands.Hands(**hands_kwargs)
+
+
+def _init_process_worker(hands_kwargs):
+    global _process_hands
+    _process_hands = _new_hands(hands_kwargs)
+    _warmup(_process_hands)
+
+
+def _extract_in_process(args):
+    index, item = args
+    return extract_frame_hands(item, _process_hands, index)
+
+
+def _warmup(hands_graph):
+    hands_graph.process(np.zeros((64, 64, 3), dtype=np.uint8))
+
+
+class ParallelExtractor:
+    """
+    Spreads frame decoding and hand detection for a word sequence across a
+    pool of pre-initialized MediaPipe workers.
+
+    Frames of one sequence are processed concurrently and out of order, so
+    the workers run their graphs in static-image mode; results are returned
+    in the original frame order.
+
+    Parameters:
+    - workers: Number of worker threads or processes (defaults to the CPU count)
+    - backend: 'thread' (MediaPipe and OpenCV release the GIL) or 'process'
+    - hands_kwargs: Passed to mp.solutions.hands.Hands
+    """
+
+    def __init__(self, workers=None, backend='thread', **hands_kwargs):
+        self.workers = workers or os.cpu_count() or 1
+        self.backend = backend
+        hands_kwargs['static_image_mode'] = True
+        self.hands_kwargs = hands_kwargs
+
+        if backend == 'thread':
+            self._local = threading.local()
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='extract')
+            self._task = self._extract_in_thread
+            # Every thread builds its graph before the first request
+            barrier = threading.Barrier(self.workers)
+            warmups = [self._executor.submit(self._init_thread, barrier) for _ in range(self.workers)]
+        elif backend == 'process':
+            self._executor = ProcessPoolExecutor(
+                self.workers, initializer=_init_process_worker, initargs=(hands_kwargs,))
+            self._task = _extract_in_process
+            warmups = [self._executor.submit(os.getpid) for _ in range(self.workers)]
+        else:
+            raise ValueError(f"Unknown extraction backend '{backend}', expected 'thread' or 'process'")
+
+        for warmup in warmups:
+            warmup.result()
+
+    def _init_thread(self, barrier):
+        self._local.hands = _new_hands(self.hands_kwargs)
+        _warmup(self._local.hands)
+        barrier.wait()
+
+    def _extract_in_thread(self, args, stages=NULL_STAGES, roi=None, gate=None):
+        index, item = args
+        return extract_frame_hands(item, self._local.hands, index, stages, roi, gate)
+
+    def _extract_cached_in_thread(self, cache, args, stages=NULL_STAGES, roi=None, gate=None, scope=None):
+        index, item = args
+        return cache.get_or_extract(
+            item, lambda frame: extract_frame_hands(frame, self._local.hands, index, stages, roi, gate), index, scope)
+
+    def extract(self, frames, cache=None, stages=NULL_STAGES, roi=None, gate=None, scope=None):
+        """
+        Run hand detection on each frame (BGR array or JPEG bytes) in parallel.
+
+        Parameters:
+        - cache: Optional LandmarkCache consulted before any frame is processed
+        - stages: Stage timer for the workers; worker processes are not timed
+        - roi: Stateless (track=False) RoiTracker for downscaling in worker
+          threads; frames arrive out of order, so nothing is tracked. Not
+          supported by the process backend
+        - gate: Optional HandGate checked in worker threads. Not supported by
+          the process backend
+        - scope: Cache scope for perceptual matches (see LandmarkCache)
+
+        Returns:
+        - One hands list per frame, in input order
+        """
+        if self.backend == 'thread':
+            if cache is None:
+                return list(self._executor.map(
+                    lambda args: self._extract_in_thread(args, stages, roi, gate), enumerate(frames)))
+            return list(self._executor.map(
+                lambda args: self._extract_cached_in_thread(cache, args, stages, roi, gate, scope), enumerate(frames)))
+        if roi is not None or gate is not None:
+            raise ValueError("Frame downscaling (detection_size) and the hand gate need the 'thread' extraction backend")
+        if cache is None:
+            return list(self._executor.map(self._task, enumerate(frames)))
+
+        # Worker processes cannot see the cache: resolve exact-content hits
+        # here and only send the misses out
+        frames = list(frames)
+        keys = [content_key(frame) for frame in frames]
+        results = [cache.get(key) for key in keys]
+        misses = [i for i, hands in enumerate(results) if hands is None]
+        for _ in range(len(frames) - len(misses)):
+            cache.count('hits')
+        for i, hands in zip(misses, self._executor.map(self._task, [(i, frames[i]) for i in misses])):
+            cache.count('misses')
+            cache.put(keys[i], hands)
+            results[i] = hands
+        return results
+
+    def close(self):
+        self._executor.shutdown()
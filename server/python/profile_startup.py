@@ -0,0 +1,88 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Run in a fresh interpreter so every measurement starts from cold imports
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from asl_predictor import ASLPredictor
+imported = time.perf_counter()
+predictor = ASLPredictor(lazy=True, engine={engine!r})
+predictor.preload({preload!r})
+ready = time.perf_counter()
+timings = {{'import_ms': (imported - start) * 1000.0, 'ready_ms': (ready - start) * 1000.0}}
+if {first_request!r}:
+    import numpy as np
+    request_start = time.perf_counter()
+    predictor.predict_alphabet_landmarks(np.random.default_rng(0).random((1, 21, 3)))
+    timings['first_request_ms'] = (time.perf_counter() - request_start) * 1000.0
+timings['loaded'] = predictor.loaded_components()
+print('STARTUP ' + json.dumps(timings))
+"""
+
+
+def import_profile(module, top):
+    """
+    Cumulative import time of a module and of each package it imports
+    directly, from python -X importtime.
+
+    Returns:
+    - (package, cumulative_ms) pairs, slowest first
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=CURRENT_DIR, capture_output=True, text=True, check=True)
+    packages = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Keep the module itself and its direct imports: deeper imports are
+        # indented further and already counted in their parent's cumulative time
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        package = name.strip().split('.')[0]
+        if depth > 1 or (depth == 0 and package != module):
+            continue
+        packages[package] = packages.get(package, 0.0) + int(cumulative) / 1000.0
+    return sorted(packages.items(), key=lambda item: -item[1])[:top]
+
+
+def startup_timings(preload, engine, first_request):
+    script = STARTUP_SCRIPT.format(preload=preload, engine=engine, first_request=first_request)
+    result = subprocess.run([sys.executable, '-c', script], cwd=CURRENT_DIR, capture_output=True, text=True)
+    for line in result.stdout.splitlines():
+        if line.startswith('STARTUP '):
+            return json.loads(line[len('STARTUP '):])
+    raise RuntimeError(f"Startup run failed:\n{result.stderr[-2000:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile worker start-up: import costs and time to first prediction")
+    parser.add_argument('--engine', choices=['keras', 'numpy'], default='keras')
+    parser.add_argument('--top', type=int, default=15, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    print("Slowest imports for 'import asl_predictor':")
+    for package, cumulative_ms in import_profile('asl_predictor', args.top):
+        print(f"  {package:<24} {cumulative_ms:9.1f} ms")
+
+    # Each mode is the set of components built before the worker reports ready
+    modes = [
+        ('eager, all components', None),
+        ('eager, alphabet only', ['hands', 'labels', 'alphabet']),
+        ('lazy', []),
+    ]
+    print("\nStart-up modes (fresh interpreter each):")
+    for name, preload in modes:
+        timings = startup_timings(preload, args.engine, first_request=True)
+        print(f"  {name:<24} import {timings['import_ms']:8.1f} ms, ready {timings['ready_ms']:8.1f} ms, "
+              f"first alphabet request {timings['first_request_ms']:8.1f} ms, loaded {timings['loaded']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+import os
+
+import numpy as np
+
+# h5py is imported by the functions that read or write files, so
+# asl_predictor can import this module without paying for it
+
+PRECISIONS = ('float16', 'int8')
+SCALE_ATTR = 'quantization_scale'
+
+
+def variant_path(h5_path, precision=None):
+    """
+    model/asl_word_lstm_model.h5 -> model/variants/asl_word_lstm_model.int8.h5
+
+    None or 'float32' is the original file.
+    """
+    if precision in (None, 'float32'):
+        return h5_path
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision '{precision}', expected one of {PRECISIONS}")
+    directory, name = os.path.split(h5_path)
+    stem, extension = os.path.splitext(name)
+    return os.path.join(directory, 'variants', f'{stem}.{precision}{extension}')
+
+
+def quantize_int8(values):
+    """
+    Symmetric int8 quantization with one scale per output channel (last axis).
+
+    Returns:
+    - (int8 values, float32 scales) with values * scales ~= the input
+    """
+    values = np.asarray(values, dtype=np.float32)
+    max_abs = np.max(np.abs(values.reshape(-1, values.shape[-1])), axis=0)
+    scale = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+    return np.clip(np.round(values / scale), -127, 127).astype(np.int8), scale
+
+
+def dequantize(dataset):
+    # float32 values of a weight dataset from an original or a variant file
+    values = np.asarray(dataset, dtype=np.float32)
+    if SCALE_ATTR in dataset.attrs:
+        values *= dataset.attrs[SCALE_ATTR]
+    return values
+
+
+def _copy_group(source, target, precision):
+    import h5py
+
+    for key, value in source.attrs.items():
+        target.attrs[key] = value
+    for name, item in source.items():
+        if isinstance(item, h5py.Group):
+            # Training state is not needed to serve, and would be the largest part of the file
+            if name != 'optimizer_weights':
+                _copy_group(item, target.create_group(name), precision)
+            continue
+        values = item[()]
+        attrs = dict(item.attrs)
+        if np.issubdtype(values.dtype, np.floating):
+            if precision == 'float16':
+                values = values.astype(np.float16)
+            elif values.ndim >= 2:
+                # Kernels only: biases and normalization statistics are tiny and stay float32
+                values, attrs[SCALE_ATTR] = quantize_int8(values)
+        dataset = target.create_dataset(name, data=values)
+        for key, value in attrs.items():
+            dataset.attrs[key] = value
+
+
+def write_variant(h5_path, precision, output_path=None):
+    """
+    Write a reduced-precision copy of a Keras .h5 model.
+
+    float16 stores every weight as float16. int8 quantizes the kernels per
+    output channel (see quantize_int8) and keeps the scales as a dataset
+    attribute. Architecture and layer attributes are copied unchanged, so
+    the NumPy engine reads a variant like the original and the Keras engine
+    loads it with load_variant_weights().
+
+    Returns:
+    - Path of the variant
+    """
+    import h5py
+
+    output_path = output_path or variant_path(h5_path, precision)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    tmp_path = output_path + '.tmp'
+    with h5py.File(h5_path, 'r') as source, h5py.File(tmp_path, 'w') as target:
+        _copy_group(source, target, precision)
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+def read_model_weights(h5_path):
+    """
+    Returns:
+    - float32 weights of every layer, in the order model.set_weights() expects
+    """
+    import h5py
+
+    with h5py.File(h5_path, 'r') as f:
+        root = f['model_weights'] if 'model_weights' in f else f
+        weights = []
+        for layer_name in root.attrs['layer_names']:
+            group = root[layer_name.decode('utf-8') if isinstance(layer_name, bytes) else layer_name]
+            for weight_name in group.attrs.get('weight_names', []):
+                weights.append(dequantize(group[weight_name.decode('utf-8') if isinstance(weight_name, bytes) else weight_name]))
+    return weights
+
+
+def load_variant_weights(model, h5_path):
+    # Keras' load_weights would read int8 kernels without their scales
+    model.set_weights(read_model_weights(h5_path))
@@ -0,0 +1,265 @@
+import argparse
+import csv
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from features import SEQUENCE_LENGTH, WordFeatureBuilder, alphabet_features
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+FIELDS = ('file', 'kind', 'frame', 'end_frame', 'time_s', 'end_time_s', 'label', 'confidence')
+
+
+class FrameReader:
+    """
+    Decodes the frames of a video file or an image directory on a background
+    thread, up to queue_size frames ahead of the consumer.
+
+    Iterating yields (frame index, timestamp in seconds, BGR frame).
+
+    Parameters:
+    - path: Video file, or directory of images read in name order
+    - queue_size: Decoded frames held ahead of the consumer
+    - fps: Frame rate for image directories (videos use their own)
+    """
+
+    def __init__(self, path, queue_size=64, fps=30.0):
+        self.path = path
+        self.fps = fps
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._error = None
+        self._thread = threading.Thread(target=self._read, name='frame-reader', daemon=True)
+        self._thread.start()
+
+    def _frames(self):
+        if os.path.isdir(self.path):
+            names = sorted(name for name in os.listdir(self.path) if name.lower().endswith(IMAGE_EXTENSIONS))
+            for index, name in enumerate(names):
+                frame = cv2.imread(os.path.join(self.path, name), cv2.IMREAD_COLOR)
+                if frame is None:
+                    raise ValueError(f"Failed to decode {name}")
+                yield index, index / self.fps, frame
+            return
+
+        capture = cv2.VideoCapture(self.path)
+        if not capture.isOpened():
+            raise ValueError(f"Cannot open video {self.path}")
+        fps = capture.get(cv2.CAP_PROP_FPS) or self.fps
+        try:
+            index = 0
+            while True:
+                ok, frame = capture.read()
+                if not ok:
+                    return
+                yield index, index / fps, frame
+                index += 1
+        finally:
+            capture.release()
+
+    def _read(self):
+        try:
+            for item in self._frames():
+                while not self._stop.is_set():
+                    try:
+                        self._queue.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if self._stop.is_set():
+                    return
+        except Exception as e:
+            self._error = e
+        if not self._stop.is_set():
+            self._queue.put(None)
+
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            yield item
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        self._stop.set()
+
+
+def chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class VideoRecognizer:
+    """
+    Headless recognition over recorded sessions.
+
+    Frames are read ahead by a FrameReader, hands are extracted in parallel
+    by a ParallelExtractor, and the models run on whole chunks at once: one
+    alphabet prediction per frame with a hand, and one word prediction per
+    SEQUENCE_LENGTH-frame window, every `stride` frames.
+
+    Parameters:
+    - predictor: ASLPredictor with the labels, alphabet and word components
+    - extractor: ParallelExtractor for hand detection
+    - chunk_size: Frames extracted and predicted per batch
+    - stride: Frames between the starts of consecutive word windows
+    """
+
+    def __init__(self, predictor, extractor, chunk_size=32, stride=5):
+        self.predictor = predictor
+        self.extractor = extractor
+        self.chunk_size = chunk_size
+        self.stride = stride
+        self.word_features = WordFeatureBuilder()
+
+    def _label(self, index):
+        # The label encoder does not cover every model output (see predict_alphabet)
+        try:
+            return str(self.predictor.label_encoder.inverse_transform([index])[0])
+        except ValueError:
+            return None
+
+    def _rows(self, name, kind, starts, ends, times, base, probabilities):
+        for start, end, probs in zip(starts, ends, probabilities):
+            index = int(np.argmax(probs))
+            yield {
+                'file': name,
+                'kind': kind,
+                'frame': start,
+                'end_frame': end,
+                'time_s': round(times[start - base], 3),
+                'end_time_s': round(times[end - base], 3),
+                'label': self._label(index),
+                'confidence': round(float(probs[index]), 4),
+            }
+
+    def recognize(self, reader, name):
+        """
+        Yields result rows (dicts with FIELDS) for one file; `self.frames`
+        holds the number of frames read so far.
+        """
+        # Hands and timestamps from frame `base` on: only what later word windows still need is kept
+        base = next_start = 0
+        hands, times = [], []
+        self.frames = 0
+        for chunk in chunks(reader, self.chunk_size):
+            chunk_hands = self.extractor.extract([frame for _, _, frame in chunk])
+            hands.extend(chunk_hands)
+            times.extend(timestamp for _, timestamp, _ in chunk)
+            self.frames += len(chunk)
+
+            # Alphabet: every frame with a hand, in one batch
+            indices = [index for (index, _, _), frame_hands in zip(chunk, chunk_hands) if frame_hands]
+            if indices:
+                batch = np.stack([alphabet_features(frame_hands[:1]).reshape(1, -1)
+                                  for frame_hands in chunk_hands if frame_hands]).astype(np.float32)
+                yield from self._rows(name, 'alphabet', indices, indices, times, base,
+                                      self.predictor.alphabet_runner(batch))
+
+            # Word: every complete window that starts in the frames seen so far
+            starts = list(range(next_start, self.frames - SEQUENCE_LENGTH + 1, self.stride))
+            if starts:
+                yield from self._word_rows(name, starts, hands, times, base)
+                next_start = starts[-1] + self.stride
+                # With stride > SEQUENCE_LENGTH the next window may start after the frames read so far
+                next_base = min(next_start, self.frames)
+                del hands[:next_base - base]
+                del times[:next_base - base]
+                base = next_base
+
+        if 0 < self.frames < SEQUENCE_LENGTH:
+            # Shorter than one window: predict on the zero-padded sequence, as predict_word does
+            yield from self._word_rows(name, [0], hands, times, base, self.frames - 1)
+
+    def _word_rows(self, name, starts, hands, times, base, last=None):
+        batch = np.concatenate([self.word_features.from_hands(hands[start - base:start - base + SEQUENCE_LENGTH]).copy()
+                                for start in starts])
+        ends = [last if last is not None else start + SEQUENCE_LENGTH - 1 for start in starts]
+        yield from self._rows(name, 'word', starts, ends, times, base, self.predictor.word_runner(batch))
+
+
+class ResultWriter:
+    # CSV or JSONL rows to a file (format from its extension) or stdout
+    def __init__(self, path=None, output_format=None):
+        self.format = output_format or ('csv' if path and path.endswith('.csv') else 'jsonl')
+        self._file = open(path, 'w', newline='') if path else sys.stdout
+        self._csv = None
+        if self.format == 'csv':
+            self._csv = csv.DictWriter(self._file, fieldnames=FIELDS)
+            self._csv.writeheader()
+
+    def write(self, row):
+        if self._csv is not None:
+            self._csv.writerow(row)
+        else:
+            self._file.write(json.dumps(row) + '\n')
+
+    def close(self):
+        if self._file is not sys.stdout:
+            self._file.close()
+
+
+def main():
+    from asl_predictor import ASLPredictor
+    from parallel_extraction import ParallelExtractor
+
+    parser = argparse.ArgumentParser(description="Recognize signs in recorded videos or image directories")
+    parser.add_argument('inputs', nargs='+', help="Video files or directories of frames")
+    parser.add_argument('--output', help="Results file, .csv or .jsonl (default: JSONL on stdout)")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], default=None)
+    parser.add_argument('--workers', type=int, default=None, help="Hand extraction workers (default: CPU count)")
+    parser.add_argument('--backend', choices=['thread', 'process'], default='thread')
+    parser.add_argument('--chunk-size', type=int, default=32, help="Frames per extraction and prediction batch")
+    parser.add_argument('--stride', type=int, default=5, help="Frames between word windows")
+    # Decoded frames are held in full (about 6 MB each at 1080p), so both stay small
+    parser.add_argument('--read-ahead', type=int, default=64, help="Decoded frames buffered per file")
+    parser.add_argument('--fps', type=float, default=30.0, help="Frame rate of image directories")
+    parser.add_argument('--engine', choices=['keras', 'numpy'], default='keras')
+    parser.add_argument('--model-variant', choices=['float16', 'int8'], default=None)
+    args = parser.parse_args()
+
+    predictor = ASLPredictor(engine=args.engine, model_variant=args.model_variant, lazy=True)
+    predictor.preload(['labels', 'alphabet', 'word'])
+    extractor = ParallelExtractor(args.workers, args.backend, max_num_hands=1, min_detection_confidence=0.5)
+    recognizer = VideoRecognizer(predictor, extractor, args.chunk_size, args.stride)
+    writer = ResultWriter(args.output, args.format)
+
+    try:
+        for path in args.inputs:
+            reader = FrameReader(path, args.read_ahead, args.fps)
+            start = time.perf_counter()
+            rows = 0
+            try:
+                for row in recognizer.recognize(reader, os.path.basename(os.path.normpath(path))):
+                    writer.write(row)
+                    rows += 1
+            except Exception as e:
+                print(f"Error processing {path}: {str(e)}", file=sys.stderr)
+                continue
+            finally:
+                reader.close()
+            elapsed = time.perf_counter() - start
+            print(f"{path}: {recognizer.frames} frames in {elapsed:.1f}s "
+                  f"({recognizer.frames / elapsed if elapsed else 0.0:.1f} frames/s), {rows} results", file=sys.stderr)
+    finally:
+        writer.close()
+        extractor.close()
+        predictor.release()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+import cv2
+
+
+class RoiTracker:
+    """
+    Prepares frames for hand detection: downscales them to a detection
+    resolution and, while a hand is being tracked, crops to a padded box
+    around where it was in the previous frame.
+
+    Landmarks found in the prepared image are mapped back to full-frame
+    normalized coordinates (z is scaled with x, as MediaPipe normalizes z by
+    image width), so features and models see the same values as without
+    cropping. When a cropped frame finds no hand the same frame is retried
+    on the full image and tracking restarts from there.
+
+    The crop only moves once the hand gets close to its border, so the
+    MediaPipe graph's own tracking sees a stable image from frame to frame.
+    A tracker with track=False holds no state and can be shared by threads.
+
+    Parameters:
+    - detection_size: Longest side of the image passed to MediaPipe (None keeps the resolution)
+    - track: Crop around the previous frame's hands
+    - padding: Margin around the hand box, as a fraction of its longest side
+    - min_fraction: Smallest crop, as a fraction of the frame's longest side
+    """
+
+    def __init__(self, detection_size=None, track=True, padding=0.5, min_fraction=0.25):
+        self.detection_size = detection_size
+        self.track = track
+        self.padding = padding
+        self.min_fraction = min_fraction
+        self.region = None
+        self.cropped_frames = 0
+        self.full_frames = 0
+        self.retries = 0
+
+    def reset(self):
+        self.region = None
+
+    def detect(self, frame, process):
+        """
+        Run process(rgb_image) -> hands on the prepared frame.
+
+        Parameters:
+        - frame: Full-resolution BGR frame
+        - process: Callable returning one list of 21 (x, y, z) landmarks per hand,
+          normalized to the image it was given
+
+        Returns:
+        - Hands in full-frame normalized coordinates
+        """
+        height, width = frame.shape[:2]
+        region = self.region if self.track else None
+        hands = self._process_region(frame, region, process)
+        if not hands and region is not None:
+            # Tracking lost: look at the whole frame before giving up on it
+            self.retries += 1
+            region = None
+            hands = self._process_region(frame, region, process)
+
+        if self.track:
+            self.region = self._next_region(hands, region, width, height) if hands else None
+        return hands
+
+    def _process_region(self, frame, region, process):
+        height, width = frame.shape[:2]
+        x0, y0, x1, y1 = region if region is not None else (0, 0, width, height)
+        if region is None:
+            self.full_frames += 1
+        else:
+            self.cropped_frames += 1
+
+        image = frame[y0:y1, x0:x1]
+        crop_width, crop_height = x1 - x0, y1 - y0
+        if self.detection_size and max(crop_width, crop_height) > self.detection_size:
+            scale = self.detection_size / max(crop_width, crop_height)
+            size = (max(1, round(crop_width * scale)), max(1, round(crop_height * scale)))
+            image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+        hands = process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        if region is None:
+            return hands
+        return [
+            [((x0 + x * crop_width) / width, (y0 + y * crop_height) / height, z * crop_width / width)
+             for x, y, z in hand]
+            for hand in hands
+        ]
+
+    def _next_region(self, hands, region, width, height):
+        xs = [x * width for hand in hands for x, _, _ in hand]
+        ys = [y * height for hand in hands for _, y, _ in hand]
+        box = (min(xs), min(ys), max(xs), max(ys))
+        side = max(box[2] - box[0], box[3] - box[1])
+
+        # Keep the current crop while the hand stays clear of its border
+        if region is not None:
+            margin = side * self.padding / 2
+            inside = (box[0] - margin >= region[0] and box[1] - margin >= region[1]
+                      and box[2] + margin <= region[2] and box[3] + margin <= region[3])
+            if inside and max(region[2] - region[0], region[3] - region[1]) <= 2 * side * (1 + 2 * self.padding):
+                return region
+
+        side = max(side * (1 + 2 * self.padding), self.min_fraction * max(width, height))
+        if side >= min(width, height):
+            # The crop would be (nearly) the whole frame
+            return None
+        center_x, center_y = (box[0] + box[2]) / 2, (box[1] + box[3]) / 2
+        x0 = int(min(max(center_x - side / 2, 0), width - side))
+        y0 = int(min(max(center_y - side / 2, 0), height - side))
+        return (x0, y0, int(x0 + side), int(y0 + side))
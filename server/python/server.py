@@ -2,11 +2,9 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS 
 import cv2
 import numpy as np
-import base64
-import mediapipe as mp
-from tensorflow.keras.models import load_model
-from sklearn.preprocessing import LabelEncoder
 import os
+import threading
+from frame_decoding import decode_request_image, iter_request_frames, FrameDecodeError
 
 app = Flask(__name__)
 # Configure CORS with specific settings
@@ -20,6 +18,21 @@ CORS(app, resources={
 
 class ASLPredictor:
     def __init__(self):
+        # MediaPipe, TensorFlow and scikit-learn are imported and the model
+        # built by the first prediction, so the worker starts serving at once
+        self.model = None
+        self._load_lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        with self._load_lock:
+            if self.model is None:
+                self._load()
+
+    def _load(self):
+        import mediapipe as mp
+        from tensorflow.keras.models import load_model
+        from sklearn.preprocessing import LabelEncoder
+
         # Initialize MediaPipe Hands
         self.hands = mp.solutions.hands.Hands(
             static_image_mode=False,
@@ -45,6 +58,7 @@ class ASLPredictor:
         self.label_encoder.fit(['hello', 'help', 'busy'])  # Words in your dataset
         
     def predict_word(self, frames):
+        self._ensure_loaded()
         try:
             # Extract landmarks from frames
             landmarks = []
@@ -133,13 +147,14 @@ def predict_alphabet():
         return '', 200
         
     try:
-        # Get base64 encoded image from request
-        data = request.json
-        image_data = base64.b64decode(data['image'].split(',')[1])
-        
-        # Convert to numpy array
-        nparr = np.frombuffer(image_data, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        # JSON data URL, multipart part, raw JPEG or length-prefixed stream
+        try:
+            frame = decode_request_image(request)
+        except FrameDecodeError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
         
         # Make prediction
         prediction = asl_predictor.predict_alphabet(frame)
@@ -157,27 +172,11 @@ def predict_alphabet():
 @app.route('/predict/word', methods=['POST'])
 def predict_word():
     try:
-        data = request.get_json()
-        if not data or 'frames' not in data:
-            return jsonify({'error': 'No frames provided'}), 400
-
-        frames = data['frames']
-        if not frames:
-            return jsonify({'error': 'Empty frames array'}), 400
-
-        decoded_frames = []
-        for i, frame in enumerate(frames):
-            try:
-                if frame.startswith('data:image/jpeg;base64,'):
-                    frame = frame.split(',')[1]
-                image_data = base64.b64decode(frame)
-                nparr = np.frombuffer(image_data, np.uint8)
-                cv_frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-                if cv_frame is None:
-                    raise ValueError(f"Failed to decode frame {i}")
-                decoded_frames.append(cv_frame)
-            except Exception as e:
-                return jsonify({'error': f'Error decoding frame {i}: {str(e)}'}), 400
+        # Frames are decoded as each multipart part / stream record arrives
+        try:
+            decoded_frames = list(iter_request_frames(request))
+        except FrameDecodeError as e:
+            return jsonify({'error': str(e)}), 400
 
         if len(decoded_frames) == 0:
             return jsonify({'error': 'No valid frames after decoding'}), 400
@@ -0,0 +1,423 @@
+import argparse
+import hashlib
+import json
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from features import HAND_VALUES, MAX_HANDS
+
+# On-disk layout of a store directory, all little-endian and append-only:
+# - landmarks.f16: float16 landmark values of every record back to back,
+#   each record (frames, hands, 21, 3) with missing hands as zeros
+# - index.bin: one INDEX_DTYPE entry per record, pointing into landmarks.f16
+# - format.json: the dtypes and endpoint names, for readers outside this module
+# Both binary files can be opened with np.memmap; see SessionStore.
+LANDMARKS_FILE = 'landmarks.f16'
+INDEX_FILE = 'index.bin'
+FORMAT_FILE = 'format.json'
+FORMAT_VERSION = 1
+
+LANDMARK_DTYPE = np.dtype('<f2')
+INDEX_DTYPE = np.dtype([
+    ('time', '<f8'),         # time.time() when the prediction was made
+    ('session', '<u8'),      # session_key() of the X-Session-Id, 0 without one
+    ('offset', '<u8'),       # first value of the record in landmarks.f16
+    ('frames', '<u4'),
+    ('hands', 'u1'),         # hands per frame; 0 for an alphabet frame without a hand
+    ('endpoint', 'u1'),      # index into ENDPOINTS
+    ('elapsed_ms', '<f4'),   # time the predictor spent on the request
+    ('prediction', 'S32'),   # predicted label, empty for no prediction
+])
+ENDPOINTS = ('alphabet', 'word', 'alphabet_landmarks', 'word_landmarks')
+
+
+def session_key(session_id):
+    # Session ids are stored as a 64-bit digest, not as sent by the client
+    if session_id is None:
+        return 0
+    return int.from_bytes(hashlib.blake2b(str(session_id).encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def pack_landmarks(frames):
+    """
+    Parameters:
+    - frames: One hands list per frame, or a (frames, hands, 21, 3) array
+
+    Returns:
+    - float16 (frames, hands, 21, 3) array, hands being the most found in any frame
+    """
+    if isinstance(frames, np.ndarray):
+        frames = frames.reshape(len(frames), -1, 21, 3)[:, :MAX_HANDS]
+        return frames.astype(LANDMARK_DTYPE)
+    hands = min(max((len(frame_hands) for frame_hands in frames), default=0), MAX_HANDS)
+    packed = np.zeros((len(frames), hands, 21, 3), dtype=LANDMARK_DTYPE)
+    for frame_index, frame_hands in enumerate(frames):
+        for hand_index, hand in enumerate(frame_hands[:hands]):
+            packed[frame_index, hand_index] = np.asarray(hand, dtype=np.float64).reshape(21, 3)
+    return packed
+
+
+class SessionRecorder:
+    """
+    Records served predictions (the landmarks they were made from, the time
+    they took and their result) into an append-only store that SessionStore
+    reads and replay() feeds back through a predictor.
+
+    Like DebugCapture, the request thread only queues the record; packing and
+    writing happen on a background writer, and records are dropped rather
+    than slowing requests down when it falls behind. Landmarks are flushed
+    before the index entries pointing at them, and a store is trimmed back
+    to its last complete record when reopened, so a killed server leaves a
+    readable store.
+
+    Parameters:
+    - directory: Store directory, created if needed and appended to if it exists
+    - sample_rate: Fraction of sessions recorded (0 to 1); whole sessions are kept or skipped
+    - queue_size: Records waiting for the writer before new ones are dropped
+    """
+
+    def __init__(self, directory, sample_rate=1.0, queue_size=1024):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self._queue_size = queue_size
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self._start_writer()
+
+    def _open_files(self):
+        os.makedirs(self.directory, exist_ok=True)
+        format_path = os.path.join(self.directory, FORMAT_FILE)
+        if not os.path.exists(format_path):
+            with open(format_path, 'w') as f:
+                json.dump({'version': FORMAT_VERSION, 'index_dtype': INDEX_DTYPE.descr,
+                           'landmark_dtype': LANDMARK_DTYPE.str, 'endpoints': ENDPOINTS}, f, indent=2)
+
+        # Drop whatever an interrupted writer left after the last complete record
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        landmarks_path = os.path.join(self.directory, LANDMARKS_FILE)
+        index = open(index_path, 'ab')
+        size = os.path.getsize(index_path)
+        size -= size % INDEX_DTYPE.itemsize
+        index.truncate(size)
+        self._values = 0
+        if size:
+            last = np.fromfile(index_path, dtype=INDEX_DTYPE, count=1, offset=size - INDEX_DTYPE.itemsize)[0]
+            self._values = int(last['offset']) + int(last['frames']) * int(last['hands']) * HAND_VALUES
+        landmarks = open(landmarks_path, 'ab')
+        landmarks.truncate(self._values * LANDMARK_DTYPE.itemsize)
+        self._index_file, self._landmarks_file = index, landmarks
+
+    def _start_writer(self):
+        self._open_files()
+        self._queue = queue.Queue(maxsize=self._queue_size)
+        self._writer = threading.Thread(target=self._write_loop, name='session-recorder', daemon=True)
+        self._writer.start()
+
+    def after_fork(self):
+        # Every worker appends to its own store under the configured directory
+        self._lock = threading.Lock()
+        self.directory = os.path.join(self.directory, f'worker-{os.getpid()}')
+        self._start_writer()
+
+    def should_record(self, session_id=None):
+        if self.sample_rate >= 1.0:
+            return True
+        if session_id is None:
+            return random.random() < self.sample_rate
+        return session_key(session_id) < self.sample_rate * 2 ** 64
+
+    def record(self, endpoint, frames, prediction, elapsed, session_id=None):
+        """
+        Queue one prediction for the writer.
+
+        Parameters:
+        - endpoint: One of ENDPOINTS
+        - frames: One hands list per frame, or a (frames, hands, 21, 3) array (not copied)
+        - prediction: Predicted label, or None
+        - elapsed: Seconds the prediction took
+        - session_id: The request's session id, if any
+        """
+        item = (time.time(), session_key(session_id), ENDPOINTS.index(endpoint), frames, prediction, elapsed)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return
+        with self._lock:
+            self.recorded += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'directory': self.directory,
+                'sample_rate': self.sample_rate,
+                'recorded': self.recorded,
+                'written': self.written,
+                'dropped': self.dropped,
+            }
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < 256:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            batch = [item for item in batch if item is not None]
+            try:
+                self._write(batch)
+            except Exception as e:
+                print(f"Error writing {len(batch)} session records: {str(e)}")
+            if stop:
+                break
+        self._index_file.close()
+        self._landmarks_file.close()
+
+    def _write(self, batch):
+        entries = np.zeros(len(batch), dtype=INDEX_DTYPE)
+        for entry, (timestamp, session, endpoint, frames, prediction, elapsed) in zip(entries, batch):
+            landmarks = pack_landmarks(frames)
+            entry['time'] = timestamp
+            entry['session'] = session
+            entry['offset'] = self._values
+            entry['frames'], entry['hands'] = landmarks.shape[:2]
+            entry['endpoint'] = endpoint
+            entry['elapsed_ms'] = elapsed * 1000.0
+            entry['prediction'] = '' if prediction is None else str(prediction).encode('utf-8')[:32]
+            self._landmarks_file.write(landmarks.tobytes())
+            self._values += landmarks.size
+        self._landmarks_file.flush()
+        self._index_file.write(entries.tobytes())
+        self._index_file.flush()
+        with self._lock:
+            self.written += len(batch)
+
+    def close(self):
+        self._queue.put(None)
+        self._writer.join()
+
+
+class SessionStore:
+    """
+    Read-only view of a SessionRecorder directory, memory-mapped: opening a
+    store reads nothing but the file sizes, and landmarks are paged in as
+    records are accessed.
+
+    Records written after the store was opened are not seen; open it again
+    to pick them up.
+
+    Parameters:
+    - directory: Store directory
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        index_path = os.path.join(directory, INDEX_FILE)
+        if not os.path.exists(index_path):
+            raise FileNotFoundError(f"No session store at {directory}")
+        count = os.path.getsize(index_path) // INDEX_DTYPE.itemsize
+        self.index = np.memmap(index_path, INDEX_DTYPE, 'r', shape=(count,)) if count \
+            else np.zeros(0, dtype=INDEX_DTYPE)
+
+        values = int(np.max(self.index['offset'] + self.index['frames'].astype(np.uint64) *
+                            self.index['hands'] * HAND_VALUES)) if count else 0
+        self.values = np.memmap(os.path.join(directory, LANDMARKS_FILE), LANDMARK_DTYPE, 'r', shape=(values,)) \
+            if values else np.zeros(0, dtype=LANDMARK_DTYPE)
+
+    def __len__(self):
+        return len(self.index)
+
+    def landmarks(self, index):
+        # float16 (frames, hands, 21, 3) view into the memory-mapped file
+        entry = self.index[index]
+        start = int(entry['offset'])
+        frames, hands = int(entry['frames']), int(entry['hands'])
+        return self.values[start:start + frames * hands * HAND_VALUES].reshape(frames, hands, 21, 3)
+
+    def record(self, index):
+        entry = self.index[index]
+        prediction = entry['prediction'].decode('utf-8')
+        return {
+            'index': index,
+            'time': float(entry['time']),
+            'session': int(entry['session']),
+            'endpoint': ENDPOINTS[entry['endpoint']],
+            'frames': int(entry['frames']),
+            'hands': int(entry['hands']),
+            'elapsed_ms': float(entry['elapsed_ms']),
+            'prediction': prediction or None,
+            'landmarks': self.landmarks(index),
+        }
+
+    def sessions(self):
+        """
+        Returns:
+        - {session key: record indices in recording order}; key 0 holds the
+          requests sent without a session id
+        """
+        order = np.argsort(self.index['session'], kind='stable')
+        keys, starts = np.unique(self.index['session'][order], return_index=True)
+        return {int(key): order[start:end].tolist()
+                for key, start, end in zip(keys, starts, list(starts[1:]) + [len(order)])}
+
+    def stats(self):
+        endpoints = np.bincount(self.index['endpoint'], minlength=len(ENDPOINTS)) if len(self) else \
+            np.zeros(len(ENDPOINTS), dtype=int)
+        return {
+            'records': len(self),
+            'sessions': len(self.sessions()),
+            'frames': int(np.sum(self.index['frames'])),
+            'endpoints': {name: int(count) for name, count in zip(ENDPOINTS, endpoints)},
+            'landmark_bytes': self.values.nbytes,
+            'first_time': float(self.index['time'].min()) if len(self) else None,
+            'last_time': float(self.index['time'].max()) if len(self) else None,
+        }
+
+
+def open_stores(path):
+    # A store directory and the per-worker stores (worker-<pid>/) under it
+    directories = [path] + [os.path.join(path, name) for name in sorted(os.listdir(path))]
+    return [SessionStore(directory) for directory in directories
+            if os.path.exists(os.path.join(directory, INDEX_FILE))]
+
+
+def replay_record(predictor, record):
+    """
+    Predict a stored record again from its landmarks, through the predictor's
+    feature and model stages (the /landmarks endpoints' path, no MediaPipe).
+
+    Returns:
+    - The prediction; None for an alphabet frame recorded without a hand
+    """
+    landmarks = np.asarray(record['landmarks'], dtype=np.float32)
+    if record['endpoint'] in ('alphabet', 'alphabet_landmarks'):
+        if record['hands'] == 0:
+            return None
+        return predictor.predict_alphabet_landmarks(landmarks[0])
+    return predictor.predict_word_landmarks(landmarks)
+
+
+def replay(store, predictor, speed=None, workers=1, indices=None):
+    """
+    Feed stored records back through a predictor.
+
+    With a speed, records are submitted at their recorded times (scaled by
+    1/speed, so 2.0 replays twice as fast), reproducing the recorded load;
+    without one they are submitted as fast as `workers` threads take them.
+    The predictor should not have a recorder, or the replay is recorded too.
+
+    Parameters:
+    - store: SessionStore
+    - predictor: ASLPredictor to replay into
+    - speed: Replay rate relative to the recording, or None for as fast as possible
+    - workers: Records predicted concurrently
+    - indices: Records to replay (default: all), in submission order
+
+    Returns:
+    - One result per record: index, endpoint, session, recorded and replayed
+      prediction, recorded and replayed latency in ms, and lag_ms (how late
+      the record was submitted relative to its scheduled time)
+    """
+    indices = list(range(len(store))) if indices is None else list(indices)
+    if not indices:
+        return []
+
+    def run(record, lag):
+        start = time.perf_counter()
+        prediction = replay_record(predictor, record)
+        return {
+            'index': record['index'],
+            'endpoint': record['endpoint'],
+            'session': record['session'],
+            'recorded': record['prediction'],
+            'prediction': None if prediction is None else str(prediction),
+            'recorded_ms': record['elapsed_ms'],
+            'elapsed_ms': (time.perf_counter() - start) * 1000.0,
+            'lag_ms': lag * 1000.0,
+        }
+
+    first_time = float(store.index['time'][indices[0]])
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers, thread_name_prefix='replay') as executor:
+        futures = []
+        for index in indices:
+            record = store.record(index)
+            lag = 0.0
+            if speed:
+                due = start + (record['time'] - first_time) / speed
+                wait = due - time.perf_counter()
+                if wait > 0:
+                    time.sleep(wait)
+                lag = max(time.perf_counter() - due, 0.0)
+            futures.append(executor.submit(run, record, lag))
+        return [future.result() for future in futures]
+
+
+def summarize(results, elapsed):
+    print(f"{len(results)} records replayed in {elapsed:.2f}s ({len(results) / elapsed if elapsed else 0.0:.1f}/s)")
+    for endpoint in ENDPOINTS:
+        selected = [result for result in results if result['endpoint'] == endpoint]
+        if not selected:
+            continue
+        recorded = np.array([result['recorded_ms'] for result in selected])
+        replayed = np.array([result['elapsed_ms'] for result in selected])
+        agreement = np.mean([result['prediction'] == result['recorded'] for result in selected])
+        print(f"  {endpoint:<18} {len(selected):6d} records  agreement {agreement:7.1%}  "
+              f"recorded p50/p95 {np.percentile(recorded, 50):7.2f}/{np.percentile(recorded, 95):7.2f} ms  "
+              f"replayed p50/p95 {np.percentile(replayed, 50):7.2f}/{np.percentile(replayed, 95):7.2f} ms")
+    lags = [result['lag_ms'] for result in results]
+    if any(lags):
+        print(f"  submission lag p95 {np.percentile(lags, 95):.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and replay recorded prediction sessions")
+    commands = parser.add_subparsers(dest='command', required=True)
+    info = commands.add_parser('info', help="Summarize stores")
+    info.add_argument('stores', nargs='+', help="Store directories (or directories of per-worker stores)")
+    replay_parser = commands.add_parser('replay', help="Replay stores through a predictor and compare predictions")
+    replay_parser.add_argument('stores', nargs='+', help="Store directories (or directories of per-worker stores)")
+    replay_parser.add_argument('--speed', type=float, default=None,
+                               help="Replay at the recorded pace times this factor (default: as fast as possible)")
+    replay_parser.add_argument('--workers', type=int, default=1, help="Records predicted concurrently")
+    replay_parser.add_argument('--limit', type=int, default=None, help="Replay at most this many records per store")
+    replay_parser.add_argument('--engine', choices=['keras', 'numpy'], default='keras')
+    replay_parser.add_argument('--model-variant', choices=['float16', 'int8'], default=None)
+    replay_parser.add_argument('--batch-window-ms', type=float, default=None)
+    args = parser.parse_args()
+
+    stores = [store for path in args.stores for store in open_stores(path)]
+    if args.command == 'info':
+        for store in stores:
+            print(f"{store.directory}: {json.dumps(store.stats(), indent=2)}")
+        return
+
+    from asl_predictor import ASLPredictor
+
+    predictor = ASLPredictor(batch_window_ms=args.batch_window_ms, engine=args.engine,
+                             model_variant=args.model_variant, lazy=True)
+    predictor.preload(['labels', 'alphabet', 'word'])
+    try:
+        for store in stores:
+            indices = range(min(len(store), args.limit)) if args.limit is not None else None
+            start = time.perf_counter()
+            results = replay(store, predictor, args.speed, args.workers, indices)
+            print(f"\n{store.directory}")
+            summarize(results, time.perf_counter() - start)
+    finally:
+        predictor.release()
+
+
+if __name__ == '__main__':
+    main()
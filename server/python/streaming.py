@@ -0,0 +1,78 @@
+import json
+from collections import deque
+
+import numpy as np
+
+from frame_decoding import decode_data_url, decode_jpeg, FrameDecodeError
+
+
+class StreamSession:
+    """
+    Sliding window of per-frame word features for one streaming client.
+
+    Like the deque(maxlen=30) loop in model/old/predict_realtime.py, each
+    frame is turned into its 126-value feature row as it arrives, so the
+    hand-detection work is spread over the whole gesture instead of landing
+    in one burst when the client stops recording.
+
+    Parameters:
+    - window: Number of frames fed to the word model
+    - stride: Emit a prediction every `stride` frames once the window is full
+    - min_frames: Frames required before the first prediction (defaults to window)
+    """
+
+    def __init__(self, window=30, stride=5, min_frames=None):
+        self.window = window
+        self.stride = max(1, stride)
+        self.min_frames = window if min_frames is None else min(min_frames, window)
+        self.frames = deque(maxlen=window)
+        self.frames_seen = 0
+
+    def push(self, features):
+        """
+        Append one frame's features; returns True when a prediction is due.
+        """
+        self.frames.append(features)
+        self.frames_seen += 1
+        if len(self.frames) < self.min_frames:
+            return False
+        return (self.frames_seen - self.min_frames) % self.stride == 0
+
+    def reset(self):
+        self.frames.clear()
+        self.frames_seen = 0
+
+
+def decode_stream_message(message):
+    """
+    Decode one WebSocket message into a frame or landmarks.
+
+    Binary messages are raw JPEG bytes. Text messages are JSON with either
+    "image" (a data URL), "landmarks" ((H, 21, 3) client-side landmarks)
+    or "reset": true.
+
+    Returns:
+    - (kind, payload): kind is 'frame', 'landmarks' or 'reset'
+    """
+    if isinstance(message, (bytes, bytearray)):
+        return 'frame', decode_jpeg(message)
+
+    try:
+        data = json.loads(message)
+    except ValueError:
+        raise FrameDecodeError('Text messages must be JSON')
+    if not isinstance(data, dict):
+        raise FrameDecodeError('Text messages must be a JSON object')
+    if data.get('reset'):
+        return 'reset', None
+    if data.get('image'):
+        return 'frame', decode_data_url(data['image'])
+    if data.get('landmarks') is not None:
+        try:
+            landmarks = np.nan_to_num(np.asarray(data['landmarks'], dtype=np.float64))
+        except (TypeError, ValueError):
+            raise FrameDecodeError('Landmarks must be a numeric array')
+        if landmarks.size not in (21 * 3, 42 * 3):
+            raise FrameDecodeError('Expected 21x3 or 42x3 landmarks')
+        return 'landmarks', landmarks.reshape(-1, 21, 3)
+    raise FrameDecodeError('Expected an image, landmarks or reset message')
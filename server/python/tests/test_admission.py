@@ -0,0 +1,109 @@
+import threading
+import time
+
+import pytest
+
+from admission import AdmissionController, DeadlineExceeded, Overloaded
+
+
+def blocking_call(started, release):
+    def fn():
+        started.set()
+        release.wait(5)
+        return 'done'
+    return fn
+
+
+def run_in_thread(controller, fn, deadline=None):
+    result = {}
+
+    def target():
+        try:
+            result['value'] = controller.run(fn, deadline)
+        except Exception as e:
+            result['error'] = e
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread, result
+
+
+def wait_for(condition, timeout=5.0):
+    end = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > end:
+            raise AssertionError('condition not reached')
+        time.sleep(0.005)
+
+
+def test_runs_and_returns_the_result():
+    controller = AdmissionController(workers=2)
+    try:
+        assert controller.run(lambda: 42) == 42
+        stats = controller.stats()
+        assert (stats['admitted'], stats['completed']) == (1, 1)
+        assert stats['mean_service_ms'] is not None
+    finally:
+        controller.close()
+
+
+def test_full_queue_is_shed_with_retry_after():
+    controller = AdmissionController(workers=1, queue_size=1)
+    started, release = threading.Event(), threading.Event()
+    running, _ = run_in_thread(controller, blocking_call(started, release))
+    try:
+        assert started.wait(5)
+        queued, queued_result = run_in_thread(controller, lambda: 'queued')
+        wait_for(lambda: controller.stats()['queued'] == 1)
+
+        with pytest.raises(Overloaded) as overloaded:
+            controller.run(lambda: 'rejected')
+        assert overloaded.value.retry_after >= 1
+        assert controller.stats()['shed']['queue_full'] == 1
+    finally:
+        release.set()
+        running.join()
+        queued.join()
+        controller.close()
+    assert queued_result == {'value': 'queued'}
+
+
+def test_expired_deadline_is_dropped_before_queueing():
+    controller = AdmissionController(workers=1)
+    calls = []
+    try:
+        with pytest.raises(DeadlineExceeded):
+            controller.run(lambda: calls.append(1), deadline=time.perf_counter() - 0.001)
+    finally:
+        controller.close()
+    assert calls == []
+    assert controller.stats()['shed']['expired'] == 1
+
+
+def test_deadline_passing_in_the_queue_drops_the_request():
+    controller = AdmissionController(workers=1, queue_size=4)
+    started, release = threading.Event(), threading.Event()
+    running, _ = run_in_thread(controller, blocking_call(started, release))
+    calls = []
+    try:
+        assert started.wait(5)
+        with pytest.raises(DeadlineExceeded):
+            controller.run(lambda: calls.append(1), deadline=time.perf_counter() + 0.05)
+    finally:
+        release.set()
+        running.join()
+        controller.close()
+    assert calls == []
+    stats = controller.stats()
+    assert stats['shed']['dropped'] == 1
+    # The dropped request's slot was released
+    assert (stats['running'], stats['queued']) == (0, 0)
+
+
+def test_started_request_is_finished_after_its_deadline():
+    controller = AdmissionController(workers=1)
+    try:
+        result = controller.run(lambda: time.sleep(0.1) or 'late', deadline=time.perf_counter() + 0.02)
+    finally:
+        controller.close()
+    assert result == 'late'
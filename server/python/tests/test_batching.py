@@ -0,0 +1,100 @@
+import threading
+
+import numpy as np
+import pytest
+
+from batching import MicroBatcher
+
+
+def recording_runner(sizes):
+    def run(batch):
+        sizes.append(len(batch))
+        return batch * 2.0
+    return run
+
+
+def test_concurrent_samples_share_one_batch():
+    sizes = []
+    batcher = MicroBatcher(recording_runner(sizes), max_wait_ms=200.0, max_batch_size=32)
+    try:
+        futures = [batcher.submit_async(np.full(3, i)) for i in range(8)]
+        outputs = [future.result(timeout=5) for future in futures]
+    finally:
+        batcher.close()
+    assert sizes == [8]
+    for i, output in enumerate(outputs):
+        np.testing.assert_array_equal(output, np.full(3, 2.0 * i))
+
+
+def test_full_batches_flush_without_waiting():
+    sizes = []
+    batcher = MicroBatcher(recording_runner(sizes), max_wait_ms=10_000.0, max_batch_size=4)
+    try:
+        futures = [batcher.submit_async(np.zeros(2)) for _ in range(8)]
+        for future in futures:
+            future.result(timeout=5)
+    finally:
+        batcher.close()
+    assert sizes == [4, 4]
+    assert batcher.stats.snapshot()['samples'] == 8
+
+
+def test_submit_from_threads_returns_each_callers_row():
+    batcher = MicroBatcher(lambda batch: batch + 1.0, max_wait_ms=20.0, max_batch_size=16)
+    results = {}
+
+    def worker(i):
+        results[i] = batcher.submit(np.array([i], dtype=np.float32))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.close()
+    assert {i: float(row[0]) for i, row in results.items()} == {i: i + 1.0 for i in range(20)}
+
+
+def test_runner_error_fails_every_sample_in_the_batch():
+    def fail(batch):
+        raise RuntimeError('model failed')
+
+    batcher = MicroBatcher(fail, max_wait_ms=100.0)
+    try:
+        futures = [batcher.submit_async(np.zeros(1)) for _ in range(3)]
+        for future in futures:
+            with pytest.raises(RuntimeError, match='model failed'):
+                future.result(timeout=5)
+    finally:
+        batcher.close()
+
+
+def test_closed_batcher_rejects_samples():
+    batcher = MicroBatcher(lambda batch: batch)
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit(np.zeros(1))
+
+
+def test_samples_racing_close_are_either_rejected_or_answered():
+    batcher = MicroBatcher(lambda batch: batch, max_wait_ms=1.0)
+    futures = []
+    submitting = threading.Barrier(5)
+
+    def worker():
+        submitting.wait()
+        while True:
+            try:
+                futures.append(batcher.submit_async(np.zeros(1)))
+            except RuntimeError:
+                return
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    submitting.wait()
+    batcher.close()
+    for thread in threads:
+        thread.join()
+    for future in futures:
+        future.result(timeout=5)
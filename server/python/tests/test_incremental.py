@@ -0,0 +1,75 @@
+from collections import deque
+
+import numpy as np
+import pytest
+
+from incremental import IncrementalWordScorer
+from numpy_engine import LSTM, Dense, Masking, NumpyModel
+
+WINDOW = 6
+FEATURES = 4
+
+
+def small_word_model(seed=0):
+    # Masking -> LSTM(8, sequences) -> LSTM(5) -> Dense softmax, like the word model but tiny
+    rng = np.random.default_rng(seed)
+
+    def lstm(inputs, units, return_sequences):
+        weights = {
+            'kernel': rng.normal(0.0, 0.5, (inputs, 4 * units)).astype(np.float32),
+            'recurrent_kernel': rng.normal(0.0, 0.5, (units, 4 * units)).astype(np.float32),
+            'bias': rng.normal(0.0, 0.1, 4 * units).astype(np.float32),
+        }
+        return LSTM({'units': units, 'return_sequences': return_sequences}, weights)
+
+    dense = Dense({'activation': 'softmax'}, {
+        'kernel': rng.normal(0.0, 0.5, (5, 3)).astype(np.float32),
+        'bias': np.zeros(3, dtype=np.float32),
+    })
+    layers = [('masking', Masking({}, {})), ('lstm_1', lstm(FEATURES, 8, True)),
+              ('lstm_2', lstm(8, 5, False)), ('dense', dense)]
+    return NumpyModel(layers, (None, WINDOW, FEATURES))
+
+
+def stream(frames=40, seed=1):
+    rng = np.random.default_rng(seed)
+    return np.cumsum(rng.normal(0.0, 0.2, (frames, FEATURES)), axis=0).astype(np.float32)
+
+
+def test_matches_the_full_window_until_the_window_fills():
+    model = small_word_model()
+    scorer = IncrementalWordScorer(model, resync_every=0)
+    state = scorer.new_state()
+    frames = deque(maxlen=WINDOW)
+    for row in stream(WINDOW):
+        frames.append(row)
+        # The full window pads the missing frames with masked zeros after the real ones
+        np.testing.assert_allclose(scorer.push(state, frames), model(scorer._window_batch(frames))[0], atol=1e-5)
+
+
+@pytest.mark.parametrize('resync_every', [1, 3, WINDOW])
+def test_resync_frames_match_the_full_window(resync_every):
+    model = small_word_model()
+    scorer = IncrementalWordScorer(model, resync_every=resync_every)
+    state = scorer.new_state()
+    frames = deque(maxlen=WINDOW)
+    compared = 0
+    for row in stream():
+        frames.append(row)
+        probabilities = scorer.push(state, frames)
+        if state.steps_since_resync == 0:
+            np.testing.assert_allclose(probabilities, model(scorer._window_batch(frames))[0], atol=1e-5)
+            compared += 1
+    assert compared >= 40 // resync_every - 1
+
+
+def test_state_is_per_stream():
+    model = small_word_model()
+    scorer = IncrementalWordScorer(model, resync_every=0)
+    rows = stream(4)
+    first, second = scorer.new_state(), scorer.new_state()
+    for row in rows:
+        scorer.push(first, [row])
+    alone = scorer.push(second, [rows[0]])
+    np.testing.assert_allclose(alone, model(scorer._window_batch([rows[0]]))[0], atol=1e-5)
+    assert first.frames_seen == 4 and second.frames_seen == 1
@@ -0,0 +1,88 @@
+import cv2
+import numpy as np
+
+import landmark_cache
+from landmark_cache import LandmarkCache, content_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LandmarkCache(max_entries=2)
+    cache.put('a', [1])
+    cache.put('b', [2])
+    assert cache.get('a') == [1]
+    cache.put('c', [3])
+    assert cache.get('b') is None
+    assert cache.get('a') == [1]
+    assert cache.get('c') == [3]
+    assert cache.stats()['evictions'] == 1
+
+
+def test_expired_entries_are_misses(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(landmark_cache, 'time', clock)
+    cache = LandmarkCache(ttl_seconds=10.0)
+    cache.put('a', [1])
+    clock.now += 9.0
+    assert cache.get('a') == [1]
+    clock.now += 2.0
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1
+    assert cache.stats()['entries'] == 0
+
+
+def test_repeated_frames_are_extracted_once():
+    frame = np.zeros((16, 16, 3), dtype=np.uint8)
+    jpeg = cv2.imencode('.jpg', frame)[1].tobytes()
+    calls = []
+
+    def extract(decoded):
+        calls.append(decoded.shape)
+        return []
+
+    cache = LandmarkCache()
+    assert cache.get_or_extract(jpeg, extract) == []
+    # "No hand" is cached too, not treated as a miss
+    assert cache.get_or_extract(jpeg, extract) == []
+    assert calls == [(16, 16, 3)]
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (1, 1)
+
+
+def test_perceptual_match_reuses_landmarks_of_a_near_identical_frame():
+    frame = np.zeros((64, 64, 3), dtype=np.uint8)
+    frame[:, 32:] = 200
+    nudged = frame.copy()
+    nudged[0, 0] = 1
+    assert content_key(frame) != content_key(nudged)
+
+    hands = [[(0.5, 0.5, 0.0)] * 21]
+    cache = LandmarkCache(perceptual=True)
+    assert cache.get_or_extract(frame, lambda decoded: hands, scope='alphabet/a') == hands
+    assert cache.get_or_extract(nudged, lambda decoded: [], scope='alphabet/a') == hands
+    assert cache.stats()['perceptual_hits'] == 1
+
+
+def test_perceptual_matches_stay_within_their_scope():
+    frame = np.zeros((64, 64, 3), dtype=np.uint8)
+    frame[:, 32:] = 200
+    nudged = frame.copy()
+    nudged[0, 0] = 1
+    anonymous = frame.copy()
+    anonymous[0, 0] = 2
+
+    hands = [[(0.5, 0.5, 0.0)] * 21]
+    cache = LandmarkCache(perceptual=True)
+    cache.get_or_extract(frame, lambda decoded: hands, scope='alphabet/a')
+    assert cache.get_or_extract(nudged, lambda decoded: [], scope='alphabet/b') == []
+    assert cache.get_or_extract(anonymous, lambda decoded: []) == []
+    # Exact content is shared regardless of scope
+    assert cache.get_or_extract(frame, lambda decoded: [], scope='word/c') == hands
+    assert cache.stats()['perceptual_hits'] == 0
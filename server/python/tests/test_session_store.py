@@ -0,0 +1,94 @@
+import os
+
+import numpy as np
+import pytest
+
+from session_store import INDEX_FILE, LANDMARKS_FILE, SessionRecorder, SessionStore, replay, session_key
+
+
+class FakePredictor:
+    # Stands in for ASLPredictor's landmark endpoints
+    def __init__(self):
+        self.calls = []
+
+    def predict_alphabet_landmarks(self, hands):
+        self.calls.append(('alphabet', hands.shape))
+        return 'a'
+
+    def predict_word_landmarks(self, frames):
+        self.calls.append(('word', frames.shape))
+        return 'hello'
+
+
+def hand(value):
+    return np.full((21, 3), value)
+
+
+def record_sample(directory):
+    recorder = SessionRecorder(directory)
+    recorder.record('word', [[hand(0.5)], [], [hand(0.25), hand(0.75)]], 'hello', 0.012, 'user-1')
+    recorder.record('alphabet', [[]], None, 0.003)
+    recorder.record('alphabet_landmarks', np.full((1, 1, 21, 3), 0.1), 'a', 0.001, 'user-1')
+    recorder.close()
+    return recorder
+
+
+def test_records_round_trip(tmp_path):
+    recorder = record_sample(str(tmp_path))
+    assert recorder.stats()['written'] == 3
+
+    store = SessionStore(str(tmp_path))
+    assert len(store) == 3
+    word = store.record(0)
+    assert (word['endpoint'], word['prediction'], word['frames'], word['hands']) == ('word', 'hello', 3, 2)
+    assert word['session'] == session_key('user-1')
+    assert word['elapsed_ms'] == pytest.approx(12.0)
+    landmarks = word['landmarks']
+    assert landmarks.dtype == np.float16 and landmarks.shape == (3, 2, 21, 3)
+    np.testing.assert_array_equal(landmarks[:, :, 0, 0], [[0.5, 0.0], [0.0, 0.0], [0.25, 0.75]])
+
+    missed = store.record(1)
+    assert (missed['prediction'], missed['hands'], missed['landmarks'].size) == (None, 0, 0)
+    np.testing.assert_allclose(store.landmarks(2), 0.1, atol=1e-3)
+
+    assert store.sessions() == {0: [1], session_key('user-1'): [0, 2]}
+    assert store.stats()['endpoints']['word'] == 1
+
+
+def test_reopening_trims_a_partial_record(tmp_path):
+    directory = str(tmp_path)
+    record_sample(directory)
+    with open(os.path.join(directory, INDEX_FILE), 'ab') as f:
+        f.write(b'\x00' * 7)
+    with open(os.path.join(directory, LANDMARKS_FILE), 'ab') as f:
+        f.write(b'\x00' * 100)
+
+    recorder = SessionRecorder(directory)
+    recorder.record('alphabet_landmarks', np.full((1, 1, 21, 3), 0.2), 'b', 0.001)
+    recorder.close()
+
+    store = SessionStore(directory)
+    assert len(store) == 4
+    np.testing.assert_allclose(store.landmarks(3), 0.2, atol=1e-3)
+    np.testing.assert_allclose(store.landmarks(2), 0.1, atol=1e-3)
+
+
+def test_replay_feeds_landmarks_back_and_compares(tmp_path):
+    record_sample(str(tmp_path))
+    predictor = FakePredictor()
+    results = replay(SessionStore(str(tmp_path)), predictor, workers=2)
+
+    assert [result['prediction'] for result in results] == ['hello', None, 'a']
+    assert [result['recorded'] for result in results] == ['hello', None, 'a']
+    # The frame recorded without a hand is not sent to the model
+    assert sorted(predictor.calls) == [('alphabet', (1, 21, 3)), ('word', (3, 2, 21, 3))]
+
+
+def test_sampling_keeps_whole_sessions(tmp_path):
+    recorder = SessionRecorder(str(tmp_path), sample_rate=0.5)
+    try:
+        decisions = {session: recorder.should_record(session) for session in map(str, range(200))}
+        assert all(recorder.should_record(session) == kept for session, kept in decisions.items())
+        assert 50 < sum(decisions.values()) < 150
+    finally:
+        recorder.close()